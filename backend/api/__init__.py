@@ -2,4 +2,11 @@ from flask import Blueprint
 
 api_bp = Blueprint("api", __name__)
 
-from . import routes
\ No newline at end of file
+from . import routes
+from .cache import cache
+from .sessions import tokens
+
+# Each app that registers the blueprint gets a cache and token store built
+# from its own config
+api_bp.record_once(lambda state: cache.configure(state.app.config))
+api_bp.record_once(lambda state: tokens.configure(state.app.config))
@@ -0,0 +1,259 @@
+"""Bulk property import from CSV or JSONL.
+
+    POST /api/properties/import?format=csv&batch_size=1000&landlord_ic=...
+    python import_properties.py units.csv --landlord-ic 800515-01-5678
+
+Rows are read from the stream one at a time (nothing buffers the whole
+upload) and normalized by `normalize_property`, the same rules
+/properties/create applies to a single JSON object. Every `batch_size` rows
+are written in one transaction with executemany INSERTs into properties and
+property_amenities, and indexed for search in one pass (db.search.deferred_indexing).
+
+A row that fails normalization is reported and skipped. If the database
+rejects a batch, it is retried row by row so only the offending rows fail.
+
+These INSERTs bypass the ORM flush hooks, so each batch also updates the
+dashboard counters and bumps the catalog generation in its transaction and,
+once committed, invalidates the catalog cache and marks the rows dirty in
+the recommender snapshot.
+"""
+import csv
+import io
+import json
+import time
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime
+from functools import lru_cache
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from db.db import db
+from db.db_tables import Property, normalize_amenities, split_location
+from db.catalog import bump_generation
+from db.search import deferred_indexing
+from db.summary import apply_deltas
+from .cache import cache
+from .recommender import snapshot as recommender
+
+FORMATS = {"csv", "jsonl"}
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+MAX_REPORTED_ERRORS = 100
+
+_COLUMNS = [c.name for c in Property.__table__.columns if c.name != "id"]
+_DEFAULTS = {c.name: c.default.arg for c in Property.__table__.columns
+             if c.default is not None and c.default.is_scalar}
+_INSERT_COLUMNS = ["id"] + _COLUMNS
+_INSERT_PROPERTY = (f"INSERT INTO properties ({', '.join(_INSERT_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(_INSERT_COLUMNS))})")
+_INSERT_AMENITY = "INSERT INTO property_amenities (property_id, key, name, position) VALUES (?, ?, ?, ?)"
+
+
+def to_int(value, default=0):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def to_float(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def normalize_property(data):
+    """Column values for a new Property from a create request / import row.
+
+    Raises ValueError when title or price is missing.
+    """
+    # Simple validation
+    if not data or 'title' not in data or 'price' not in data:
+        raise ValueError("Error: Title and Price are required")
+
+    # Normalize address and optional fields
+    full_address = data.get('location') or data.get('address')
+    if not full_address:
+        full_address = f"{data.get('address', '')}, {data.get('city', '')}, {data.get('state', '')}".strip(", ")
+
+    amenities_value = data.get('amenities', '')
+    if isinstance(amenities_value, list):
+        amenities_value = ",".join(amenities_value)
+
+    fields = dict(
+        title=data['title'],
+        description=data.get('description', ''),
+        location=full_address,
+        price=to_float(data.get('price')),
+        landlord_ic=data.get('landlord_ic'),
+        bedrooms=to_int(data.get('bedrooms', 1), 1),
+        bathrooms=to_int(data.get('bathrooms', 1), 1),
+        size_sqft=to_int(data.get('size_sqft', data.get('size', 800)), 800),
+        amenities=amenities_value,
+        property_type=data.get('housingType') or data.get('property_type'),
+        image_url=data.get('imageUrl') or data.get('image_url'),
+        status=data.get('status', 'available'),
+    )
+    # Prefer the form's explicit city/state over what the address implies
+    # (kept last so they override what the location validator derives)
+    if data.get('city'): fields['city'] = data['city']
+    if data.get('state'): fields['state'] = data['state']
+    return fields
+
+
+def read_rows(stream, fmt):
+    """Yield (line number, dict | ValueError) from a binary or text stream."""
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream if hasattr(stream, "read1") else io.BufferedReader(stream),
+                                  encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # CSV has no null: an empty cell means the field was not given
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in ("", None)}
+        return
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, ValueError(f"Invalid JSON: {e}")
+            continue
+        yield line_no, row if isinstance(row, dict) else ValueError("Each line must be a JSON object")
+
+
+def _property_row(fields, now):
+    """Turn normalize_property() output into the values the ORM would store:
+    column defaults for None, city/state and amenities as the validators set them."""
+    row = {c: None for c in _COLUMNS}
+    row.update(fields, created_at=now, updated_at=now, version=1)
+    for column, default in _DEFAULTS.items():
+        if row[column] is None:
+            row[column] = default
+    city, state = split_location(row["location"])
+    row["city"] = fields.get("city") or city
+    row["state"] = fields.get("state") or state
+    row["amenities"], amenities = _amenities(row["amenities"])
+    return row, amenities
+
+
+@lru_cache(maxsize=4096)
+def _amenities(value):
+    """(stored amenities string, [(key, label)]); imports repeat the same few lists."""
+    amenities = normalize_amenities(value)
+    return ", ".join(label for _, label in amenities), amenities
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    def error(self, line_no, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": line_no, "message": message})
+
+    def to_dict(self):
+        seconds = time.perf_counter() - self.started
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "batches": self.batches,
+            "errors": self.errors,
+            "errorsTruncated": self.failed > len(self.errors),
+            "seconds": round(seconds, 3),
+            "rowsPerSecond": round(self.imported / seconds) if seconds else None,
+        }
+
+
+def _insert(conn, batch, first_id, now):
+    """executemany the batch with ids first_id, first_id + 1, ..."""
+    rows, amenity_rows = [], []
+    for offset, (_, row, amenities) in enumerate(batch):
+        row["id"] = first_id + offset
+        rows.append(row)
+        amenity_rows.extend((row["id"], key, label, position) for position, (key, label) in enumerate(amenities))
+    # straight to the driver: Core's per-row parameter processing costs more than the INSERT
+    to_db = Property.__table__.c.created_at.type.bind_processor(conn.dialect)
+    stamp = to_db(now) if to_db else now
+    conn.exec_driver_sql(_INSERT_PROPERTY, [
+        tuple(stamp if c in ("created_at", "updated_at") else row[c] for c in _INSERT_COLUMNS) for row in rows])
+    if amenity_rows:
+        conn.exec_driver_sql(_INSERT_AMENITY, amenity_rows)
+    return rows
+
+
+def _write_batch(batch, report, now):
+    """Insert one batch in its own transaction; returns the rows written."""
+    conn = db.session.connection()
+    # ids are allocated here so amenity rows can reference them; the batch
+    # holds the write lock, so nobody else can take the same ids
+    first_id = conn.execute(text("SELECT COALESCE(MAX(id), 0) + 1 FROM properties")).scalar()
+    with deferred_indexing(conn, first_id):
+        try:
+            with conn.begin_nested():
+                written = _insert(conn, batch, first_id, now)
+        except DBAPIError:
+            # find the offending rows: one savepoint per row
+            written = []
+            for item in batch:
+                try:
+                    with conn.begin_nested():
+                        written.extend(_insert(conn, [item], first_id + len(written), now))
+                except DBAPIError as e:
+                    report.error(item[0], str(e.orig))
+
+    apply_deltas(conn, {(ic, "landlord", "properties"): (n, 0)
+                        for ic, n in Counter(r["landlord_ic"] for r in written).items()})
+    if written:
+        bump_generation(conn)
+    db.session.commit()
+    report.imported += len(written)
+    report.batches += 1
+    if written:
+        cache.invalidate("properties", *{f"landlord:{r['landlord_ic']}" for r in written})
+        recommender.mark_dirty(r["id"] for r in written)
+    return written
+
+
+def import_properties(rows, batch_size=DEFAULT_BATCH_SIZE, defaults=None, batch_lock=nullcontext, report=None):
+    """Import (line number, dict | error) pairs from `read_rows`.
+
+    `defaults` fill fields a row leaves out (e.g. landlord_ic); `batch_lock()`
+    is entered around each batch's transaction (e.g. the writer queue). Pass
+    your own `report` to keep the counts of committed batches if the import
+    stops part-way. Returns the ImportReport.
+    """
+    report = report or ImportReport()
+    batch = []
+    now = datetime.utcnow()
+
+    def flush():
+        with batch_lock():
+            # stamp under the write lock, so exports' updated_at watermarks hold
+            _write_batch(batch, report, datetime.utcnow())
+        batch.clear()
+
+    for line_no, data in rows:
+        if isinstance(data, Exception):
+            report.error(line_no, str(data))
+            continue
+        try:
+            row, amenities = _property_row(normalize_property({**(defaults or {}), **data}), now)
+        except (ValueError, TypeError) as e:
+            report.error(line_no, str(e))
+            continue
+        batch.append((line_no, row, amenities))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return report
@@ -0,0 +1,308 @@
+"""Response cache for read-heavy API routes.
+
+    @api_bp.route('/properties/<int:id>')
+    @cached(lambda id: [f"property:{id}"], ttl=300)
+    def get_property(id): ...
+
+Entries are keyed by the request path + query string and tagged by entity
+(`property:42`, `landlord:<ic>`, `saved:<user_id>`, `properties` for the whole
+catalog). Tags carry a generation number: invalidating a tag bumps it, and an
+entry is only served while every tag still has the generation it was filled
+under. Generations are captured before the view runs, so a write that commits
+while a response is being built can never leave a stale entry behind.
+
+Invalidation is automatic. An after_flush hook collects the tags touched by
+each changed row (see `tags_for`) and bumps them once the transaction commits.
+
+Backends:
+    MemoryBackend  per-process LRU bounded by entry count and bytes
+    SQLiteBackend  one file shared by every worker on the host (put it on a
+                   tmpfs such as /dev/shm to keep it in shared memory)
+
+Configured from app config when the blueprint is registered:
+CACHE_BACKEND ("memory" | "sqlite" | "none"), CACHE_PATH, CACHE_MAX_ENTRIES,
+CACHE_MAX_BYTES, CACHE_DEFAULT_TTL.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from db.db_tables import (Application, Contract, Escrow, Property, PropertyAmenity, SavedListing,
+                          TenantPreference, User)
+from db.sqlite_conn import ThreadLocalConnection
+
+
+class MemoryBackend:
+    name = "memory"
+
+    def __init__(self, max_entries=2048, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, expires_at, {tag: generation})
+        self._generations = {}
+        self._bytes = 0
+        self.evictions = 0
+
+    def generations(self, tags):
+        with self._lock:
+            return {tag: self._generations.get(tag, 0) for tag in tags}
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, tags = entry
+            if expires_at < time.time() or any(self._generations.get(t, 0) != g for t, g in tags.items()):
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, tags):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.time() + ttl, tags)
+            self._bytes += len(value)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+
+    def size(self):
+        return len(self._entries)
+
+    def _drop(self, key):
+        value, _, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+
+class SQLiteBackend:
+    """Cache shared by every process that opens the same file.
+
+    LRU is approximate: `used_at` is refreshed at most once a second per entry,
+    and the size bound is enforced every `_TRIM_EVERY` writes.
+    """
+    name = "sqlite"
+    _TRIM_EVERY = 64
+
+    def __init__(self, path, max_entries=20000, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._conn = ThreadLocalConnection(path)
+        self._writes = 0
+        self.evictions = 0
+        with self._conn() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL,
+                    expires_at REAL NOT NULL, used_at REAL NOT NULL, tags TEXT NOT NULL);
+                CREATE INDEX IF NOT EXISTS ix_cache_entries_used_at ON cache_entries (used_at);
+                CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT PRIMARY KEY, generation INTEGER NOT NULL);
+            """)
+
+    def generations(self, tags):
+        tags = list(tags)
+        found = dict(self._conn().execute(
+            f"SELECT tag, generation FROM cache_tags WHERE tag IN ({','.join('?' * len(tags))})", tags
+        )) if tags else {}
+        return {tag: found.get(tag, 0) for tag in tags}
+
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires_at, used_at, tags FROM cache_entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at, used_at, tags = row
+        tags = json.loads(tags)
+        now = time.time()
+        if expires_at < now or self.generations(tags) != tags:
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+            return None
+        if now - used_at > 1:
+            conn.execute("UPDATE cache_entries SET used_at = ? WHERE key = ?", (now, key))
+        return value
+
+    def set(self, key, value, ttl, tags):
+        now = time.time()
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entries (key, value, size, expires_at, used_at, tags) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, value, len(value), now + ttl, now, json.dumps(tags)),
+        )
+        self._writes += 1
+        if self._writes % self._TRIM_EVERY == 0:
+            self._trim(conn)
+
+    def _trim(self, conn):
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # drop the least recently used quarter in one statement
+        drop = max(count - self.max_entries, count // 4, 1)
+        conn.execute("DELETE FROM cache_entries WHERE key IN "
+                     "(SELECT key FROM cache_entries ORDER BY used_at LIMIT ?)", (drop,))
+        self.evictions += drop
+
+    def bump(self, tags):
+        self._conn().executemany(
+            "INSERT INTO cache_tags (tag, generation) VALUES (?, 1) "
+            "ON CONFLICT (tag) DO UPDATE SET generation = generation + 1",
+            [(tag,) for tag in tags],
+        )
+
+    def size(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+
+class ResponseCache:
+    def __init__(self, backend=None, default_ttl=60):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def configure(self, config):
+        kind = config.get("CACHE_BACKEND", "memory")
+        if kind == "sqlite":
+            path = config.get("CACHE_PATH") or os.path.join(os.path.dirname(os.path.dirname(__file__)), "cache.db")
+            backend = SQLiteBackend(path, config.get("CACHE_MAX_ENTRIES", 20000),
+                                    config.get("CACHE_MAX_BYTES", 256 * 1024 * 1024))
+        elif kind == "memory":
+            backend = MemoryBackend(config.get("CACHE_MAX_ENTRIES", 2048),
+                                    config.get("CACHE_MAX_BYTES", 64 * 1024 * 1024))
+        else:
+            backend = None
+        self.backend = backend
+        self.default_ttl = config.get("CACHE_DEFAULT_TTL", 60)
+        self.hits = self.misses = 0
+
+    def invalidate(self, *tags):
+        if self.backend is not None and tags:
+            self.backend.bump(set(tags))
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.backend else "none",
+            "entries": self.backend.size() if self.backend else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.backend.evictions if self.backend else 0,
+        }
+
+
+cache = ResponseCache()
+
+
+def _serialize(response):
+    meta = {"status": response.status_code, "mimetype": response.mimetype, "etag": response.get_etag()[0]}
+    return json.dumps(meta).encode() + b"\n" + response.get_data()
+
+
+def _deserialize(value):
+    meta, _, body = value.partition(b"\n")
+    meta = json.loads(meta)
+    if meta["etag"] and request.if_none_match.contains(meta["etag"]):
+        response = make_response("", 304)
+    else:
+        response = make_response(body, meta["status"])
+        response.mimetype = meta["mimetype"]
+    if meta["etag"]:
+        response.set_etag(meta["etag"])
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def cached(tags, ttl=None):
+    """Cache a GET view's 200 responses; `tags(**view_args)` names what it depends on."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            backend = cache.backend
+            if backend is None or request.method != "GET":
+                return view(**kwargs)
+
+            key = f"{request.endpoint}|{request.full_path}"
+            value = backend.get(key)
+            cache._count(value is not None)
+            if value is not None:
+                return _deserialize(value)
+
+            generations = backend.generations(tags(**kwargs))
+            response = make_response(view(**kwargs))
+            if response.status_code == 200:
+                backend.set(key, _serialize(response), ttl or cache.default_ttl, generations)
+            return response
+        return wrapper
+    return decorator
+
+
+# --- Invalidation ---
+
+def tags_for(obj):
+    """Cache tags whose responses can change when this row is written."""
+    if isinstance(obj, Property):
+        return ["properties", f"property:{obj.id}", f"landlord:{obj.landlord_ic}"]
+    if isinstance(obj, PropertyAmenity):
+        return ["properties", f"property:{obj.property_id}"]
+    if isinstance(obj, SavedListing):
+        return [f"saved:{obj.user_id}"]
+    if isinstance(obj, TenantPreference):
+        return [f"user:{obj.user_id}"]
+    if isinstance(obj, User):
+        return [f"user:{obj.id}"]
+    if isinstance(obj, Application):
+        return [f"tenant:{obj.tenant_ic}", f"property:{obj.property_id}:applications"]
+    if isinstance(obj, Contract):
+        return [f"contract:{obj.id}", f"tenant:{obj.tenant_ic}", f"landlord:{obj.landlord_ic}"]
+    if isinstance(obj, Escrow):
+        return [f"contract:{obj.contract_id}"]
+    return []
+
+
+def invalidate_on_commit(session, objs):
+    """Queue the tags of rows written outside the unit of work (e.g. a
+    multi-row INSERT) to be invalidated when the session commits."""
+    session.info.setdefault("cache_tags", set()).update(tag for obj in objs for tag in tags_for(obj))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_cache_tags(session, flush_context):
+    pending = session.info.setdefault("cache_tags", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        pending.update(tags_for(obj))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_cache_tags(session):
+    tags = session.info.pop("cache_tags", None)
+    if tags:
+        cache.invalidate(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cache_tags(session):
+    session.info.pop("cache_tags", None)
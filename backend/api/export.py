@@ -0,0 +1,120 @@
+"""Streaming export of properties, contracts and escrow as NDJSON or CSV.
+
+    GET /api/export/contracts?format=csv
+    GET /api/export/escrow?since=2026-10-01T00:00:00
+    python export_data.py contracts --format csv > contracts.csv
+
+Each export reads one table in a single read transaction, so a dump is a
+consistent snapshot of that table, and fetches it `chunk_size` rows at a time from the driver cursor (yield_per).
+Every chunk is serialized and handed to the response before the next is
+read, so memory stays flat however large the table is.
+
+Incremental exports: every export reports a watermark (the newest
+`updated_at` in its snapshot, X-Export-Watermark on the route). Passing it
+back as `since` returns only rows created or changed after it. Writes stamp
+`updated_at` while holding the single SQLite write lock, so nothing committed
+after the snapshot can carry an older stamp and be skipped.
+
+Deletes are not reported: a deleted row simply stops appearing, and an
+incremental export can't tell it apart from an unchanged one. Consumers that
+need to drop deleted rows must reconcile against a periodic full export.
+
+The route is off unless EXPORT_TOKEN is configured and must then be called
+with `Authorization: Bearer <EXPORT_TOKEN>`; export_data.py reads the
+database directly and needs no token.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime, timezone
+
+from sqlalchemy import func, select
+
+from db.db import db
+from db.db_tables import Contract, Escrow, Property
+
+TABLES = {
+    "properties": Property.__table__,
+    "contracts": Contract.__table__,
+    "escrow": Escrow.__table__,
+}
+# format name -> mimetype
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+}
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 10000
+
+
+def parse_since(value):
+    """ISO 8601 timestamp -> naive UTC datetime (how updated_at is stored)."""
+    since = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since
+
+
+def _value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+class Export:
+    """An open export of one table: `columns`, `watermark`, and `chunks()`
+    yielding lists of row tuples. The read transaction stays open until
+    `chunks()` is exhausted or `close()` is called."""
+
+    def __init__(self, table, since=None, chunk_size=DEFAULT_CHUNK_SIZE, engine=None):
+        t = TABLES[table]
+        self.table = table
+        self.since = since
+        self.columns = [c.name for c in t.columns]
+        self.rows = 0
+        self._conn = (engine or db.engine).connect()
+        try:
+            # both statements run in the same transaction, i.e. the same snapshot
+            self.watermark = self._conn.execute(select(func.max(t.c.updated_at))).scalar() or since
+            query = select(t)
+            if since is not None:
+                # walks ix_<table>_updated_at instead of the whole table
+                query = query.where(t.c.updated_at > since).order_by(t.c.updated_at, t.c.id)
+            else:
+                query = query.order_by(t.c.id)
+            self._result = self._conn.execution_options(yield_per=chunk_size).execute(query)
+        except Exception:
+            self._conn.close()
+            raise
+
+    def chunks(self):
+        try:
+            for partition in self._result.partitions():
+                self.rows += len(partition)
+                yield partition
+        finally:
+            self.close()
+
+    def close(self):
+        self._result.close()
+        self._conn.close()
+
+    def serialize(self, fmt):
+        """Yield the export as NDJSON lines or CSV (header first), one string per chunk."""
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(self.columns)
+            for chunk in self.chunks():
+                writer.writerows([_value(v) for v in row] for row in chunk)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+            return
+        columns = self.columns
+        for chunk in self.chunks():
+            yield "".join(
+                json.dumps(dict(zip(columns, map(_value, row))), ensure_ascii=False) + "\n" for row in chunk)
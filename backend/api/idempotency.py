@@ -0,0 +1,194 @@
+"""Idempotency-Key support for mutating API requests.
+
+A client that may retry a POST/PUT/PATCH/DELETE (flaky mobile connection,
+double tap) sends the same `Idempotency-Key` header on every attempt. The
+first request with a key claims it and runs; its response is stored for
+IDEMPOTENCY_TTL seconds and replayed, with `Idempotent-Replayed: true`, to
+every later request carrying the key. Only requests sharing a key wait on
+each other:
+
+    same key, request still running     409, retry later
+    same key, different method/path/body 422 (bodies over 1 MB: by length)
+    response was a 5xx                   not stored; the key is released
+    response was a 409 conflict          not stored either: it asks for a retry
+
+Requests without the header are untouched.
+
+Backends (IDEMPOTENCY_BACKEND):
+    memory  per-process; fine for the single-process dev server
+    sqlite  a table in IDEMPOTENCY_PATH shared by every worker and kept
+            across restarts
+"""
+import hashlib
+import os
+import threading
+import time
+
+from flask import g, jsonify, make_response, request
+
+from db.sqlite_conn import ThreadLocalConnection
+
+from .sessions import TTLCache
+
+HEADER = "Idempotency-Key"
+METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+MAX_KEY_LENGTH = 255
+# A claim whose request never finished (worker killed) frees up after this
+IN_PROGRESS_TTL = 60
+# Larger bodies are fingerprinted by length only
+MAX_FINGERPRINT_BYTES = 1024 * 1024
+
+
+class MemoryIdempotencyStore:
+    name = "memory"
+
+    def __init__(self, max_size=10000, ttl=86400):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._records = TTLCache(max_size, ttl)
+
+    def claim(self, key, fingerprint):
+        """Claim `key`; returns None when claimed, else the existing record
+        (fingerprint, status, body, content_type), status None while running."""
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None:
+                return record
+            self._records.put(key, (fingerprint, None, None, None), ttl=IN_PROGRESS_TTL)
+            return None
+
+    def complete(self, key, fingerprint, status, body, content_type):
+        self._records.put(key, (fingerprint, status, body, content_type), ttl=self.ttl)
+
+    def release(self, key):
+        self._records.pop(key)
+
+    def size(self):
+        return len(self._records)
+
+
+class SQLiteIdempotencyStore:
+    name = "sqlite"
+
+    def __init__(self, path, max_size=10000, ttl=86400):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._conn = ThreadLocalConnection(path)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+            "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, status INTEGER, body BLOB, "
+            "content_type TEXT, expires_at REAL NOT NULL)"
+        )
+        self._conn().execute(
+            "CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at ON idempotency_keys (expires_at)")
+
+    def claim(self, key, fingerprint):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM idempotency_keys WHERE expires_at < ?", (now,))
+            row = conn.execute("SELECT fingerprint, status, body, content_type FROM idempotency_keys WHERE key = ?",
+                               (key,)).fetchone()
+            if row is None:
+                conn.execute("INSERT INTO idempotency_keys (key, fingerprint, expires_at) VALUES (?, ?, ?)",
+                             (key, fingerprint, now + IN_PROGRESS_TTL))
+                # keep the newest max_size keys
+                conn.execute("DELETE FROM idempotency_keys WHERE key IN (SELECT key FROM idempotency_keys "
+                             "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)", (self.max_size,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return None if row is None else (row[0], row[1], row[2], row[3])
+
+    def complete(self, key, fingerprint, status, body, content_type):
+        self._conn().execute(
+            "UPDATE idempotency_keys SET status = ?, body = ?, content_type = ?, expires_at = ? "
+            "WHERE key = ? AND fingerprint = ?",
+            (status, body, content_type, time.time() + self.ttl, key, fingerprint))
+
+    def release(self, key):
+        self._conn().execute("DELETE FROM idempotency_keys WHERE key = ? AND status IS NULL", (key,))
+
+    def size(self):
+        return self._conn().execute("SELECT COUNT(*) FROM idempotency_keys").fetchone()[0]
+
+
+def _fingerprint():
+    digest = hashlib.sha256(f"{request.method} {request.full_path}\n".encode())
+    if request.content_length is not None and request.content_length <= MAX_FINGERPRINT_BYTES:
+        digest.update(request.get_data(cache=True))
+    else:
+        # don't buffer streamed uploads (e.g. /properties/import) just to hash them
+        digest.update(f"{request.content_length} bytes".encode())
+    return digest.hexdigest()
+
+
+class Idempotency:
+    def __init__(self):
+        self.store = MemoryIdempotencyStore()
+
+    def configure(self, config):
+        max_size = config.get("IDEMPOTENCY_MAX", 10000)
+        ttl = config.get("IDEMPOTENCY_TTL", 86400)
+        if config.get("IDEMPOTENCY_BACKEND", "memory") == "sqlite":
+            path = config.get("IDEMPOTENCY_PATH") or os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                                                  "idempotency.db")
+            self.store = SQLiteIdempotencyStore(path, max_size, ttl)
+        else:
+            self.store = MemoryIdempotencyStore(max_size, ttl)
+
+    def init_app(self, app, prefix="/api/"):
+        """Register the hooks. Call before other write hooks (the writer queue)
+        so replays and conflicts are answered without waiting for a write slot."""
+        self.configure(app.config)
+
+        @app.before_request
+        def _claim_idempotency_key():
+            key = request.headers.get(HEADER)
+            if not key or request.method not in METHODS or not request.path.startswith(prefix):
+                return None
+            if len(key) > MAX_KEY_LENGTH:
+                return jsonify({"error": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters"}), 400
+
+            key = f"{request.method} {request.path} {key}"
+            fingerprint = _fingerprint()
+            record = self.store.claim(key, fingerprint)
+            if record is None:
+                g.idempotency = (key, fingerprint)
+                return None
+            stored_fingerprint, status, body, content_type = record
+            if stored_fingerprint != fingerprint:
+                return jsonify({"error": f"{HEADER} was already used with a different request"}), 422
+            if status is None:
+                return jsonify({"error": f"A request with this {HEADER} is still in progress"}), 409, {"Retry-After": "1"}
+            response = make_response(body, status)
+            response.content_type = content_type
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+
+        @app.after_request
+        def _store_idempotent_response(response):
+            claim = g.pop("idempotency", None)
+            if claim is None:
+                return response
+            key, fingerprint = claim
+            # a 409 means "lost a race / not yet, retry": replaying it would
+            # answer every retry of this key with the same conflict
+            if response.status_code >= 500 or response.status_code == 409 or response.is_streamed:
+                self.store.release(key)
+            else:
+                self.store.complete(key, fingerprint, response.status_code, response.get_data(), response.content_type)
+            return response
+
+        @app.teardown_request
+        def _release_idempotency_key(exc):
+            # the request died before a response was stored
+            claim = g.pop("idempotency", None)
+            if claim is not None:
+                self.store.release(claim[0])
+
+
+idempotency = Idempotency()
@@ -0,0 +1,399 @@
+"""Per-route request metrics, served at /api/metrics in the Prometheus text format.
+
+For every API route (labelled by endpoint, e.g. `api.get_property`) and method:
+    rentsafe_http_requests_total{status}        requests by response status
+    rentsafe_http_request_errors_total          5xx responses and unhandled exceptions
+    rentsafe_http_request_duration_seconds      latency histogram, plus p50/p95/p99
+                                                estimated from it (..._quantile_seconds)
+    rentsafe_sql_statements_per_request         statements a request executed
+    rentsafe_sql_seconds_per_request            time spent executing them
+    rentsafe_http_response_bytes                response body size
+
+Requests are timed by a WSGI middleware around the whole app, so latency
+includes every before_request hook (the writer queue, idempotency replays)
+and, for streamed responses, producing the whole body. Each view is wrapped
+to tag the request with its endpoint; there are no per-request Flask hooks,
+which would cost more than the rest of the instrumentation together. SQL is
+counted with before/after_cursor_execute events on the app's engine and
+charged to the request running on the same thread.
+
+Each process keeps its own counts. With several workers set METRICS_DIR (a
+tmpfs such as /dev/shm): each worker writes a snapshot there at most every
+METRICS_FLUSH_SECONDS and /metrics merges them, so a scrape that lands on any
+worker reports the whole host. Snapshots of exited workers are folded into
+one file, so counters never go backwards when gunicorn recycles a worker.
+
+Configured from app config: METRICS_ENABLED, METRICS_DIR, METRICS_FLUSH_SECONDS.
+"""
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+from sqlalchemy import event
+from werkzeug.exceptions import HTTPException
+
+from db.db import db
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "rentsafe_"
+
+# le bounds; an observation equal to a bound falls in that bucket
+LATENCY_BUCKETS = (0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0, 10.0)
+HISTOGRAMS = {
+    "http_request_duration_seconds": (LATENCY_BUCKETS, "Request latency, from the WSGI call to the end of the body."),
+    "sql_statements_per_request": ((0, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 64, 128),
+                                   "SQL statements executed by one request."),
+    "sql_seconds_per_request": (LATENCY_BUCKETS, "Time one request spent executing SQL statements."),
+    "http_response_bytes": ((256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+                            "Response body size."),
+}
+QUANTILES = (0.5, 0.95, 0.99)
+_BOUNDS = [bounds for bounds, _ in HISTOGRAMS.values()]
+# In memory a series is ({status: count}, counts): `counts` holds each
+# histogram's buckets, +Inf bucket and sum back to back, in HISTOGRAMS order,
+# then the error count, so observe() updates a single list
+_OFFSETS = [sum(len(b) + 2 for b in _BOUNDS[:i]) for i in range(len(_BOUNDS) + 1)]
+_DURATION, _STATEMENTS, _SQL_TIME, _BYTES, _ERRORS = _OFFSETS
+_STATEMENT_BUCKETS, _BYTE_BUCKETS = _BOUNDS[1], _BOUNDS[3]
+
+_ARCHIVE = "exited.json"
+
+
+class _Request:
+    __slots__ = ("endpoint", "method", "start_response", "started", "statements", "sql_seconds", "sql_started",
+                 "status", "size")
+
+    def __init__(self, method, start_response, started):
+        self.endpoint = None
+        self.method = method
+        self.start_response = start_response
+        self.started = started
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.sql_started = None
+        self.status = 500
+        self.size = None
+
+    def __call__(self, status, headers, exc_info=None):
+        """Stands in for the server's start_response, noting status and size."""
+        self.status = int(status[:3])
+        for name, value in headers:
+            if name == "Content-Length":
+                self.size = int(value)
+                break
+        return self.start_response(status, headers, exc_info)
+
+
+# the request each thread is serving, for the SQL event hooks
+_local = threading.local()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record = getattr(_local, "request", None)
+    if record is not None:
+        record.sql_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record = getattr(_local, "request", None)
+    if record is not None and record.sql_started is not None:
+        record.statements += 1
+        record.sql_seconds += time.perf_counter() - record.sql_started
+        record.sql_started = None
+
+
+def _tagged(endpoint, view):
+    @wraps(view)
+    def tagged(*args, **kwargs):
+        record = getattr(_local, "request", None)
+        if record is not None:
+            record.endpoint = endpoint
+        return view(*args, **kwargs)
+    return tagged
+
+
+def _new_series():
+    return {"status": {}, "errors": 0,
+            "histograms": {name: [0] * (len(bounds) + 2) for name, (bounds, _) in HISTOGRAMS.items()}}
+
+
+def _merge(into, snapshot):
+    for key, series in snapshot.items():
+        target = into.setdefault(key, _new_series())
+        for status, n in series["status"].items():
+            target["status"][status] = target["status"].get(status, 0) + n
+        target["errors"] += series["errors"]
+        for name, counts in series["histograms"].items():
+            target["histograms"][name] = [a + b for a, b in zip(target["histograms"][name], counts)]
+    return into
+
+
+def quantile(q, bounds, counts):
+    """Estimate a quantile from bucket counts (not cumulative; the last is
+    +Inf), interpolating linearly inside the bucket like histogram_quantile()."""
+    total = sum(counts)
+    if not total:
+        return math.nan
+    rank, seen = q * total, 0
+    for i, n in enumerate(counts):
+        if n and seen + n >= rank:
+            if i == len(bounds):
+                return bounds[-1]
+            lower = bounds[i - 1] if i else 0
+            return lower + (bounds[i] - lower) * (rank - seen) / n
+        seen += n
+    return bounds[-1]
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.directory = None
+        self.flush_seconds = 1.0
+        self._lock = threading.Lock()
+        # each thread counts into its own table, so observe() takes no lock
+        self._thread = threading.local()
+        self._tables = []  # every thread's {(endpoint, method): ({status: count}, counts)}
+        self._flushed_at = 0.0
+        self._file = None
+
+    def configure(self, config):
+        self.enabled = config.get("METRICS_ENABLED", True)
+        self.directory = config.get("METRICS_DIR")
+        self.flush_seconds = config.get("METRICS_FLUSH_SECONDS", 1.0)
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._thread = threading.local()
+            self._tables = []
+            self._flushed_at = 0.0
+            self._file = None
+
+    def _after_fork(self):
+        self._lock = threading.Lock()  # another thread may have held it at fork time
+        self.reset()
+
+    def init_app(self, app, prefix="/api/"):
+        """Instrument `app`. Call after registering the blueprints, so their
+        views get tagged."""
+        self.configure(app.config)
+        if not self.enabled:
+            return
+        with app.app_context():
+            engine = db.engine
+        if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        for endpoint, view in app.view_functions.items():
+            if endpoint != "static":
+                app.view_functions[endpoint] = _tagged(endpoint, view)
+        app.wsgi_app = self._middleware(app, app.wsgi_app, prefix)
+
+    def _middleware(self, app, wsgi_app, prefix):
+        def instrumented(environ, start_response):
+            if not environ.get("PATH_INFO", "").startswith(prefix):
+                return wsgi_app(environ, start_response)
+            record = _local.request = _Request(environ["REQUEST_METHOD"], start_response, time.perf_counter())
+            try:
+                body = wsgi_app(environ, record)
+            except BaseException:
+                self._finish(app, environ, record)
+                raise
+            if record.size is None:
+                # streamed: observe once the body has been produced
+                record.size = 0
+                return self._counted(app, environ, record, body)
+            self._finish(app, environ, record)
+            return body
+
+        instrumented.__wrapped__ = wsgi_app
+        return instrumented
+
+    def _counted(self, app, environ, record, body):
+        """Pass a streamed body through, adding up its size."""
+        try:
+            for chunk in body:
+                record.size += len(chunk)
+                yield chunk
+        except Exception:
+            record.status = 500
+            raise
+        finally:
+            if hasattr(body, "close"):
+                body.close()
+            self._finish(app, environ, record)
+
+    def _finish(self, app, environ, record):
+        if getattr(_local, "request", None) is record:
+            _local.request = None
+        endpoint = record.endpoint
+        if endpoint is None:
+            # answered before reaching a view (404, 503, idempotent replay): match the URL again
+            try:
+                endpoint = app.url_map.bind_to_environ(environ).match(return_rule=True)[0].endpoint
+            except HTTPException:
+                endpoint = "unmatched"
+        self.observe(endpoint, record.method, record.status, time.perf_counter() - record.started,
+                     record.statements, record.sql_seconds, record.size or 0)
+
+    def observe(self, endpoint, method, status, seconds, statements, sql_seconds, size):
+        table = getattr(self._thread, "table", None)
+        if table is None:
+            table = self._thread.table = {}
+            with self._lock:
+                self._tables.append(table)
+        series = table.get((endpoint, method))
+        if series is None:
+            series = table[(endpoint, method)] = ({}, [0] * (_ERRORS + 1))
+        statuses, counts = series
+        statuses[status] = statuses.get(status, 0) + 1
+        # unrolled: this runs on every request
+        counts[_DURATION + bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        counts[_STATEMENTS - 1] += seconds
+        counts[_STATEMENTS + bisect_left(_STATEMENT_BUCKETS, statements)] += 1
+        counts[_SQL_TIME - 1] += statements
+        counts[_SQL_TIME + bisect_left(LATENCY_BUCKETS, sql_seconds)] += 1
+        counts[_BYTES - 1] += sql_seconds
+        counts[_BYTES + bisect_left(_BYTE_BUCKETS, size)] += 1
+        counts[_ERRORS - 1] += size
+        if status >= 500:
+            counts[_ERRORS] += 1
+        if self.directory and time.monotonic() - self._flushed_at >= self.flush_seconds:
+            self.flush()
+
+    def snapshot(self):
+        """This process's series, summed over threads, as {"endpoint method": series}."""
+        with self._lock:
+            tables = list(self._tables)
+        merged = {}
+        for table in tables:
+            # copies made in C, so they can't see a half-done update of another thread
+            _merge(merged, {f"{endpoint} {method}": {
+                "status": {str(k): n for k, n in dict(statuses).items()}, "errors": counts[_ERRORS],
+                "histograms": {name: counts[_OFFSETS[i]:_OFFSETS[i + 1]] for i, name in enumerate(HISTOGRAMS)},
+            } for (endpoint, method), (statuses, counts) in list(table.items())})
+        return merged
+
+    # --- sharing between worker processes (METRICS_DIR) ---
+
+    def flush(self):
+        """Write this process's snapshot to METRICS_DIR (atomically). Workers
+        call it on exit too (gunicorn.conf.py), so no counts are lost."""
+        if not self.directory:
+            return
+        with self._lock:
+            self._flushed_at = time.monotonic()
+            if self._file is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._file = os.path.join(self.directory, f"{os.getpid()}-{time.time_ns()}.json")
+        path = self._file
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    def _collect(self):
+        """Merge the snapshots of every worker, folding exited ones into one file."""
+        import fcntl  # METRICS_DIR is for multi-process serving on Linux/macOS
+
+        self.flush()
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive_path = os.path.join(self.directory, _ARCHIVE)
+            merged, exited = {}, {}
+            for name in os.listdir(self.directory):
+                if not name.endswith(".json") or name == _ARCHIVE:
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    with open(path) as f:
+                        snapshot = json.load(f)
+                except (OSError, ValueError):
+                    continue  # removed or replaced under us
+                if _pid_alive(int(name.split("-")[0])):
+                    _merge(merged, snapshot)
+                else:
+                    _merge(exited, snapshot)
+                    os.remove(path)
+            if os.path.exists(archive_path):
+                with open(archive_path) as f:
+                    _merge(exited, json.load(f))
+            if exited:
+                with open(f"{archive_path}.tmp", "w") as f:
+                    json.dump(exited, f)
+                os.replace(f"{archive_path}.tmp", archive_path)
+        return _merge(merged, exited)
+
+    def clear_directory(self):
+        """Forget every worker's counts (e.g. when the server restarts)."""
+        if self.directory and os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith((".json", ".tmp")):
+                    os.remove(os.path.join(self.directory, name))
+
+    # --- exposition ---
+
+    def render(self):
+        series = self._collect() if self.directory else self.snapshot()
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {PREFIX}{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        def labels(key, **extra):
+            endpoint, method = key.rsplit(" ", 1)
+            pairs = {"route": endpoint, "method": method, **extra}
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs.items()) + "}"
+
+        keys = sorted(series)
+        header("http_requests_total", "counter", "Requests by route, method and response status.")
+        for key in keys:
+            for status, n in sorted(series[key]["status"].items()):
+                lines.append(f"{PREFIX}http_requests_total{labels(key, status=status)} {n}")
+        header("http_request_errors_total", "counter", "Requests that failed with a 5xx or an unhandled exception.")
+        for key in keys:
+            lines.append(f"{PREFIX}http_request_errors_total{labels(key)} {series[key]['errors']}")
+
+        for name, (bounds, help_text) in HISTOGRAMS.items():
+            header(name, "histogram", help_text)
+            for key in keys:
+                counts = series[key]["histograms"][name]
+                cumulative = 0
+                for bound, n in zip((*bounds, "+Inf"), counts):
+                    cumulative += n
+                    lines.append(f"{PREFIX}{name}_bucket{labels(key, le=bound)} {cumulative}")
+                lines.append(f"{PREFIX}{name}_sum{labels(key)} {counts[-1]:.6g}")
+                lines.append(f"{PREFIX}{name}_count{labels(key)} {cumulative}")
+
+        header("http_request_duration_quantile_seconds", "gauge",
+               "Latency quantiles estimated from the duration histogram.")
+        for key in keys:
+            counts = series[key]["histograms"]["http_request_duration_seconds"][:-1]
+            for q in QUANTILES:
+                value = quantile(q, LATENCY_BUCKETS, counts)
+                value = "NaN" if math.isnan(value) else f"{value:.6g}"
+                lines.append(f"{PREFIX}http_request_duration_quantile_seconds{labels(key, quantile=q)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+# a forked worker starts with empty counts and its own snapshot file
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=metrics._after_fork)
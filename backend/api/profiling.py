@@ -0,0 +1,318 @@
+"""On-demand profiling of single API requests in a running server.
+
+A request is run under cProfile when either
+    it carries `X-Profile: <token>`, a token signed with PROFILE_SECRET
+    (`python profile_report.py --token` mints one; it expires), or
+    it is the 1-in-PROFILE_SAMPLE_RATE request this worker picks (0: never).
+With neither configured the hook is not installed and costs nothing.
+
+Only the thread serving the request is profiled, including a streamed body.
+The profile is written to PROFILE_DIR as a pstats file named after the
+route and duration:
+    20261018T101500123456-api.get_property-GET-200-12.4ms-4242.prof
+The directory keeps the newest PROFILE_MAX_FILES profiles. Profiled responses
+carry `X-Profile-Id` with the file name. URLs and parameters are not
+recorded: they hold IC numbers.
+
+The files open in any pstats tool (snakeviz, gprof2dot, `python -m pstats`).
+`python profile_report.py` aggregates them by route, splitting the time into
+CATEGORIES, and `--collapsed` prints folded stacks for flamegraph.pl or
+speedscope. cProfile records callers but not whole stacks, so the stacks are
+rebuilt from the caller graph: a function called from several places has
+its time shared between those callers in proportion to the time each call
+took (like flameprof).
+
+Configured from app config: PROFILE_SECRET, PROFILE_SAMPLE_RATE, PROFILE_DIR,
+PROFILE_MAX_FILES.
+"""
+import cProfile
+import hashlib
+import hmac
+import itertools
+import os
+import pstats
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from werkzeug.exceptions import HTTPException
+
+HEADER = "X-Profile"
+ID_HEADER = "X-Profile-Id"
+DEFAULT_TOKEN_TTL = 600
+_ENVIRON_HEADER = "HTTP_" + HEADER.upper().replace("-", "_")
+_FILE = re.compile(r"^(?P<ts>\d{8}T\d{12})-(?P<route>.+)-(?P<method>[A-Z]+)-(?P<status>\d{3})-"
+                   r"(?P<ms>\d+(?:\.\d+)?)ms-(?P<pid>\d+)\.prof$")
+
+# Where a request's time went. Each stack is charged to its innermost frame
+# that names one of the first four; failing that, to its innermost
+# sqlalchemy / app / framework frame; else "other". So SQL run by a lazy
+# load inside to_dict() counts as sql, and the attribute loading around it
+# as to_dict.
+CATEGORIES = ("sql", "orm_hydration", "to_dict", "jsonify", "sqlalchemy", "app", "framework", "other")
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+
+
+def _category(func):
+    """(category, strong) of one pstats function key, or (None, False)."""
+    filename, _, name = func
+    if name.startswith("<") and "sqlite3." in name:
+        return "sql", True  # the driver: execute, fetch*, commit
+    if filename.endswith(os.path.join("sqlalchemy", "orm", "loading.py")):
+        return "orm_hydration", True  # rows into mapped objects
+    if name == "to_dict":
+        return "to_dict", True
+    if os.sep + "flask" + os.sep + "json" + os.sep in filename:
+        return "jsonify", True
+    if "sqlalchemy" in filename or "sqlalchemy" in name:
+        return "sqlalchemy", False
+    if filename.startswith(_APP_DIR) and os.sep + "site-packages" + os.sep not in filename:
+        return "app", False
+    if any(os.sep + package + os.sep in filename for package in ("flask", "werkzeug", "flask_cors")):
+        return "framework", False
+    return None, False
+
+
+def sign(secret, ttl=DEFAULT_TOKEN_TTL, now=None):
+    """A value for the X-Profile header, valid for `ttl` seconds."""
+    expires = int((now or time.time()) + ttl)
+    return f"{expires}.{_signature(secret, expires)}"
+
+
+def _signature(secret, expires):
+    return hmac.new(secret.encode(), f"rentsafe-profile:{expires}".encode(), hashlib.sha256).hexdigest()
+
+
+def verify(secret, token, now=None):
+    if not secret or not token:
+        return False
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < (now or time.time()):
+        return False
+    return hmac.compare_digest(signature, _signature(secret, int(expires)))
+
+
+class _Profiled:
+    """start_response for a profiled request: notes the status, tags the response."""
+    __slots__ = ("start_response", "name", "status")
+
+    def __init__(self, start_response, name):
+        self.start_response = start_response
+        self.name = name
+        self.status = 500
+
+    def __call__(self, status, headers, exc_info=None):
+        self.status = int(status[:3])
+        return self.start_response(status, headers + [(ID_HEADER, self.name)], exc_info)
+
+
+class Profiler:
+    def __init__(self):
+        self.secret = None
+        self.sample_rate = 0
+        self.directory = None
+        self.max_files = 200
+        self._counter = itertools.count(1)
+        self._prune_lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.secret) or self.sample_rate > 0
+
+    def configure(self, config):
+        self.secret = config.get("PROFILE_SECRET")
+        self.sample_rate = config.get("PROFILE_SAMPLE_RATE") or 0
+        self.directory = config.get("PROFILE_DIR")
+        self.max_files = config.get("PROFILE_MAX_FILES", 200)
+        self._counter = itertools.count(1)
+
+    def init_app(self, app, prefix="/api/"):
+        """Install the hook on `app` when a secret or a sample rate is set."""
+        self.configure(app.config)
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        app.wsgi_app = self._middleware(app, app.wsgi_app, prefix)
+
+    def wants(self, environ):
+        if self.secret and _ENVIRON_HEADER in environ and verify(self.secret, environ[_ENVIRON_HEADER]):
+            return True
+        return self.sample_rate > 0 and next(self._counter) % self.sample_rate == 0
+
+    def _middleware(self, app, wsgi_app, prefix):
+        def profiled(environ, start_response):
+            if not environ.get("PATH_INFO", "").startswith(prefix) or not self.wants(environ):
+                return wsgi_app(environ, start_response)
+            try:
+                route = app.url_map.bind_to_environ(environ).match(return_rule=True)[0].endpoint
+            except HTTPException:
+                route = "unmatched"
+            started = time.perf_counter()
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+            # the file name (and X-Profile-Id) is fixed before the duration is known
+            record = _Profiled(start_response, f"{stamp}-{route}-{environ['REQUEST_METHOD']}")
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:  # another profiler owns this thread
+                return wsgi_app(environ, start_response)
+            try:
+                body = wsgi_app(environ, record)
+            except BaseException:
+                profile.disable()
+                self._save(profile, record, started)
+                raise
+            finally:
+                profile.disable()
+            return self._streamed(profile, record, started, body)
+
+        profiled.__wrapped__ = wsgi_app
+        return profiled
+
+    def _streamed(self, profile, record, started, body):
+        """Profile producing the body too, chunk by chunk on the serving thread."""
+        try:
+            iterator = iter(body)
+            while True:
+                profile.enable()
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    profile.disable()
+                yield chunk
+        finally:
+            if hasattr(body, "close"):
+                body.close()
+            self._save(profile, record, started)
+
+    def _save(self, profile, record, started):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        name = f"{record.name}-{record.status}-{elapsed_ms:.1f}ms-{os.getpid()}.prof"
+        path = os.path.join(self.directory, name)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            profile.dump_stats(tmp)
+            os.replace(tmp, path)
+            self._prune()
+        except OSError:
+            pass  # the profile is a diagnostic; never fail the request for it
+
+    def _prune(self):
+        with self._prune_lock:
+            names = sorted(name for name in os.listdir(self.directory) if _FILE.match(name))
+            for name in names[:max(len(names) - self.max_files, 0)]:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass  # another worker pruned it
+
+
+profiler = Profiler()
+
+
+def profile_files(directory, route=None):
+    """[(path, {ts, route, method, status, ms, pid})] oldest first."""
+    if not os.path.isdir(directory):
+        return []
+    found = []
+    for name in sorted(os.listdir(directory)):
+        match = _FILE.match(name)
+        if match and (route is None or match["route"] == route):
+            info = match.groupdict()
+            info["status"], info["ms"], info["pid"] = int(info["status"]), float(info["ms"]), int(info["pid"])
+            found.append((os.path.join(directory, name), info))
+    return found
+
+
+def _label(func):
+    filename, lineno, name = func
+    if filename == "~":
+        return name
+    for marker in (os.sep + "site-packages" + os.sep, _APP_DIR):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    else:
+        filename = os.path.basename(filename)
+    return f"{name} ({filename}:{lineno})"
+
+
+def collapse(stats, min_seconds=1e-6):
+    """Folded stacks {("frame", "frame", ...): seconds} and {category: seconds}
+    from a pstats.Stats, rebuilding stacks from the caller graph."""
+    callees = defaultdict(list)
+    roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        if "_lsprof." in func[2]:
+            continue  # the profiler switching itself off
+        if not callers:
+            roots.append(func)
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+
+    stacks, categories = defaultdict(float), dict.fromkeys(CATEGORIES, 0.0)
+    # iterative walk: (function, time on this path, frames so far, strong, weak category)
+    pending = [(root, stats.stats[root][3], (), None, None) for root in roots]
+    while pending:
+        func, share, path, strong, weak = pending.pop()
+        if share < min_seconds or func in path or len(path) > 256:
+            continue  # negligible, recursive (counted by the outer call), or runaway
+        category, is_strong = _category(func)
+        if is_strong:
+            strong = category
+        elif category:
+            weak = category
+        frames = path + (func,)
+        _, _, own, cumulative, _ = stats.stats[func]
+        fraction = share / cumulative if cumulative else 0.0
+        if own * fraction:
+            stacks[tuple(_label(f) for f in frames)] += own * fraction
+            categories[strong or weak or "other"] += own * fraction
+        for callee, edge_cumulative in callees.get(func, ()):
+            pending.append((callee, edge_cumulative * fraction, frames, strong, weak))
+    return dict(stacks), categories
+
+
+def summarize(directory, route=None):
+    """Profiles aggregated by route, slowest total first. Each item: route,
+    count, mean_ms, max_ms, categories {name: mean ms per request},
+    stats (combined pstats.Stats)."""
+    by_route = {}
+    for path, info in profile_files(directory, route):
+        item = by_route.get(info["route"])
+        if item is None:
+            item = by_route[info["route"]] = {"route": info["route"], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                              "categories": dict.fromkeys(CATEGORIES, 0.0), "stats": None,
+                                              "files": []}
+        stats = pstats.Stats(path)
+        _, categories = collapse(stats)
+        for name, seconds in categories.items():
+            item["categories"][name] += seconds * 1000
+        if item["stats"] is None:
+            item["stats"] = stats
+        else:
+            item["stats"].add(stats)
+        item["count"] += 1
+        item["total_ms"] += info["ms"]
+        item["max_ms"] = max(item["max_ms"], info["ms"])
+        item["files"].append(path)
+    ranked = sorted(by_route.values(), key=lambda item: item["total_ms"], reverse=True)
+    for item in ranked:
+        item["mean_ms"] = item["total_ms"] / item["count"]
+        item["categories"] = {name: ms / item["count"] for name, ms in item["categories"].items()}
+    return ranked
+
+
+def folded(paths):
+    """flamegraph.pl input for the given profiles: `frame;frame;... microseconds` lines."""
+    merged = defaultdict(float)
+    for path in paths:
+        stacks, _ = collapse(pstats.Stats(path))
+        for frames, seconds in stacks.items():
+            merged[frames] += seconds
+    return [f"{';'.join(frame.replace(';', ',') for frame in frames)} {round(seconds * 1e6)}"
+            for frames, seconds in sorted(merged.items()) if round(seconds * 1e6)]
@@ -0,0 +1,234 @@
+"""Vectorized listing recommendations for /listings/recommended.
+
+`ListingSnapshot` keeps a columnar NumPy copy of the features we rank on
+(price, bedrooms, size, city, state, amenity bitmask, verified). Scoring a tenant
+against every listing is then a handful of array operations instead of a
+query per filter.
+
+The snapshot refreshes incrementally: committed ORM writes to Property mark
+their ids dirty and only those rows are re-read on the next request. Writes
+made outside this process (other workers, raw SQL imports) are picked up by a
+periodic full rebuild every `max_age` seconds.
+"""
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from db.db_tables import Property, PropertyAmenity
+
+# Relative importance of each signal in the final score
+WEIGHTS = {
+    "price": 3.0,
+    "bedrooms": 2.0,
+    "location": 3.0,
+    "amenities": 1.5,
+    "saved_price": 1.0,
+    "saved_size": 0.5,
+    "verified": 0.5,
+}
+
+_FEATURE_SQL = """
+    SELECT id, price, bedrooms, size_sqft, LOWER(city), LOWER(state), status
+    FROM properties {where} ORDER BY id
+"""
+
+
+# popcount-style lookup: _BYTE_BITS[v, b] is 1 when bit b of byte v is set
+_BYTE_BITS = ((np.arange(256)[:, None] >> np.arange(8)) & 1).astype(np.float32)
+
+_COLUMNS = ("ids", "price", "bedrooms", "sqft", "city", "state", "verified", "alive")
+
+
+class ListingSnapshot:
+    def __init__(self, max_age=300, capacity=1024):
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self._built_at = None
+        self._alloc(capacity)
+
+    def _alloc(self, capacity):
+        self.size = 0
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.price = np.zeros(capacity, dtype=np.float32)
+        self.bedrooms = np.zeros(capacity, dtype=np.int16)
+        self.sqft = np.zeros(capacity, dtype=np.float32)
+        self.city = np.full(capacity, -1, dtype=np.int32)
+        self.state = np.full(capacity, -1, dtype=np.int32)
+        self.verified = np.zeros(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+        # 64-bit amenity mask stored as 8 contiguous byte planes, so scoring
+        # can use 256-entry lookup tables instead of per-bit shifts
+        self.amenity_bytes = np.zeros((8, capacity), dtype=np.uint8)
+        self.row_of = {}
+        self.places = {}
+        self.amenity_bits = {}
+
+    def _grow(self):
+        capacity = len(self.ids) * 2
+        for name in _COLUMNS:
+            old = getattr(self, name)
+            new = np.full(capacity, -1, dtype=old.dtype) if name in ("city", "state") else np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        planes = np.zeros((8, capacity), dtype=np.uint8)
+        planes[:, :self.amenity_bytes.shape[1]] = self.amenity_bytes
+        self.amenity_bytes = planes
+
+    def _code(self, place):
+        if place is None:
+            return -1
+        return self.places.setdefault(place, len(self.places))
+
+    def _mask(self, keys):
+        mask = 0
+        for key in keys:
+            bit = self.amenity_bits.get(key)
+            if bit is None and len(self.amenity_bits) < 64:
+                bit = self.amenity_bits[key] = len(self.amenity_bits)
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    def _load(self, conn, ids=None):
+        """Read feature rows (all, or just `ids`) and write them into the arrays."""
+        where = f"WHERE id IN ({','.join(str(int(i)) for i in ids)})" if ids else ""
+        rows = conn.execute(text(_FEATURE_SQL.format(where=where))).fetchall()
+        amenity_where = f"WHERE property_id IN ({','.join(str(int(i)) for i in ids)})" if ids else ""
+        keys = {}
+        for property_id, key in conn.execute(text(f"SELECT property_id, key FROM property_amenities {amenity_where}")):
+            keys.setdefault(property_id, []).append(key)
+
+        seen = set()
+        for property_id, price, bedrooms, sqft, city, state, status in rows:
+            seen.add(property_id)
+            row = self.row_of.get(property_id)
+            if row is None:
+                if self.size == len(self.ids):
+                    self._grow()
+                row = self.row_of[property_id] = self.size
+                self.size += 1
+            self.ids[row] = property_id
+            self.price[row] = price or 0
+            self.bedrooms[row] = bedrooms or 0
+            self.sqft[row] = sqft or 0
+            self.city[row] = self._code(city)
+            self.state[row] = self._code(state)
+            self.amenity_bytes[:, row] = list(self._mask(keys.get(property_id, ())).to_bytes(8, "little"))
+            self.verified[row] = status == 'verified'
+            self.alive[row] = True
+        for property_id in (ids or ()):
+            if property_id not in seen and property_id in self.row_of:
+                self.alive[self.row_of[property_id]] = False
+
+    def mark_dirty(self, property_ids):
+        with self._lock:
+            self._dirty.update(property_ids)
+
+    def refresh(self, conn):
+        """Full rebuild when stale, otherwise re-read only the dirty rows."""
+        with self._lock:
+            if self._built_at is None or time.monotonic() - self._built_at > self.max_age:
+                self._alloc(max(len(self.ids), 1024))
+                self._load(conn)
+                self._dirty.clear()
+                self._built_at = time.monotonic()
+            elif self._dirty:
+                dirty, self._dirty = self._dirty, set()
+                self._load(conn, sorted(dirty))
+
+    @staticmethod
+    def _closeness(values, target, weight, out):
+        """out += weight * max(0, 1 - |values - target| / target), in place."""
+        d = np.subtract(values, target, dtype=np.float32)
+        np.abs(d, out=d)
+        d *= -1.0 / max(target, 1)
+        d += 1
+        np.clip(d, 0, 1, out=d)
+        d *= weight
+        out += d
+
+    def score(self, prefs=None, saved_ids=(), k=10):
+        """Return [(property_id, score)] for the top-k listings, best first."""
+        with self._lock:
+            n = self.size
+            alive = self.alive[:n].copy()
+            price = self.price[:n]
+            score = np.zeros(n, dtype=np.float32)
+
+            if prefs is not None:
+                if prefs.min_rent or prefs.max_rent:
+                    # 1 inside [min, max], fading to 0 a quarter of the budget outside it
+                    lo = prefs.min_rent or 0
+                    hi = prefs.max_rent or np.inf
+                    gap = np.subtract(lo, price)
+                    np.maximum(gap, 0, out=gap)
+                    over = np.subtract(price, hi)
+                    np.maximum(over, 0, out=over)
+                    gap += over
+                    gap *= -1.0 / (0.25 * max(prefs.max_rent or prefs.min_rent, 1))
+                    gap += 1
+                    np.clip(gap, 0, 1, out=gap)
+                    gap *= WEIGHTS["price"]
+                    score += gap
+                if prefs.min_bedrooms:
+                    # halve the bonus for every bedroom short of the minimum
+                    table = WEIGHTS["bedrooms"] * np.power(0.5, np.maximum(prefs.min_bedrooms - np.arange(64), 0)).astype(np.float32)
+                    score += table[np.clip(self.bedrooms[:n], 0, 63)]
+                if prefs.preferred_location:
+                    code = self.places.get(prefs.preferred_location.strip().lower(), -2)
+                    score[self.city[:n] == code] += WEIGHTS["location"]
+                    score[self.state[:n] == code] += 0.5 * WEIGHTS["location"]
+
+            # Affinity with what the tenant already saved: shared amenities, similar rent and size
+            saved_rows = [self.row_of[i] for i in saved_ids if i in self.row_of]
+            if saved_rows:
+                # fraction of saved listings having each amenity bit, per byte plane
+                bit_weight = _BYTE_BITS[self.amenity_bytes[:, saved_rows]].mean(axis=1)
+                total = bit_weight.sum()
+                if total:
+                    scale = WEIGHTS["amenities"] / total
+                    for plane in np.flatnonzero(bit_weight.sum(axis=1)):
+                        lut = (_BYTE_BITS @ bit_weight[plane]) * scale
+                        score += lut[self.amenity_bytes[plane, :n]]
+                self._closeness(price, float(price[saved_rows].mean()), WEIGHTS["saved_price"], score)
+                self._closeness(self.sqft[:n], float(self.sqft[saved_rows].mean()), WEIGHTS["saved_size"], score)
+                alive[saved_rows] = False  # already on their shortlist
+
+            score[self.verified[:n]] += WEIGHTS["verified"]
+            score[~alive] = -np.inf
+
+            k = min(k, int(alive.sum()))
+            if k <= 0:
+                return []
+            top = np.argpartition(score, n - k)[n - k:]
+            top = top[np.lexsort((self.ids[top], -score[top]))]
+            return [(int(self.ids[i]), float(score[i])) for i in top]
+
+
+snapshot = ListingSnapshot()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_property_changes(session, flush_context):
+    changed = session.info.setdefault("changed_property_ids", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Property) and obj.id is not None:
+            changed.add(obj.id)
+        elif isinstance(obj, PropertyAmenity) and obj.property_id is not None:
+            changed.add(obj.property_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_property_changes(session):
+    changed = session.info.pop("changed_property_ids", None)
+    if changed:
+        snapshot.mark_dirty(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_property_changes(session):
+    session.info.pop("changed_property_ids", None)
@@ -1,29 +1,42 @@
-from flask import request, url_for, jsonify, redirect, render_template_string
+from flask import request, url_for, jsonify, redirect, render_template_string, make_response, Response, stream_with_context, current_app
 from . import api_bp
 from db.db import db
-from db.db_tables import User, TenantPreference, SavedListing, Contract, Escrow, Property, Application
+from db.db_tables import User, TenantPreference, SavedListing, Contract, Escrow, Property, Application, PropertyAmenity, amenity_key
+from db.search import search_properties as fts_search
+from db.summary import read_summary, count_inserted
+from db.catalog import read_generation
+from db.contract_states import apply_transition, TransitionError
+from db.engine import WriterBusy
+from .recommender import snapshot as recommender
+from .cache import cache, cached, invalidate_on_commit
+from .metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .sessions import tokens
+from .bulk_import import (normalize_property, read_rows, import_properties as bulk_import, ImportReport, FORMATS as IMPORT_FORMATS,
+                          DEFAULT_BATCH_SIZE as DEFAULT_IMPORT_BATCH, MAX_BATCH_SIZE as MAX_IMPORT_BATCH)
+from .export import (Export, parse_since, TABLES as EXPORT_TABLES, FORMATS as EXPORT_FORMATS,
+                     DEFAULT_CHUNK_SIZE as DEFAULT_EXPORT_CHUNK, MAX_CHUNK_SIZE as MAX_EXPORT_CHUNK)
 from datetime import datetime, timedelta
-# Genrate unique session id
-import uuid
+from contextlib import nullcontext
 import json
-
-# Store mapping session ID to user profiles
-MOCK_TOKENS = {}
+import base64
+import hashlib
+import hmac
+from sqlalchemy import tuple_, func, insert, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 
 # Just to get the redirect url
 @api_bp.route("/auth/login-mydigitalid", methods=["GET"])
 def login_mydigitalid():
-    session_id = str(uuid.uuid4())
-
-    # Mock a session id
-    MOCK_TOKENS[session_id] = {
+    # Mock a session id (single-use, expires after SESSION_TTL; see api/sessions.py)
+    session_id = tokens.issue({
         "name": "NextNation",
         "ic": "000000-00-0000",
         "email": "next_nation@gmail.com",
         "age": 25,
         "gender": "Male",
         "verified": True
-    }
+    })
 
     # redirect_url = url_for(
     #     "api_bp.mock_mydigitalid_page",
@@ -38,10 +51,9 @@ def login_mydigitalid():
 # @api_bp.route("/mock/mydigitalid", methods=["GET"])
 # def mock_mydigitalid_page():
 #     session_id = request.args.get("session")
-#     if session_id not in MOCK_TOKENS:
+#     user = tokens.consume(session_id)
+#     if user is None:
 #         return "Invalid session", 400
-#
-#     user = MOCK_TOKENS[session_id]
 #     html = f"""
 #         <html>
 #         <body>
@@ -63,20 +75,27 @@ def login_mydigitalid():
 # Callback
 @api_bp.route("/auth/callback", methods=["GET"])
 def callback():
-    token = request.args.get("token")
-    if token not in MOCK_TOKENS:
+    profile = tokens.consume(request.args.get("token"))
+    if profile is None:
         return jsonify({"error": "Invalid token"}), 400
-    profile = MOCK_TOKENS[token]
 
     # Query by IC since User model uses IC as unique identifier (not email)
-    existing = User.query.filter_by(ic=profile["ic"]).first()
-    if not existing:
-        user = User(ic=profile["ic"], name=profile["name"], age=profile["age"], gender=profile["gender"])
-        db.session.add(user)
-        db.session.commit()
-        user_id = user.id
-    else:
-        user_id = existing.id
+    user_id = tokens.user_ids.get(profile["ic"])
+    if user_id is None:
+        existing = User.query.filter_by(ic=profile["ic"]).first()
+        if not existing:
+            user = User(ic=profile["ic"], name=profile["name"], age=profile["age"], gender=profile["gender"])
+            db.session.add(user)
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # another worker registered the same IC first
+                db.session.rollback()
+                user = User.query.filter_by(ic=profile["ic"]).first()
+            user_id = user.id
+        else:
+            user_id = existing.id
+        tokens.user_ids.put(profile["ic"], user_id)
 
     return jsonify({
         "message": "MyDigitalID verified",
@@ -104,24 +123,19 @@ def register_role():
 
 # tenant get recommend lsiting based on pref
 @api_bp.get("/listings/recommended")
+@cached(lambda: ["properties", f"user:{request.args.get('user_id')}", f"saved:{request.args.get('user_id')}"])
 def get_recommended():
-    user_id = request.args.get("user_id")
+    user_id = request.args.get("user_id", type=int)
+    k = min(max(request.args.get("limit", 10, type=int), 1), 50)
 
     prefs = TenantPreference.query.filter_by(user_id=user_id).first()
+    saved_ids = [row.listing_id for row in SavedListing.query.filter_by(user_id=user_id)]
 
-    query = Property.query
-
-    if prefs:
-        if prefs.preferred_location:
-            query = query.filter_by(location=prefs.preferred_location)
-        if prefs.min_rent:
-            query = query.filter(Property.price >= prefs.min_rent)
-        if prefs.max_rent:
-            query = query.filter(Property.price <= prefs.max_rent)
-        if prefs.min_bedrooms:
-            query = query.filter(Property.bedrooms >= prefs.min_bedrooms)
-
-    results = query.limit(10).all()
+    # Score every listing in one vectorized pass, then load only the winners
+    recommender.refresh(db.session.connection())
+    ranked = recommender.score(prefs, saved_ids, k)
+    by_id = {p.id: p for p in Property.query.filter(Property.id.in_([pid for pid, _ in ranked]))} if ranked else {}
+    results = [(by_id[pid], score) for pid, score in ranked if pid in by_id]
 
     return jsonify([{
         "id": l.id,
@@ -136,8 +150,9 @@ def get_recommended():
         "property_type": l.property_type,
         "amenities": l.amenities,
         "imageUrl": l.image_url,
-        "status": l.status
-    } for l in results])
+        "status": l.status,
+        "score": round(score, 4)
+    } for l, score in results])
 
 # Tenant get to favourite the listing and also remove from fav
 @api_bp.post("/listings/save")
@@ -147,6 +162,13 @@ def save_listing():
     listing_id = data["listing_id"]
 
     saved = SavedListing.query.filter_by(user_id=user_id, listing_id=listing_id).first()
+    # `saved: true/false` sets the state outright, so a retried request can't
+    # undo itself; without it the call toggles, as older clients expect
+    wanted = bool(data.get("saved", saved is None))
+
+    if wanted == (saved is not None):
+        # already as asked: a retry, or a second tab
+        return jsonify({"message": "Added to saved listings" if wanted else "Removed from saved listings"})
 
     if saved:
         db.session.delete(saved)
@@ -155,15 +177,20 @@ def save_listing():
 
     new_saved = SavedListing(user_id=user_id, listing_id=listing_id)
     db.session.add(new_saved)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # a concurrent request saved it first (uq_saved_listings_user_listing)
+        db.session.rollback()
 
     return jsonify({"message": "Added to saved listings"})
 
 # OPTIMIZED VERSION (Using JOIN/Subquery loading)
 
-from sqlalchemy.orm import relationship, aliased
+from sqlalchemy.orm import relationship, aliased, selectinload, contains_eager
 
 @api_bp.route("/listings/saved/<int:user_id>", methods=["GET"])
+@cached(lambda user_id: [f"saved:{user_id}", "properties"])
 def get_saved_listings(user_id):
     # Retrieve the full Property objects directly by joining SavedListing and filtering.
     # This executes a single, highly efficient query.
@@ -171,7 +198,7 @@ def get_saved_listings(user_id):
     # 1. Get the IDs of all properties saved by the user in one subquery
     saved_ids = db.session.query(SavedListing.listing_id).filter(
         SavedListing.user_id == user_id
-    ).subquery()
+    ).scalar_subquery()
     
     # 2. Query the Property table for all properties whose IDs are in the saved_ids list
     properties = Property.query.filter(
@@ -217,8 +244,9 @@ def create_application():
     })
 
 @api_bp.route("/applications/<tenant_ic>", methods=["GET"])
+@cached(lambda tenant_ic: [f"tenant:{tenant_ic}", "properties"])
 def get_applications(tenant_ic):
-    apps = Application.query.filter_by(tenant_ic=tenant_ic).all()
+    apps = Application.query.options(selectinload(Application.property)).filter_by(tenant_ic=tenant_ic).all()
     return jsonify([
         {
             "application_id": a.id,
@@ -231,37 +259,39 @@ def get_applications(tenant_ic):
         for a in apps
     ])
 
-# Approve all landlord-uploaded photos for a contract
-@api_bp.route("/contracts/<contract_id>/photos/approve", methods=["POST"])
-def tenant_approve_photos(contract_id):
-    contract = Contract.query.get(contract_id)
-    if not contract:
-        return jsonify({"error": "Contract not found"}), 404
+@api_bp.errorhandler(StaleDataError)
+def _stale_write(error):
+    # Property, Application, Contract and Escrow carry a version column: the
+    # UPDATE matched no row because another request saved it after we read it
+    db.session.rollback()
+    return jsonify({"message": "Record changed by another request; please reload and retry"}), 409
 
-    # if there are no photos uploaded, reject the request
-    photos = contract.property_photos.split(",") if contract.property_photos else []
-    if not photos:
-        return jsonify({"error": "No photos to approve"}), 400
 
-    # mark photos approved and update contract status
-    contract.photos_approved = True
-    # move contract to next state awaiting signature
-    contract.status = "awaiting_tenant_signature"
-    db.session.commit()
+def _transition(contract_id, event, payload=None, error_key="error"):
+    """Run a contract state transition; returns (contract, None) or (None, error response)."""
+    try:
+        return apply_transition(contract_id, event, payload), None
+    except TransitionError as e:
+        return None, (jsonify({error_key: str(e)}), e.status_code)
+
+
+# Approve all landlord-uploaded photos for a contract
+@api_bp.route("/contracts/<int:contract_id>/photos/approve", methods=["POST"])
+def tenant_approve_photos(contract_id):
+    # needs uploaded photos; moves the contract on to awaiting_tenant_signature
+    contract, error = _transition(contract_id, "approve_photos")
+    if error:
+        return error
 
     return jsonify({"message": "Photos approved", "status": contract.status}), 200
 
 
 # Reject photos
-@api_bp.route("/contracts/<contract_id>/photos/reject", methods=["POST"])
+@api_bp.route("/contracts/<int:contract_id>/photos/reject", methods=["POST"])
 def tenant_reject_photos(contract_id):
-    contract = Contract.query.get(contract_id)
-    if not contract:
-        return jsonify({"error": "Contract not found"}), 404
-
-    contract.photos_approved = False
-    contract.status = "photos_rejected_by_tenant"
-    db.session.commit()
+    contract, error = _transition(contract_id, "reject_photos")
+    if error:
+        return error
 
     return jsonify({
         "message": "Photos rejected.",
@@ -272,36 +302,15 @@ def tenant_reject_photos(contract_id):
 # Tenant signs contract (save name, IC, timestamp, document hash)
 @api_bp.route("/contracts/<int:contract_id>/tenant/sign", methods=["POST"])
 def tenant_sign_contract(contract_id):
-    contract = Contract.query.get(contract_id)
-    if not contract:
-        return jsonify({"error": "Contract not found"}), 404
-
-    # Ensure photos were approved before tenant can sign
-    if not contract.photos_approved:
-        return jsonify({"error": "Photos must be approved before signing"}), 400
-
     data = request.get_json() or {}
-    name = data.get("name")
-    ic = data.get("ic")
-    document_hash = data.get("document_hash")  # optional
-
-    if not name or not ic:
-        return jsonify({"error": "name and ic are required for signing"}), 400
-
-    # Record signature
-    contract.tenant_signature_name = name
-    contract.tenant_signature_ic = ic
-    contract.tenant_signature_at = datetime.utcnow()
-    contract.tenant_document_hash = document_hash
-    contract.tenant_signed = True
-
-    if contract.landlord_signed:
-        contract.status = "signed"
-    else:
-        # tenant has signed; wait for landlord
-        contract.status = "tenant_signed_waiting_landlord"
-
-    db.session.commit()
+    # Photos must be approved first; the contract becomes active if the landlord already signed
+    contract, error = _transition(contract_id, "tenant_sign", {
+        "name": data.get("name"),
+        "ic": data.get("ic"),
+        "document_hash": data.get("document_hash"),  # optional
+    })
+    if error:
+        return error
 
     return jsonify({
         "message": "Contract signed by tenant",
@@ -311,34 +320,21 @@ def tenant_sign_contract(contract_id):
 # Tenant creates escrow payment
 @api_bp.route("/escrow/create", methods=["POST"])
 def create_escrow():
-    data = request.get_json()
+    data = request.get_json() or {}
 
     contract_id = data.get("contract_id")
-    amount = data.get("amount")
-
-    contract = Contract.query.get(contract_id)
-    if not contract:
+    if contract_id is None:
         return jsonify({"error": "Contract not found"}), 404
 
-    # prevent double creation
-    existing = Escrow.query.filter_by(contract_id=contract_id).first()
-    if existing:
-        return jsonify({"error": "Escrow already exists"}), 400
-
-    # For this mock flow, creating an escrow represents a completed (secured) payment
-    escrow = Escrow(
-        contract_id=contract_id,
-        amount=amount,
-        status="secured",
-        payment_method=data.get("payment_method", "FPX"),
-        paid_at=datetime.utcnow()
-    )
-    db.session.add(escrow)
-
-    # Update contract state
-    contract.status = "deposit_paid"
-    db.session.commit()
+    # Both parties must have signed; moves the contract to deposit_paid
+    contract, error = _transition(contract_id, "pay_deposit", {
+        "amount": data.get("amount"),
+        "payment_method": data.get("payment_method", "FPX"),
+    })
+    if error:
+        return error
 
+    escrow = Escrow.query.filter_by(contract_id=contract.id).first()
     return jsonify({
         "message": "Mock deposit payment created",
         "escrow": escrow.to_dict()
@@ -367,11 +363,13 @@ def escrow_request_release(escrow_id):
 @api_bp.route("/users/<string:ic>/rental-history", methods=["GET"])
 def get_rental_history(ic):
     # Fetch contracts for this tenant
-    contracts = Contract.query.filter_by(tenant_ic=ic).all()
+    contracts = Contract.query.options(
+        selectinload(Contract.property), selectinload(Contract.escrow)
+    ).filter_by(tenant_ic=ic).all()
 
     result = []
     for c in contracts:
-        escrow = Escrow.query.filter_by(contract_id=c.id).first()
+        escrow = c.escrow
 
         result.append({
             "contract": c.to_dict(),
@@ -391,47 +389,11 @@ def home():
 def add_property():
     data = request.get_json()
 
-    # Simple validation
-    if not data or 'title' not in data or 'price' not in data:
-        return jsonify({"message": "Error: Title and Price are required"}), 400
-
-    # Normalize address and optional fields
-    full_address = data.get('location') or data.get('address')
-    if not full_address:
-        full_address = f"{data.get('address', '')}, {data.get('city', '')}, {data.get('state', '')}".strip(", ")
-
-    def to_int(value, default=0):
-        try:
-            return int(value)
-        except (TypeError, ValueError):
-            return default
-
-    def to_float(value, default=0.0):
-        try:
-            return float(value)
-        except (TypeError, ValueError):
-            return default
-
-    amenities_value = data.get('amenities', '')
-    if isinstance(amenities_value, list):
-        amenities_value = ",".join(amenities_value)
-
-    image_url = data.get('imageUrl') or data.get('image_url')
-
-    new_property = Property(
-        title=data['title'],
-        description=data.get('description', ''),
-        location=full_address,
-        price=to_float(data.get('price')),
-        landlord_ic=data.get('landlord_ic'),
-        bedrooms=to_int(data.get('bedrooms', 1), 1),
-        bathrooms=to_int(data.get('bathrooms', 1), 1),
-        size_sqft=to_int(data.get('size_sqft', data.get('size', 800)), 800),
-        amenities=amenities_value,
-        property_type=data.get('housingType') or data.get('property_type'),
-        image_url=image_url,
-        status=data.get('status', 'available')
-    )
+    # Same rules as the bulk import (api/bulk_import.py)
+    try:
+        new_property = Property(**normalize_property(data))
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
     try:
         db.session.add(new_property)
@@ -440,6 +402,34 @@ def add_property():
     except Exception as e:
         return jsonify({"message": str(e)}), 500
 
+# 1b. BULK IMPORT Properties (CSV or JSONL request body, streamed)
+# e.g. curl -X POST --data-binary @units.csv -H 'Content-Type: text/csv' \
+#        '.../api/properties/import?landlord_ic=800515-01-5678&batch_size=2000'
+@api_bp.route('/properties/import', methods=['POST'])
+def import_properties():
+    fmt = request.args.get('format')
+    if not fmt:
+        fmt = 'csv' if request.mimetype in ('text/csv', 'application/csv') else 'jsonl'
+    if fmt not in IMPORT_FORMATS:
+        return jsonify({"message": f"format must be one of {sorted(IMPORT_FORMATS)}"}), 400
+    batch_size = request.args.get('batch_size', DEFAULT_IMPORT_BATCH, type=int)
+    if not 1 <= batch_size <= MAX_IMPORT_BATCH:
+        return jsonify({"message": f"batch_size must be between 1 and {MAX_IMPORT_BATCH}"}), 400
+
+    defaults = {"landlord_ic": request.args['landlord_ic']} if request.args.get('landlord_ic') else None
+    # Not queued per request (see BATCHED_WRITE_ENDPOINTS in app.py): each batch
+    # queues on its own, so other writes run between batches of a long upload
+    writer = current_app.extensions.get("sqlite_writer")
+    report = ImportReport()
+    try:
+        bulk_import(read_rows(request.stream, fmt), batch_size, defaults,
+                    batch_lock=writer.hold if writer else nullcontext, report=report)
+    except WriterBusy:
+        # the batches already committed stay; the client resends the rest
+        return jsonify({"message": "Server busy, import stopped; please retry the remaining rows",
+                        **report.to_dict()}), 503, {"Retry-After": "1"}
+    return jsonify({"message": "Import finished", **report.to_dict()}), 200
+
 # 2. UPDATE Property
 @api_bp.route('/properties/<int:id>/update', methods=['PUT'])
 def update_property(id):
@@ -472,6 +462,8 @@ def update_property(id):
         if not full_address:
             full_address = f"{data.get('address', '')}, {data.get('city', '')}, {data.get('state', '')}".strip(", ")
         property_item.location = full_address
+        if data.get('city'): property_item.city = data['city']
+        if data.get('state'): property_item.state = data['state']
 
     price_val = to_float(data.get('price'))
     if price_val is not None: property_item.price = price_val
@@ -499,6 +491,7 @@ def update_property(id):
 
     if 'status' in data: property_item.status = data['status']
 
+    # someone else saving the property first is a 409 from _stale_write
     db.session.commit()
     return jsonify({"message": "Property updated", "property": property_item.to_dict()}), 200
 
@@ -515,20 +508,156 @@ def delete_property(id):
 
 # --- TASK 2: PROPERTY RETRIEVAL ---
 
+# Conditional GET: every versioned row carries a `version` the ORM bumps on
+# UPDATE, so an ETag can be checked with a single-column lookup before any
+# row is hydrated or serialized.
+def _conditional(tag, build):
+    """Strong-ETag a GET response; 304 with no body when the client already has it."""
+    if request.if_none_match.contains(tag):
+        response = make_response('', 304)
+    else:
+        response = make_response(build())
+    response.set_etag(tag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _catalog_tag():
+    # Every property insert, update and delete bumps the catalog generation
+    # (db/catalog.py). The query string is folded in so each filter/page gets
+    # its own tag.
+    generation = read_generation(db.session.connection())
+    return hashlib.sha1(f"{request.full_path}|{generation}".encode()).hexdigest()
+
+
 # 4. GET ALL Properties
+# Keyset-paginated on (created_at, id), newest first. `?all=true` keeps the
+# legacy unpaginated list for older clients.
+PROPERTY_PAGE_SIZE = 20
+PROPERTY_PAGE_MAX = 100
+
+
+def _encode_cursor(created_at, row_id):
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor):
+    created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return datetime.fromisoformat(created_at), int(row_id)
+
+
+def _sparse(item, fields):
+    return {k: v for k, v in item.items() if k in fields} if fields else item
+
+
 @api_bp.route('/properties/all', methods=['GET'])
+@cached(lambda: ["properties"])
 def get_all_properties():
-    properties = Property.query.all()
-    result = [p.to_dict() for p in properties]
-    return jsonify(result), 200
+    return _conditional(_catalog_tag(), _property_page)
+
+
+def _property_page():
+    args = request.args
+
+    if args.get('all', '').lower() in ('1', 'true', 'yes'):
+        properties = Property.query.all()
+        result = [p.to_dict() for p in properties]
+        return jsonify(result), 200
+
+    try:
+        limit = min(max(int(args.get('limit', PROPERTY_PAGE_SIZE)), 1), PROPERTY_PAGE_MAX)
+        min_price = args.get('min_price', type=float)
+        max_price = args.get('max_price', type=float)
+        bedrooms = args.get('bedrooms', type=int)
+        min_bedrooms = args.get('min_bedrooms', type=int)
+        cursor = _decode_cursor(args['cursor']) if args.get('cursor') else None
+    except (TypeError, ValueError):
+        return jsonify({"message": "Invalid limit, cursor or filter value"}), 400
+
+    query = Property.query
+    if min_price is not None: query = query.filter(Property.price >= min_price)
+    if max_price is not None: query = query.filter(Property.price <= max_price)
+    if bedrooms is not None: query = query.filter(Property.bedrooms == bedrooms)
+    if min_bedrooms is not None: query = query.filter(Property.bedrooms >= min_bedrooms)
+    if args.get('type'): query = query.filter(Property.property_type == args['type'])
+    if args.get('status'): query = query.filter(Property.status == args['status'])
+    if args.get('city'): query = query.filter(Property.city == args['city'])
+    if args.get('landlord_ic'): query = query.filter(Property.landlord_ic == args['landlord_ic'])
+    for amenity in {amenity_key(a) for a in args.get('amenities', '').split(',') if a.strip()}:
+        query = query.filter(Property.id.in_(
+            db.select(PropertyAmenity.property_id).where(PropertyAmenity.key == amenity)))
+    if cursor:
+        query = query.filter(tuple_(Property.created_at, Property.id) < tuple_(*cursor))
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(Property.created_at.desc(), Property.id.desc()).limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = _encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+
+    fields = {f.strip() for f in args.get('fields', '').split(',') if f.strip()}
+    return jsonify({
+        "items": [_sparse(p.to_dict(), fields) for p in page],
+        "nextCursor": next_cursor,
+        "limit": limit
+    }), 200
+
+# 4b. SEARCH Properties (FTS5, BM25-ranked, with facet counts)
+@api_bp.route('/properties/search', methods=['GET'])
+def search_properties():
+    return _conditional(_catalog_tag(), _search_page)
+
+
+def _search_page():
+    args = request.args
+    try:
+        limit = min(max(int(args.get('limit', PROPERTY_PAGE_SIZE)), 1), PROPERTY_PAGE_MAX)
+        offset = max(int(args.get('offset', 0)), 0)
+        filters = {
+            'type': args.get('type') or None,
+            'status': args.get('status') or None,
+            'city': args.get('city') or None,
+            'min_price': args.get('min_price', type=float),
+            'max_price': args.get('max_price', type=float),
+            'min_bedrooms': args.get('min_bedrooms', type=int),
+        }
+    except (TypeError, ValueError):
+        return jsonify({"message": "Invalid limit, offset or filter value"}), 400
+
+    hits, facets, approximate = fts_search(db.session.connection(), args.get('q', ''), limit, offset, filters)
+
+    by_id = {p.id: p for p in Property.query.filter(Property.id.in_([h[0] for h in hits])).all()} if hits else {}
+    fields = {f.strip() for f in args.get('fields', '').split(',') if f.strip()}
+    items = []
+    for property_id, score in hits:
+        if property_id in by_id:
+            item = _sparse(by_id[property_id].to_dict(), fields)
+            item['score'] = -score  # bm25() is lower-is-better
+            items.append(item)
+
+    return jsonify({
+        "items": items,
+        # approximate: only the newest SCAN_LIMIT matches were ranked and
+        # counted (db/search.py), so total and facets are lower bounds
+        "total": sum(facets['property_type'].values()),
+        "approximate": approximate,
+        "facets": {
+            "city": facets['city'],
+            "propertyType": facets['property_type'],
+            "bedrooms": facets['bedrooms']
+        },
+        "limit": limit,
+        "offset": offset
+    }), 200
 
 # 5. GET SINGLE Property
 @api_bp.route('/properties/<int:id>', methods=['GET'])
+@cached(lambda id: [f"property:{id}"], ttl=300)
 def get_property(id):
-    property_item = Property.query.get(id)
-    if not property_item:
+    version = db.session.query(Property.version).filter_by(id=id).scalar()
+    if version is None:
         return jsonify({"message": "Property not found"}), 404
-    return jsonify(property_item.to_dict()), 200
+    return _conditional(f"property-{id}-v{version}", lambda: (jsonify(Property.query.get(id).to_dict()), 200))
 
 # --- TASK 3: APPLICATION REVIEW ---
 
@@ -536,7 +665,7 @@ def get_property(id):
 @api_bp.route('/properties/<int:property_id>/applications', methods=['GET'])
 def get_property_applications(property_id):
     # Fetch all applications where property_id matches
-    apps = Application.query.filter_by(property_id=property_id).all()
+    apps = Application.query.options(selectinload(Application.property)).filter_by(property_id=property_id).all()
 
     # Return empty list if none found, instead of 404
     if not apps:
@@ -548,10 +677,13 @@ def get_property_applications(property_id):
 # 7. GET Single Application (For Review Page)
 @api_bp.route('/applications/<int:app_id>', methods=['GET'])
 def get_application(app_id):
-    application = Application.query.get(app_id)
-    if not application:
+    # to_dict() embeds the property, so its version is part of the tag
+    versions = db.session.query(Application.version, Property.version) \
+        .outerjoin(Property, Property.id == Application.property_id).filter(Application.id == app_id).first()
+    if versions is None:
         return jsonify({"message": "Application not found"}), 404
-    return jsonify(application.to_dict()), 200
+    return _conditional(f"application-{app_id}-v{versions[0]}-p{versions[1]}",
+                        lambda: (jsonify(Application.query.get(app_id).to_dict()), 200))
 
 # 8. APPROVE Application & AUTO-GENERATE CONTRACT
 @api_bp.route('/applications/<int:app_id>/approve', methods=['POST'])
@@ -593,54 +725,147 @@ def reject_application(app_id):
     db.session.commit()
     return jsonify({"message": "Rejected", "application": application.to_dict()}), 200
 
+BULK_REVIEW_MAX = 500
+REVIEW_STATUSES = {"approve": "approved", "reject": "rejected"}
+
+# 9b. BULK REVIEW Applications
+# Body: {"decisions": [{"application_id": 1, "decision": "approve" | "reject"}, ...],
+#        "auto_reject_others": false}
+# Same effect as calling approve/reject per application, in one transaction:
+# existing contracts are looked up in one query, the new ones inserted as a
+# batch, and with auto_reject_others every other pending application for a
+# property that got an approval is rejected too.
+@api_bp.route('/applications/bulk-review', methods=['POST'])
+def bulk_review_applications():
+    data = request.get_json() or {}
+    decisions = data.get("decisions")
+    if not isinstance(decisions, list) or not decisions:
+        return jsonify({"message": "decisions must be a non-empty list"}), 400
+    if len(decisions) > BULK_REVIEW_MAX:
+        return jsonify({"message": f"At most {BULK_REVIEW_MAX} decisions per request"}), 400
+
+    results, wanted = [], {}
+    for item in decisions:
+        app_id = item.get("application_id") if isinstance(item, dict) else None
+        decision = item.get("decision") if isinstance(item, dict) else None
+        if not isinstance(app_id, int) or decision not in REVIEW_STATUSES:
+            results.append({"id": str(app_id), "error": "application_id and decision (approve/reject) are required"})
+        elif app_id in wanted:
+            results.append({"id": str(app_id), "error": "Duplicate decision"})
+        else:
+            wanted[app_id] = REVIEW_STATUSES[decision]
+            results.append({"id": str(app_id)})
+
+    # 1 query: the applications with their properties
+    applications = {a.id: a for a in Application.query.join(Application.property)
+                    .options(contains_eager(Application.property))
+                    .filter(Application.id.in_(list(wanted)))}
+    approved = [a for app_id, a in applications.items() if wanted[app_id] == "approved"]
+
+    # 1 query: contracts that already exist for the approved (property, tenant) pairs
+    pairs = {(a.property_id, a.tenant_ic) for a in approved}
+    contracts = {}
+    if pairs:
+        contracts = {(c.property_id, c.tenant_ic): c for c in
+                     Contract.query.filter(tuple_(Contract.property_id, Contract.tenant_ic).in_(list(pairs)))}
+
+    new_contracts = {}
+    now = datetime.utcnow()
+    for a in approved:
+        pair = (a.property_id, a.tenant_ic)
+        if pair not in contracts and pair not in new_contracts:
+            # Same 1-year contract as approve_application
+            new_contracts[pair] = dict(
+                property_id=a.property_id,
+                tenant_ic=a.tenant_ic,
+                landlord_ic=a.property.landlord_ic,
+                monthly_rent=a.property.price,
+                deposit_amount=a.property.price * 2,
+                start_date=now,
+                end_date=now + timedelta(days=365),
+                status='pending_photos'
+            )
+    for app_id, a in applications.items():
+        a.status = wanted[app_id]
+
+    # 1 query: the other pending applications on properties that got an approval
+    auto_rejected = []
+    if data.get("auto_reject_others") and approved:
+        auto_rejected = Application.query.filter(
+            Application.property_id.in_({a.property_id for a in approved}),
+            Application.status == 'pending',
+            Application.id.notin_(list(applications)),
+        ).all()
+        for a in auto_rejected:
+            a.status = 'rejected'
+
+    if new_contracts:
+        # 1 multi-row INSERT; the unit of work would insert them one by one,
+        # so count them in the dashboard summary and cache tags here
+        inserted = db.session.execute(insert(Contract).values(list(new_contracts.values())).returning(
+            Contract.id, Contract.property_id, Contract.tenant_ic))
+        created = []
+        for contract_id, property_id, tenant_ic in inserted:
+            contract = Contract(id=contract_id, **new_contracts[(property_id, tenant_ic)])
+            contracts[(property_id, tenant_ic)] = contract
+            created.append(contract)
+        count_inserted(db.session, created)
+        invalidate_on_commit(db.session, created)
+    db.session.flush()
+
+    # build the response before commit expires every loaded row
+    for result in results:
+        if "error" in result:
+            continue
+        app_id = int(result["id"])
+        a = applications.get(app_id)
+        if a is None:
+            result["error"] = "Application not found"
+            continue
+        result["status"] = wanted[app_id]
+        if wanted[app_id] == "approved":
+            result["contractId"] = str(contracts[(a.property_id, a.tenant_ic)].id)
+    auto_rejected = [str(a.id) for a in auto_rejected]
+    db.session.commit()
+
+    return jsonify({
+        "message": "Applications reviewed",
+        "results": results,
+        "contractsCreated": len(new_contracts),
+        "autoRejected": auto_rejected,
+    }), 200
+
 # --- TASK 4 & 5: CONTRACTS & PHOTOS ---
 
 # 10. GET SINGLE CONTRACT
 @api_bp.route('/contracts/<int:contract_id>', methods=['GET'])
 def get_contract(contract_id):
-    contract = Contract.query.get(contract_id)
-    if not contract:
+    # to_dict() embeds the property, so its version is part of the tag
+    versions = db.session.query(Contract.version, Property.version) \
+        .outerjoin(Property, Property.id == Contract.property_id).filter(Contract.id == contract_id).first()
+    if versions is None:
         return jsonify({"message": "Contract not found"}), 404
-    return jsonify(contract.to_dict()), 200
+    return _conditional(f"contract-{contract_id}-v{versions[0]}-p{versions[1]}",
+                        lambda: (jsonify(Contract.query.get(contract_id).to_dict()), 200))
 
 # 11. LANDLORD SIGN CONTRACT
 @api_bp.route('/contracts/<int:contract_id>/landlord/sign', methods=['POST'])
 def sign_contract_landlord(contract_id):
-    contract = Contract.query.get(contract_id)
-    if not contract:
-        return jsonify({"message": "Contract not found"}), 404
-
-    # Simulate Digital Signature
-    signature = f"Signed by {contract.landlord_ic} at {datetime.utcnow()}"
+    # Simulated digital signature; the contract becomes active if the tenant already signed
+    contract, error = _transition(contract_id, "landlord_sign", error_key="message")
+    if error:
+        return error
 
-    contract.landlord_signed = True
-    contract.landlord_signature_data = signature
-
-    # If both signed, make active
-    if contract.tenant_signed:
-        contract.status = 'active'
-    else:
-        contract.status = 'pending_signatures'
-
-    db.session.commit()
     return jsonify({"message": "Contract signed successfully", "contract": contract.to_dict()}), 200
 
 # 12. UPLOAD PHOTOS
 @api_bp.route('/contracts/<int:contract_id>/upload-photos', methods=['POST'])
 def upload_contract_photos(contract_id):
-    contract = Contract.query.get(contract_id)
-    if not contract:
-        return jsonify({"message": "Contract not found"}), 404
+    # mock photos; the tenant has to approve them again
+    contract, error = _transition(contract_id, "upload_photos", error_key="message")
+    if error:
+        return error
 
-    mock_photos = [
-        "https://placehold.co/600x400?text=Living+Room",
-        "https://placehold.co/600x400?text=Kitchen",
-        "https://placehold.co/600x400?text=Bedroom"
-    ]
-    contract.property_photos = ",".join(mock_photos)
-    contract.status = 'pending_tenant_approval'
-
-    db.session.commit()
     return jsonify({"message": "Photos uploaded", "contract": contract.to_dict()}), 200
 
 # TASK 6: ESCROW SYSTEM
@@ -654,9 +879,9 @@ def get_escrow_status(contract_id):
     # Logic: If contract exists but no escrow record yet, return a "Pending" placeholder
     # OR we can auto-create one. Let's return a basic status if not found.
     if not escrow:
-        return jsonify({"status": "pending", "amount": 0}), 200
+        return _conditional(f"escrow-contract-{contract_id}-none", lambda: (jsonify({"status": "pending", "amount": 0}), 200))
 
-    return jsonify(escrow.to_dict()), 200
+    return _conditional(f"escrow-{escrow.id}-v{escrow.version}", lambda: (jsonify(escrow.to_dict()), 200))
 
 # 14. APPROVE RELEASE (Landlord releases money to themselves or tenant)
 @api_bp.route('/escrow/<int:escrow_id>/approve-release', methods=['POST'])
@@ -685,99 +910,238 @@ def reject_escrow_release(escrow_id):
 
 # --- TASK 7: LANDLORD DASHBOARD ---
 
+ACTIVE_CONTRACT_STATUSES = ['active']
+# include tenant-signed-but-waiting-for-landlord in the pending group
+PENDING_CONTRACT_STATUSES = ['pending_signatures', 'pending_photos', 'pending_tenant_approval', 'tenant_signed_waiting_landlord', 'photos_rejected_by_tenant', 'deposit_paid']
+
+
+DASHBOARD_LIST_SIZE = 20
+DASHBOARD_LIST_MAX = 100
+
+
 @api_bp.route('/users/<string:ic>/landlord-dashboard', methods=['GET'])
 def get_landlord_dashboard(ic):
-    # 1. My Properties
-    properties = Property.query.filter_by(landlord_ic=ic).all()
-
-    # 2. Pending Applications
-    # (Join with Property to find apps for this landlord)
-    pending_apps = db.session.query(Application).join(Property).filter(
+    # Every list holds only its newest `limit` rows, so the response stays the
+    # same size however many listings the landlord has; `counts` carries the
+    # exact totals from the dashboard_summaries counters. Full lists page through
+    # /properties/all?landlord_ic=... and /landlord/<ic>/contracts
+    try:
+        limit = min(max(int(request.args.get('limit', DASHBOARD_LIST_SIZE)), 1), DASHBOARD_LIST_MAX)
+    except (TypeError, ValueError):
+        return jsonify({"message": "Invalid limit"}), 400
+
+    # 1 query: exact counts, one row per metric
+    counts = _dashboard_summary(ic, 'landlord')
+
+    # 1 query: the first page of /properties/all?landlord_ic=..., which
+    # `myPropertiesNextCursor` continues
+    rows = Property.query.filter_by(landlord_ic=ic) \
+        .order_by(Property.created_at.desc(), Property.id.desc()).limit(limit + 1).all()
+    properties = rows[:limit]
+    next_cursor = _encode_cursor(properties[-1].created_at, properties[-1].id) if len(rows) > limit else None
+
+    # 1 query: newest pending applications, each with its property
+    pending_apps = db.session.query(Application).join(Property).options(contains_eager(Application.property)).filter(
         Property.landlord_ic == ic,
         Application.status == 'pending'
-    ).all()
-
-    # 3. Active Contracts
-    active_contracts = Contract.query.filter_by(landlord_ic=ic, status='active').all()
-
-    # 4. Pending Contracts (Signatures, Photos, Tenant Approval)
-    # include tenant-signed-but-waiting-for-landlord in the pending group
-    pending_statuses = ['pending_signatures', 'pending_photos', 'pending_tenant_approval', 'tenant_signed_waiting_landlord', 'photos_rejected_by_tenant', 'deposit_paid']
-    pending_contracts = Contract.query.filter(
-        Contract.landlord_ic == ic,
-        Contract.status.in_(pending_statuses)
-    ).all()
+    ).order_by(Application.id.desc()).limit(limit).all()
+
+    # 1 query for both contract lists: the newest `limit` contracts of every
+    # status, each a seek on ix_contracts_landlord_ic_status, fetched once and
+    # split into the active and pending groups here
+    newest = union_all(*(
+        db.select(db.select(Contract.id).where(Contract.landlord_ic == ic, Contract.status == status)
+                  .order_by(Contract.id.desc()).limit(limit).subquery())
+        for status in ACTIVE_CONTRACT_STATUSES + PENDING_CONTRACT_STATUSES
+    ))
+    contracts = Contract.query.join(Contract.property).options(contains_eager(Contract.property)) \
+        .filter(Contract.id.in_(newest)).order_by(Contract.id.desc()).all()
+    active_contracts, pending_contracts = [], []
+    for c in contracts:
+        group = active_contracts if c.status in ACTIVE_CONTRACT_STATUSES else pending_contracts
+        if len(group) < limit:
+            group.append(c.to_dict())
 
-    # 5. Secured Escrows
-    # (Join with Contract to find escrows for this landlord)
+    # 1 query: newest secured escrows
     secured_escrows = db.session.query(Escrow).join(Contract).filter(
         Contract.landlord_ic == ic,
         Escrow.status == 'secured'
-    ).all()
+    ).order_by(Escrow.id.desc()).limit(limit).all()
 
     return jsonify({
+        "counts": counts,
         "myProperties": [p.to_dict() for p in properties],
+        "myPropertiesNextCursor": next_cursor,
         "pendingApplications": [a.to_dict() for a in pending_apps],
-        "activeContracts": [c.to_dict() for c in active_contracts],
-        "pendingContracts": [c.to_dict() for c in pending_contracts],
+        "activeContracts": active_contracts,
+        "pendingContracts": pending_contracts,
         "securedEscrows": [e.to_dict() for e in secured_escrows],
         # Provide a flat, stable `contracts` list for clients that prefer a single array
-        "contracts": [c.to_dict() for c in (active_contracts + pending_contracts)]
+        "contracts": active_contracts + pending_contracts,
+        "limit": limit
     }), 200
 
 
+# Counts only, for cheap polling: read straight from the materialized
+# dashboard_summaries counters (see db/summary.py), no rows hydrated
+def _dashboard_summary(ic, role):
+    counters = read_summary(db.session.connection(), ic, role)
+    result = {
+        "properties": counters.get('properties', (0, 0))[0],
+        "applicationsByStatus": {},
+        "contractsByStatus": {},
+        "escrowByStatus": {},
+    }
+    for metric, (count, amount) in counters.items():
+        kind, _, status = metric.partition(':')
+        if kind == 'applications':
+            result["applicationsByStatus"][status] = count
+        elif kind == 'contracts':
+            result["contractsByStatus"][status] = count
+        elif kind == 'escrow':
+            result["escrowByStatus"][status] = {"count": count, "amount": amount}
+
+    by_status = result["contractsByStatus"]
+    result["pendingApplications"] = result["applicationsByStatus"].get('pending', 0)
+    result["activeContracts"] = sum(by_status.get(s, 0) for s in ACTIVE_CONTRACT_STATUSES)
+    result["pendingContracts"] = sum(by_status.get(s, 0) for s in PENDING_CONTRACT_STATUSES)
+    # contract counters sum the monthly rent
+    result["activeMonthlyRent"] = sum(counters.get(f'contracts:{s}', (0, 0))[1] for s in ACTIVE_CONTRACT_STATUSES)
+    result["securedEscrow"] = result["escrowByStatus"].get('secured', {"count": 0, "amount": 0})
+    return result
+
+
+@api_bp.route('/users/<string:ic>/landlord-dashboard/summary', methods=['GET'])
+def get_landlord_dashboard_summary(ic):
+    return jsonify(_dashboard_summary(ic, 'landlord')), 200
+
+
+@api_bp.route('/users/<string:ic>/tenant-dashboard/summary', methods=['GET'])
+def get_tenant_dashboard_summary(ic):
+    return jsonify(_dashboard_summary(ic, 'tenant')), 200
+
+
+TENANT_HISTORY_PAGE_SIZE = 50
+TENANT_HISTORY_PAGE_MAX = 200
+
+
 @api_bp.route('/landlord/<string:ic>/tenant-history', methods=['GET'])
 def get_landlord_tenant_history(ic):
-    # 1. Fetch all contracts associated with this Landlord
-    # We order by end_date descending so the most recent history appears top
-    contracts = Contract.query.filter_by(landlord_ic=ic).order_by(Contract.end_date.desc()).all()
-
-    history_data = []
-
-    for contract in contracts:
-        # 2. Logic to find Tenant Name
-        # Since the Contract model only has tenant_ic, we try to find the name
-        # from the Application table.
-        # (Assumption: A contract usually starts from an application).
-        tenant_app = Application.query.filter_by(tenant_ic=contract.tenant_ic).first()
-        tenant_name = tenant_app.tenant_name if tenant_app else "Unknown Name"
-
-        # 3. Get Escrow Data safely
-        escrow_info = contract.escrow.to_dict() if contract.escrow else {
-            "status": "No Escrow",
-            "amount": 0,
-            "paymentMethod": "N/A"
-        }
+    # One joined query per page: contract + property + escrow + tenant name.
+    # Newest end_date first, keyset-paginated on (end_date, id); `from`/`to`
+    # keep only contracts whose period overlaps that date range.
+    args = request.args
+    try:
+        limit = min(max(int(args.get('limit', TENANT_HISTORY_PAGE_SIZE)), 1), TENANT_HISTORY_PAGE_MAX)
+        date_from = datetime.fromisoformat(args['from']) if args.get('from') else None
+        date_to = datetime.fromisoformat(args['to']) if args.get('to') else None
+        cursor = _decode_cursor(args['cursor']) if args.get('cursor') else None
+    except (TypeError, ValueError):
+        return jsonify({"message": "Invalid limit, cursor or date range"}), 400
+
+    # Tenant name: the User record by IC, else the tenant's application
+    # (preferring the one for this contract's property)
+    def application_name(*criteria):
+        return db.select(Application.tenant_name).where(
+            Application.tenant_ic == Contract.tenant_ic, *criteria
+        ).order_by(Application.id).limit(1).correlate(Contract).scalar_subquery()
+
+    tenant_name = func.coalesce(
+        User.name,
+        application_name(Application.property_id == Contract.property_id),
+        application_name(),
+        "Unknown Name"
+    )
+
+    query = db.session.query(
+        Contract.id, Contract.tenant_ic, Contract.status, Contract.start_date, Contract.end_date,
+        Contract.monthly_rent, Property.id, Property.title, Property.location, Escrow, tenant_name
+    ).join(Property, Property.id == Contract.property_id) \
+     .outerjoin(Escrow, Escrow.contract_id == Contract.id) \
+     .outerjoin(User, User.ic == Contract.tenant_ic) \
+     .filter(Contract.landlord_ic == ic)
+
+    if date_from: query = query.filter(Contract.end_date >= date_from)
+    if date_to: query = query.filter(Contract.start_date <= date_to)
+    if cursor:
+        query = query.filter(tuple_(Contract.end_date, Contract.id) < tuple_(*cursor))
+
+    rows = query.order_by(Contract.end_date.desc(), Contract.id.desc()).limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = _encode_cursor(page[-1][4], page[-1][0]) if len(rows) > limit else None
+
+    no_escrow = {"status": "No Escrow", "amount": 0, "paymentMethod": "N/A"}
+    history_data = [{
+        "contractId": contract_id,
+        "tenant": {
+            "name": name,
+            "ic": tenant_ic
+        },
+        "property": {
+            "id": property_id,
+            "title": title,
+            "location": location
+        },
+        "contractDetails": {
+            "status": status,
+            "startDate": start_date.isoformat(),
+            "endDate": end_date.isoformat(),
+            "monthlyRent": monthly_rent
+        },
+        "escrow": escrow.to_dict() if escrow else no_escrow
+    } for (contract_id, tenant_ic, status, start_date, end_date, monthly_rent,
+           property_id, title, location, escrow, name) in page]
+
+    return jsonify({
+        "items": history_data,
+        "nextCursor": next_cursor,
+        "limit": limit
+    }), 200
 
-        # 4. Build the data object
-        history_data.append({
-            "contractId": contract.id,
-            "tenant": {
-                "name": tenant_name,
-                "ic": contract.tenant_ic
-            },
-            "property": {
-                "id": contract.property.id,
-                "title": contract.property.title,
-                "location": contract.property.location
-            },
-            "contractDetails": {
-                "status": contract.status,
-                "startDate": contract.start_date.isoformat(),
-                "endDate": contract.end_date.isoformat(),
-                "monthlyRent": contract.monthly_rent
-            },
-            "escrow": escrow_info
-        })
 
-    return jsonify(history_data), 200
+CONTRACT_PAGE_SIZE = 50
+CONTRACT_PAGE_MAX = 200
+
+
+@api_bp.route('/landlord/<string:ic>/contracts', methods=['GET'])
+def get_landlord_contracts(ic):
+    # The landlord's full contract list, a page at a time: one query per page
+    # for contract + property + escrow, newest end_date first, keyset-paginated
+    # on (end_date, id) over ix_contracts_landlord_ic_end_date_id.
+    # `status` keeps only the given comma-separated statuses.
+    args = request.args
+    try:
+        limit = min(max(int(args.get('limit', CONTRACT_PAGE_SIZE)), 1), CONTRACT_PAGE_MAX)
+        cursor = _decode_cursor(args['cursor']) if args.get('cursor') else None
+    except (TypeError, ValueError):
+        return jsonify({"message": "Invalid limit or cursor"}), 400
+
+    query = Contract.query.join(Contract.property).outerjoin(Contract.escrow) \
+        .options(contains_eager(Contract.property), contains_eager(Contract.escrow)) \
+        .filter(Contract.landlord_ic == ic)
+    statuses = [s.strip() for s in args.get('status', '').split(',') if s.strip()]
+    if statuses: query = query.filter(Contract.status.in_(statuses))
+    if cursor:
+        query = query.filter(tuple_(Contract.end_date, Contract.id) < tuple_(*cursor))
+
+    rows = query.order_by(Contract.end_date.desc(), Contract.id.desc()).limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = _encode_cursor(page[-1].end_date, page[-1].id) if len(rows) > limit else None
+
+    return jsonify({
+        "items": [{"contract": c.to_dict(), "escrow": c.escrow.to_dict() if c.escrow else None} for c in page],
+        "nextCursor": next_cursor,
+        "limit": limit
+    }), 200
 
 
 # GET full contract info for a tenant
 @api_bp.route('/users/<string:ic>/contracts-full', methods=['GET'])
 def get_tenant_full_contracts(ic):
-    # Fetch all contracts for this tenant
-    contracts = Contract.query.filter_by(tenant_ic=ic).all()
+    # Fetch all contracts for this tenant, with the property and escrow each row serializes
+    contracts = Contract.query.options(
+        selectinload(Contract.property), selectinload(Contract.escrow)
+    ).filter_by(tenant_ic=ic).all()
     result = []
 
     for c in contracts:
@@ -796,58 +1160,53 @@ def get_tenant_full_contracts(ic):
     return jsonify(result), 200
 
 
-@api_bp.get("/users/<string:ic>/landlord-dashboard")
-def landlord_dashboard(ic):
-    # All contracts where landlord is this user
-    contracts = Contract.query.filter_by(landlord_ic=ic).all()
-
-    grouped = {
-        "pendingPhotos": [],
-        "pendingTenantApproval": [],
-        "awaitingTenantSignature": [],
-        "tenantSignedWaitingLandlord": [],
-        "pendingSignatures": [],
-        "activeContracts": [],
-        "depositPaid": [],
-        "completed": [],
-        "others": []
+# Response cache hit/miss counters (see api/cache.py)
+@api_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify(cache.stats()), 200
+
+
+# Per-route latency, status, SQL and response size metrics for Prometheus
+# (see api/metrics.py)
+@api_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    if not metrics.enabled:
+        return jsonify({"message": "Metrics are disabled"}), 404
+    return Response(metrics.render(), 200, {"Cache-Control": "no-store"}, content_type=METRICS_CONTENT_TYPE)
+
+
+# Streamed NDJSON / CSV dumps for finance and compliance (see api/export.py).
+# Off unless EXPORT_TOKEN is configured, and then only for callers sending it
+# as a bearer token. ?since=<X-Export-Watermark of the previous export>
+# returns only rows created or changed after it; deleted rows are not reported.
+@api_bp.route('/export/<string:table>', methods=['GET'])
+def export_table(table):
+    token = current_app.config.get("EXPORT_TOKEN")
+    if not token:
+        return jsonify({"message": "Export is disabled"}), 404
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return jsonify({"message": "Export needs a valid bearer token"}), 401, {"WWW-Authenticate": "Bearer"}
+    if table not in EXPORT_TABLES:
+        return jsonify({"message": f"table must be one of {sorted(EXPORT_TABLES)}"}), 404
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"message": f"format must be one of {sorted(EXPORT_FORMATS)}"}), 400
+    chunk_size = request.args.get('chunk_size', DEFAULT_EXPORT_CHUNK, type=int)
+    if not 1 <= chunk_size <= MAX_EXPORT_CHUNK:
+        return jsonify({"message": f"chunk_size must be between 1 and {MAX_EXPORT_CHUNK}"}), 400
+    try:
+        since = parse_since(request.args['since']) if request.args.get('since') else None
+    except ValueError:
+        return jsonify({"message": "since must be an ISO 8601 timestamp"}), 400
+
+    export = Export(table, since, chunk_size)
+    extension = 'csv' if fmt == 'csv' else 'ndjson'
+    headers = {
+        "Content-Disposition": f"attachment; filename={table}.{extension}",
+        "X-Export-Watermark": export.watermark.isoformat() if export.watermark else "",
+        "Cache-Control": "no-store",
     }
-
-    for c in contracts:
-        status = c.status
-
-        if status == "pending_photos":
-            grouped["pendingPhotos"].append(c.to_dict())
-
-        elif status == "pending_tenant_approval":
-            grouped["pendingTenantApproval"].append(c.to_dict())
-
-        elif status == "awaiting_tenant_signature":
-            grouped["awaitingTenantSignature"].append(c.to_dict())
-
-        elif status == "tenant_signed_waiting_landlord":
-            grouped["tenantSignedWaitingLandlord"].append(c.to_dict())
-
-        elif status == "pending_signatures":
-            grouped["pendingSignatures"].append(c.to_dict())
-
-        elif status == "active":
-            grouped["activeContracts"].append(c.to_dict())
-
-        elif status == "deposit_paid":
-            grouped["depositPaid"].append(c.to_dict())
-
-        elif status == "signed":
-            grouped["completed"].append(c.to_dict())
-
-        else:
-            grouped["others"].append(c.to_dict())
-
-        # Also include a flat, stable list of all contracts to simplify client consumption
-        all_contracts = []
-        for lst in grouped.values():
-            all_contracts.extend(lst)
-        grouped["contracts"] = all_contracts
-
-        return jsonify(grouped), 200
-
+    response = Response(stream_with_context(export.serialize(fmt)), 200, headers, mimetype=EXPORT_FORMATS[fmt])
+    # also ends the read transaction if the client goes away before the first chunk
+    response.call_on_close(export.close)
+    return response
@@ -0,0 +1,144 @@
+"""Login tokens for the mock MyDigitalID flow.
+
+`/auth/login-mydigitalid` issues a token and `/auth/callback` consumes it.
+Tokens expire after SESSION_TTL seconds, the store keeps at most SESSION_MAX
+of them (oldest evicted first), and a token can be consumed exactly once.
+
+Backends (SESSION_BACKEND):
+    memory  per-process; fine for the single-process dev server
+    sqlite  a table in SESSION_PATH shared by every worker on the host, so the
+            callback may land on a different worker than the login
+"""
+import json
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+from db.sqlite_conn import ThreadLocalConnection
+
+
+class TTLCache:
+    """Bounded mapping whose entries expire; evicts the least recently used."""
+
+    def __init__(self, max_size=1024, ttl=600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (value, time.time() + (self.ttl if ttl is None else ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None or entry[1] < time.time():
+            return None
+        return entry[0]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class MemoryTokenStore:
+    name = "memory"
+
+    def __init__(self, max_size=10000, ttl=600):
+        self._tokens = TTLCache(max_size, ttl)
+
+    def put(self, token, profile):
+        self._tokens.put(token, profile)
+
+    def consume(self, token):
+        return self._tokens.pop(token)
+
+    def size(self):
+        return len(self._tokens)
+
+
+class SQLiteTokenStore:
+    name = "sqlite"
+
+    def __init__(self, path, max_size=10000, ttl=600):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._conn = ThreadLocalConnection(path)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS auth_tokens ("
+            "token TEXT PRIMARY KEY, profile TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn().execute("CREATE INDEX IF NOT EXISTS ix_auth_tokens_expires_at ON auth_tokens (expires_at)")
+
+    def put(self, token, profile):
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM auth_tokens WHERE expires_at < ?", (now,))
+            conn.execute("INSERT INTO auth_tokens (token, profile, expires_at) VALUES (?, ?, ?)",
+                         (token, json.dumps(profile), now + self.ttl))
+            # keep the newest max_size tokens
+            conn.execute("DELETE FROM auth_tokens WHERE token IN (SELECT token FROM auth_tokens "
+                         "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)", (self.max_size,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def consume(self, token):
+        # DELETE ... RETURNING is atomic, so two workers can't both redeem a token
+        row = self._conn().execute(
+            "DELETE FROM auth_tokens WHERE token = ? RETURNING profile, expires_at", (token,)
+        ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def size(self):
+        return self._conn().execute("SELECT COUNT(*) FROM auth_tokens").fetchone()[0]
+
+
+class TokenStore:
+    def __init__(self):
+        self.backend = MemoryTokenStore()
+        # IC -> users.id; ICs are unique and users are never deleted
+        self.user_ids = TTLCache(max_size=4096, ttl=3600)
+
+    def configure(self, config):
+        max_size = config.get("SESSION_MAX", 10000)
+        ttl = config.get("SESSION_TTL", 600)
+        if config.get("SESSION_BACKEND", "memory") == "sqlite":
+            path = config.get("SESSION_PATH") or os.path.join(os.path.dirname(os.path.dirname(__file__)), "sessions.db")
+            self.backend = SQLiteTokenStore(path, max_size, ttl)
+        else:
+            self.backend = MemoryTokenStore(max_size, ttl)
+        self.user_ids = TTLCache(max_size=4096, ttl=3600)
+
+    def issue(self, profile):
+        token = secrets.token_urlsafe(24)
+        self.backend.put(token, profile)
+        return token
+
+    def consume(self, token):
+        return self.backend.consume(token) if token else None
+
+
+tokens = TokenStore()
@@ -1,31 +1,123 @@
 # app.py
-from flask import Flask
+import os
+import sys
+import time
+
+from flask import Flask, g, has_request_context, jsonify, request
 from flask_cors import CORS
 from db.db import db
-from api.routes import api_bp
-import os
+from db.engine import WriterBusy, WriterQueue, configure_sqlite
+from db.migrations import run_migrations
+from db.slow_queries import SlowQueryLog
+from api import api_bp
+from api.idempotency import idempotency
+from api.metrics import metrics
+from api.profiling import profiler
+from config import get_config
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+# Long write requests that take the writer queue per transaction themselves,
+# so they don't hold it (and 503 every other write) for their whole length
+BATCHED_WRITE_ENDPOINTS = {"api.import_properties"}
+
+
+def create_app(config=None):
+    """Build the Flask app. `config` is a name from config.CONFIGS, a config
+    class, or a dict of overrides applied on top of the RENTSAFE_ENV config.
+
+    Does no database work: run init_db() (or `python migrate.py`) to create or
+    upgrade the schema.
+    """
+    started = time.perf_counter()
+    app = Flask(__name__)
+
+    if isinstance(config, dict):
+        app.config.from_object(get_config())
+        app.config.update(config)
+    else:
+        app.config.from_object(get_config(config) if config is None or isinstance(config, str) else config)
+
+    # Enable CORS for frontend (Vite / React)
+    CORS(app, resources={r"/api/*": {"origins": app.config["CORS_ORIGINS"]}})
+
+    db.init_app(app)
+    if app.config["SQLITE_PRAGMAS"] is not None:
+        with app.app_context():
+            configure_sqlite(db.engine, app.config["SQLITE_PRAGMAS"])
+
+    if app.config["SLOW_QUERY_MS"] is not None:
+        with app.app_context():
+            slow_queries = SlowQueryLog(app.config["SLOW_QUERY_LOG"], app.config["SLOW_QUERY_MS"],
+                                        origin=_current_route, max_bytes=app.config["SLOW_QUERY_LOG_MAX_BYTES"],
+                                        backups=app.config["SLOW_QUERY_LOG_BACKUPS"])
+            slow_queries.install(db.engine)
+            app.extensions["slow_queries"] = slow_queries
+
+    # Replays of retried writes (Idempotency-Key) never wait for the writer queue
+    idempotency.init_app(app)
+
+    # One write transaction at a time per process, in arrival order
+    writer = None
+    if app.config["WRITER_QUEUE_TIMEOUT"] is not None:
+        writer = app.extensions["sqlite_writer"] = WriterQueue(app.config["WRITER_QUEUE_TIMEOUT"])
+
+    @app.before_request
+    def _queue_writes():
+        if writer is not None and request.method in WRITE_METHODS and request.endpoint not in BATCHED_WRITE_ENDPOINTS:
+            try:
+                writer.acquire()
+            except WriterBusy:
+                return jsonify({"message": "Server busy, please retry"}), 503, {"Retry-After": "1"}
+            g.holds_writer = True
+
+    @app.teardown_request
+    def _release_writer(exc):
+        if g.pop("holds_writer", False):
+            db.session.remove()  # end the transaction before the next writer starts
+            writer.release()
+
+    # Register API routes
+    app.register_blueprint(api_bp, url_prefix="/api")
+
+    # Opt-in cProfile of single requests (signed X-Profile header or sampling)
+    profiler.init_app(app)
+
+    # Per-route latency / SQL metrics (/api/metrics); wraps the views registered above
+    metrics.init_app(app)
+
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Create missing tables and apply pending migrations."""
+        for version, name in init_db(app):
+            print(f"✅ Applied migration {version}: {name}")
 
-app = Flask(__name__)
+    elapsed = time.perf_counter() - started
+    app.config["STARTUP_SECONDS"] = elapsed
+    if elapsed > app.config["STARTUP_BUDGET_SECONDS"]:
+        app.logger.warning("create_app took %.0f ms, over the %.0f ms budget",
+                           elapsed * 1000, app.config["STARTUP_BUDGET_SECONDS"] * 1000)
+    return app
 
-# Enable CORS for frontend (Vite / React)
-CORS(app, resources={r"/api/*": {"origins": ["http://localhost:5173", "http://127.0.0.1:5173"]}})
 
-# SQLite setup
-db_file = os.path.join(os.path.dirname(__file__), "rentsafe.db")
-app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_file}"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+def _current_route():
+    """Where a slow statement came from: the view, or the script outside a request."""
+    if has_request_context():
+        return request.endpoint.rsplit(".", 1)[-1] if request.endpoint else request.path
+    return os.path.basename(sys.argv[0]) or None
 
-db.init_app(app)
 
-# Register API routes
-app.register_blueprint(api_bp, url_prefix="/api")
+def init_db(app):
+    """Create tables, then bring older databases up to date. Returns applied migrations."""
+    with app.app_context():
+        db.create_all()
+        return run_migrations(db.engine)
 
-# Create tables immediately on startup
-with app.app_context():
-    db.create_all()
 
-print("Available Routes:")
-print(app.url_map)
+# Scripts (generate_data.py, migrate.py, ...) use `from app import app`
+app = create_app()
 
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=8889)
+    init_db(app)
+    print("Available Routes:")
+    print(app.url_map)
+    app.run(debug=app.config["DEBUG"], host="0.0.0.0", port=int(os.environ.get("PORT", 8889)))
@@ -0,0 +1,158 @@
+"""
+Concurrency benchmark: read latency with and without a steady write load.
+
+Each worker process builds its own app (like a gunicorn worker) and runs
+reader threads against GET routes while writer threads save listings and
+update properties at a fixed rate. The response cache is off, so every read
+hits SQLite. Runs against a throwaway database.
+
+    python bench_concurrency.py                      # tuned profile (WAL + writer queue)
+    python bench_concurrency.py --profile default    # driver defaults, for comparison
+    python bench_concurrency.py --processes 2 --readers 4 --writers 2 --write-rate 20 --seconds 5
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from app import create_app, init_db
+from db.db import db
+from db.db_tables import Property, User
+
+PROFILES = {
+    "tuned": {},
+    "default": {"SQLITE_PRAGMAS": None, "WRITER_QUEUE_TIMEOUT": None},
+}
+N_PROPERTIES = 200
+N_USERS = 50
+
+
+def make_app(db_path, profile):
+    return create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}", "CACHE_BACKEND": "none",
+                       "PROPAGATE_EXCEPTIONS": True, **PROFILES[profile]})
+
+
+def seed(db_path, profile):
+    app = make_app(db_path, profile)
+    init_db(app)
+    with app.app_context():
+        db.session.add_all(User(ic=f"9{i:05d}-01-0000", name=f"User {i}", age=30, gender="Male")
+                           for i in range(N_USERS))
+        db.session.add_all(Property(title=f"Unit {i}", location=f"Unit {i}, Jalan Ampang, Kuala Lumpur",
+                                    price=1500 + i, landlord_ic="800515-01-5678", amenities="WiFi, Gym")
+                           for i in range(N_PROPERTIES))
+        db.session.commit()
+        db.engine.dispose()
+
+
+def _reader(client, stop, out):
+    rng = random.Random()
+    while not stop.is_set():
+        url = rng.choice([f"/api/properties/{rng.randint(1, N_PROPERTIES)}", "/api/properties/all?limit=20"])
+        started = time.perf_counter()
+        try:
+            status = client.get(url).status_code
+        except Exception as e:
+            status = type(e).__name__
+        out["reads"].append(time.perf_counter() - started)
+        if status != 200:
+            out["read_errors"] += 1
+            out["errors"][status] += 1
+
+
+def _writer(client, stop, out, interval):
+    rng = random.Random()
+    next_at = time.perf_counter()
+    while not stop.is_set():
+        try:
+            if rng.random() < 0.5:
+                status = client.post("/api/listings/save", json={
+                    "user_id": rng.randint(1, N_USERS), "listing_id": rng.randint(1, N_PROPERTIES)}).status_code
+            else:
+                status = client.put(f"/api/properties/{rng.randint(1, N_PROPERTIES)}/update",
+                                    json={"price": rng.randint(1000, 5000)}).status_code
+        except Exception as e:
+            status = type(e).__name__
+        out["writes"] += 1
+        if status not in (200, 201):
+            out["write_errors"] += 1
+            out["errors"][status] += 1
+        next_at += interval
+        stop.wait(max(0.0, next_at - time.perf_counter()))
+
+
+def worker(db_path, profile, readers, writers, write_rate, seconds, results):
+    app = make_app(db_path, profile)
+    out = {"reads": [], "read_errors": 0, "writes": 0, "write_errors": 0, "errors": Counter()}
+    stop = threading.Event()
+    interval = writers / write_rate if write_rate else 0
+    threads = [threading.Thread(target=_reader, args=(app.test_client(), stop, out)) for _ in range(readers)]
+    threads += [threading.Thread(target=_writer, args=(app.test_client(), stop, out, interval)) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    results.put(out)
+
+
+def run_phase(db_path, profile, processes, readers, writers, write_rate, seconds):
+    ctx = multiprocessing.get_context("fork" if hasattr(os, "fork") else "spawn")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(db_path, profile, readers, writers, write_rate / processes, seconds, results))
+             for _ in range(processes)]
+    for p in procs:
+        p.start()
+    outs = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    reads = sorted(r for o in outs for r in o["reads"])
+    pct = lambda q: reads[min(int(q * len(reads)), len(reads) - 1)] * 1000 if reads else 0.0
+    return {
+        "reads_per_s": len(reads) / seconds,
+        "read_p50_ms": statistics.median(reads) * 1000 if reads else 0.0,
+        "read_p99_ms": pct(0.99),
+        "read_errors": sum(o["read_errors"] for o in outs),
+        "writes_per_s": sum(o["writes"] for o in outs) / seconds,
+        "write_errors": sum(o["write_errors"] for o in outs),
+        "errors": sum((o["errors"] for o in outs), Counter()),
+    }
+
+
+def run(profile="tuned", processes=2, readers=4, writers=2, write_rate=20, seconds=5):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "rentsafe.db")
+        seed(db_path, profile)
+        idle = run_phase(db_path, profile, processes, readers, 0, 0, seconds)
+        loaded = run_phase(db_path, profile, processes, readers, writers, write_rate, seconds)
+    return idle, loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="tuned")
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--readers", type=int, default=4, help="reader threads per process")
+    parser.add_argument("--writers", type=int, default=2, help="writer threads per process")
+    parser.add_argument("--write-rate", type=float, default=20, help="total writes per second")
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+
+    idle, loaded = run(args.profile, args.processes, args.readers, args.writers, args.write_rate, args.seconds)
+    print(f"Profile: {args.profile}")
+    print(f"{'':16}{'reads/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}{'writes/s':>10}{'errors':>8}")
+    for name, r in (("reads only", idle), ("reads + writes", loaded)):
+        print(f"{name:16}{r['reads_per_s']:>10.0f}{r['read_p50_ms']:>10.2f}{r['read_p99_ms']:>10.2f}"
+              f"{r['read_errors']:>8}{r['writes_per_s']:>10.1f}{r['write_errors']:>8}")
+    for kind, n in loaded["errors"].most_common():
+        print(f"   {n} x {kind}")
+    errors = loaded["read_errors"] + loaded["write_errors"]
+    ratio = loaded["read_p50_ms"] / idle["read_p50_ms"] if idle["read_p50_ms"] else 0
+    print(f"{'✅' if not errors else '❌'} {errors} errors under write load; read p50 x{ratio:.2f}")
@@ -0,0 +1,424 @@
+"""
+Route benchmark: ops/s, memory allocated and SQL statements per request for
+every main API route, compared against a saved baseline.
+
+Runs in-process through the Flask test client against a throwaway database
+filled by db/synthetic.py (same --properties and --seed, same data). The
+response cache is off, so every request runs its handler.
+
+    read routes   listing, search, property detail, dashboards, rental and
+                  tenant history, contracts, escrow: cycled over a fixed
+                  sample of properties, landlords and tenants
+    workflow      apply -> approve -> photos -> sign -> deposit -> release,
+                  each step timed on its own over a batch of fresh tenants
+
+Per route it records
+    ops_per_s   best of --rounds timed rounds (the least disturbed one)
+    alloc_kib   median peak memory allocated while serving one request,
+                measured by tracemalloc in a separate, untimed pass
+    queries     SQL statements per request
+    p95_ms      95th percentile latency of a read route, in its least
+                disturbed timed round
+
+A route regresses when its ops/s falls more than --tolerance below the
+baseline, its alloc_kib grows more than --alloc-tolerance, or it runs more
+queries. Baselines are machine specific: save one on the machine (and with
+the dataset) you compare on. Routes in TARGETS_MS must also keep their p95
+under a fixed budget, baseline or not: run search at the size its target
+is set for with --properties 1000000 --routes properties.search.
+
+    python bench_routes.py --save                    # record bench_baseline.json
+    python bench_routes.py                           # compare; exit 1 on a regression
+    python bench_routes.py --properties 20000 --rounds 7 --tolerance 0.15
+    python bench_routes.py --routes tenant,escrow    # only routes whose name starts with these
+    python bench_routes.py --save --properties 1000000 --routes properties.search --baseline /tmp/search.json
+
+--metrics-overhead times the /api/metrics instrumentation instead and fails
+when it costs a cached get_property more than METRICS_OVERHEAD_BUDGET.
+End-to-end A/B timings on a shared machine swing by more than that, so the
+two are measured apart: the instrumentation (middleware, endpoint tag and
+bookkeeping) around a WSGI app that does nothing, and get_property through
+the app's own, uninstrumented WSGI callable.
+
+    python bench_routes.py --metrics-overhead
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from werkzeug.test import EnvironBuilder
+
+from api.metrics import Metrics, _tagged
+from app import create_app, init_db
+from config import BASE_DIR
+from db.db import db
+from db.query_count import count_queries
+from db.synthetic import DEMO_LANDLORDS, DEMO_TENANTS, generate
+
+DEFAULT_BASELINE = os.path.join(BASE_DIR, "bench_baseline.json")
+SAMPLE_SIZE = 20
+
+# name -> url for the i-th request, given the sampled ids
+READ_ROUTES = {
+    "properties.list": lambda s, i: "/api/properties/all?limit=20",
+    "properties.search": lambda s, i: f"/api/properties/search?q={s['words'][i % len(s['words'])]}&limit=20",
+    "properties.search_filtered": lambda s, i: f"/api/properties/search?q={s['words'][i % len(s['words'])]}"
+                                               f"&city={s['cities'][i % len(s['cities'])]}&max_price=2500&limit=20",
+    "properties.detail": lambda s, i: f"/api/properties/{s['properties'][i % SAMPLE_SIZE]}",
+    "properties.applications": lambda s, i: f"/api/properties/{s['properties'][i % SAMPLE_SIZE]}/applications",
+    "landlord.dashboard": lambda s, i: f"/api/users/{s['landlords'][i % SAMPLE_SIZE]}/landlord-dashboard",
+    "landlord.dashboard_summary":
+        lambda s, i: f"/api/users/{s['landlords'][i % SAMPLE_SIZE]}/landlord-dashboard/summary",
+    "landlord.tenant_history": lambda s, i: f"/api/landlord/{s['landlords'][i % SAMPLE_SIZE]}/tenant-history",
+    "tenant.dashboard_summary": lambda s, i: f"/api/users/{s['tenants'][i % SAMPLE_SIZE]}/tenant-dashboard/summary",
+    "tenant.rental_history": lambda s, i: f"/api/users/{s['tenants'][i % SAMPLE_SIZE]}/rental-history",
+    "tenant.applications": lambda s, i: f"/api/applications/{s['tenants'][i % SAMPLE_SIZE]}",
+    "tenant.contracts_full": lambda s, i: f"/api/users/{s['tenants'][i % SAMPLE_SIZE]}/contracts-full",
+    "tenant.saved_listings": lambda s, i: f"/api/listings/saved/{s['tenant_ids'][i % len(s['tenant_ids'])]}",
+    "contract.detail": lambda s, i: f"/api/contracts/{s['contracts'][i % SAMPLE_SIZE]}",
+    "escrow.detail": lambda s, i: f"/api/escrow/{s['contracts'][i % SAMPLE_SIZE]}",
+}
+
+# One tenant's way through the contract lifecycle, in order:
+# name -> (method, url, json body, expected status) for that tenant's state
+WORKFLOW = {
+    "application.create": lambda t: ("POST", "/api/applications/create",
+                                     {"tenant_ic": t["ic"], "property_id": t["property_id"]}, 200),
+    "application.approve": lambda t: ("POST", f"/api/applications/{t['application_id']}/approve", None, 200),
+    "contract.upload_photos": lambda t: ("POST", f"/api/contracts/{t['contract_id']}/upload-photos", None, 200),
+    "contract.approve_photos": lambda t: ("POST", f"/api/contracts/{t['contract_id']}/photos/approve", None, 200),
+    "contract.tenant_sign": lambda t: ("POST", f"/api/contracts/{t['contract_id']}/tenant/sign",
+                                       {"name": t["name"], "ic": t["ic"]}, 200),
+    "contract.landlord_sign": lambda t: ("POST", f"/api/contracts/{t['contract_id']}/landlord/sign", None, 200),
+    "escrow.create": lambda t: ("POST", "/api/escrow/create",
+                                {"contract_id": t["contract_id"], "amount": t["deposit"]}, 201),
+    "escrow.request_release": lambda t: ("POST", f"/api/escrow/{t['escrow_id']}/request-release", None, 200),
+    "escrow.approve_release": lambda t: ("POST", f"/api/escrow/{t['escrow_id']}/approve-release", None, 200),
+}
+ROUTES = list(READ_ROUTES) + list(WORKFLOW)
+
+# p95 latency budgets (ms) from the requests that set them: search under 50 ms at 1M listings
+TARGETS_MS = {"properties.search": 50, "properties.search_filtered": 50}
+
+# fraction of a cached get_property the metrics instrumentation may cost
+METRICS_OVERHEAD_BUDGET = 0.02
+
+
+class BenchError(Exception):
+    """A route answered with an unexpected status: the numbers would be meaningless."""
+
+
+def make_app(db_path):
+    return create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}", "CACHE_BACKEND": "none",
+                       "PROPAGATE_EXCEPTIONS": True})
+
+
+def sample(conn, seed):
+    """Fixed ids for the read routes: the demo accounts first, then a seeded pick."""
+    rng = random.Random(seed)
+
+    def pick(sql, first=()):
+        rows = [r[0] for r in conn.execute(text(sql))]
+        rest = [r for r in rows if r not in first]
+        chosen = [r for r in first if r in rows] + rng.sample(rest, min(len(rest), SAMPLE_SIZE))
+        return (chosen * SAMPLE_SIZE)[:SAMPLE_SIZE]
+
+    tenants = pick("SELECT DISTINCT tenant_ic FROM contracts ORDER BY tenant_ic", [t[0] for t in DEMO_TENANTS])
+    ids = dict(conn.execute(text("SELECT ic, id FROM users")).all())
+    return {
+        "properties": pick("SELECT id FROM properties ORDER BY id"),
+        "landlords": pick("SELECT DISTINCT landlord_ic FROM contracts ORDER BY landlord_ic",
+                          [l[0] for l in DEMO_LANDLORDS]),
+        "tenants": tenants,
+        "tenant_ids": [ids[ic] for ic in tenants if ic in ids] or [1],
+        "contracts": pick("SELECT contract_id FROM escrow ORDER BY contract_id"),
+        # broad words on purpose: each matches a large share of the generated catalog
+        "words": ["condo", "kuala+lumpur", "furnished", "penang", "studio", "pool+gym", "jalan+ampang"],
+        "cities": ["Kuala+Lumpur", "Petaling+Jaya", "Ipoh"],
+    }
+
+
+def _send(client, method, url, body, expected):
+    response = client.open(url, method=method, json=body)
+    if response.status_code != expected:
+        raise BenchError(f"{method} {url} -> {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    return response
+
+
+def _timed(client, requests):
+    """(seconds, responses, per-request ms) to send `requests` [(method, url, body, expected)]."""
+    responses, latencies = [], []
+    started = time.perf_counter()
+    for request in requests:
+        sent = time.perf_counter()
+        responses.append(_send(client, *request))
+        latencies.append((time.perf_counter() - sent) * 1000)
+    return time.perf_counter() - started, responses, latencies
+
+
+def _traced(engine, client, requests):
+    """(median tracemalloc peak in KiB per request, SQL statements per request,
+    responses) for an untimed pass over `requests`."""
+    peaks, responses = [], []
+    tracemalloc.start()
+    try:
+        with count_queries(engine) as statements:
+            for request in requests:
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                responses.append(_send(client, *request))
+                peaks.append((tracemalloc.get_traced_memory()[1] - before) / 1024)
+    finally:
+        tracemalloc.stop()
+    return statistics.median(peaks), round(len(statements) / len(requests), 2), responses
+
+
+def bench_reads(engine, client, ids, names, rounds, round_seconds):
+    results = {}
+    for name in names:
+        url = READ_ROUTES[name]
+        requests = lambda n: [("GET", url(ids, i), None, 200) for i in range(n)]
+        # warm up and calibrate: enough requests per round to fill round_seconds
+        warmup, _, _ = _timed(client, requests(SAMPLE_SIZE))
+        per_round = max(SAMPLE_SIZE, round(round_seconds / (warmup / SAMPLE_SIZE)))
+        timed = [_timed(client, requests(per_round)) for _ in range(rounds)]
+        best = min(seconds for seconds, _, _ in timed)
+        p95 = min(statistics.quantiles(latencies, n=20)[-1] for _, _, latencies in timed)
+        alloc_kib, queries, _ = _traced(engine, client, requests(SAMPLE_SIZE))
+        results[name] = {"ops_per_s": per_round / best, "alloc_kib": alloc_kib, "queries": queries, "p95_ms": p95}
+    return results
+
+
+def _new_tenants(conn, batch, round_no, seed):
+    """`batch` fresh tenants, each to apply for a different, uncontracted property."""
+    rng = random.Random(seed * 1000 + round_no)
+    free = [r[0] for r in conn.execute(text(
+        "SELECT id FROM properties WHERE id NOT IN (SELECT property_id FROM contracts) ORDER BY id"))]
+    tenants = []
+    for i, property_id in enumerate(rng.sample(free, batch)):
+        ic = f"99{round_no:04d}-99-{i:04d}"
+        conn.execute(text("INSERT INTO users (ic, name, age, gender, role) VALUES (:ic, :name, 30, 'Male', 'tenant')"),
+                     {"ic": ic, "name": f"Bench {round_no}.{i}"})
+        tenants.append({"ic": ic, "name": f"Bench {round_no}.{i}", "property_id": property_id})
+    conn.commit()
+    return tenants
+
+
+def _advance(conn, step, tenants, responses):
+    """Note the ids a step created, for the steps after it."""
+    if step == "application.create":
+        for tenant, response in zip(tenants, responses):
+            tenant["application_id"] = response.json["application_id"]
+    elif step == "application.approve":
+        for tenant in tenants:
+            tenant["contract_id"], tenant["deposit"] = conn.execute(text(
+                "SELECT id, deposit_amount FROM contracts WHERE tenant_ic = :ic"), {"ic": tenant["ic"]}).one()
+        conn.rollback()
+    elif step == "escrow.create":
+        for tenant, response in zip(tenants, responses):
+            tenant["escrow_id"] = response.json["escrow"]["id"]
+
+
+def bench_workflow(engine, client, names, rounds, batch, seed):
+    """Each round takes `batch` new tenants through every step; a step's ops/s
+    is its best round. A warm-up round comes first and a traced round last."""
+    best = dict.fromkeys(WORKFLOW, float("inf"))
+    allocations, queries = {}, {}
+    with engine.connect() as conn:
+        for round_no in range(rounds + 2):
+            tenants = _new_tenants(conn, batch, round_no, seed)
+            for step, request_for in WORKFLOW.items():
+                requests = [request_for(t) for t in tenants]
+                if round_no == rounds + 1:
+                    allocations[step], queries[step], responses = _traced(engine, client, requests)
+                else:
+                    seconds, responses, _ = _timed(client, requests)
+                    if round_no:
+                        best[step] = min(best[step], seconds)
+                _advance(conn, step, tenants, responses)
+    return {step: {"ops_per_s": batch / best[step], "alloc_kib": allocations[step], "queries": queries[step]}
+            for step in WORKFLOW if step in names}
+
+
+def run(properties=5000, seed=42, rounds=5, round_seconds=0.2, batch=30, routes=None):
+    """{"dataset": ..., "routes": {name: {ops_per_s, alloc_kib, queries}}}"""
+    names = [name for name in ROUTES if not routes or name.startswith(tuple(routes))]
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        init_db(app)
+        with app.app_context():
+            engine = db.engine
+        generate(engine, properties, seed=seed)
+        with engine.connect() as conn:
+            ids = sample(conn, seed)
+        # outside any app context: each request gets its own, and its own session, as when served
+        client = app.test_client()
+        results = bench_reads(engine, client, ids, [n for n in names if n in READ_ROUTES], rounds, round_seconds)
+        if any(name in WORKFLOW for name in names):
+            results.update(bench_workflow(engine, client, names, rounds, batch, seed))
+        engine.dispose()
+    return {
+        "dataset": {"properties": properties, "seed": seed},
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": {"python": platform.python_version(), "sqlite": sqlite3.sqlite_version,
+                    "platform": platform.platform()},
+        "routes": {name: results[name] for name in names},
+    }
+
+
+def compare(baseline, current, tolerance=0.25, alloc_tolerance=0.2):
+    """[(route, problems)] for every route measured in both; problems is a
+    list of strings, empty when the route is within tolerance."""
+    rows = []
+    for name, now in current["routes"].items():
+        then = baseline["routes"].get(name)
+        if then is None:
+            continue
+        problems = []
+        if now["ops_per_s"] < then["ops_per_s"] * (1 - tolerance):
+            problems.append(f"ops/s {now['ops_per_s'] / then['ops_per_s'] - 1:+.0%}")
+        # a few KiB of slack: small routes allocate little and vary by a block or two
+        if now["alloc_kib"] > then["alloc_kib"] * (1 + alloc_tolerance) + 4:
+            problems.append(f"alloc {now['alloc_kib'] - then['alloc_kib']:+.0f} KiB")
+        if now["queries"] > then["queries"]:
+            problems.append(f"queries {then['queries']:g} -> {now['queries']:g}")
+        rows.append((name, problems))
+    return rows
+
+
+def over_target(current):
+    """[(route, p95_ms, target_ms)] for every route over its TARGETS_MS budget."""
+    return [(name, now["p95_ms"], TARGETS_MS[name]) for name, now in current["routes"].items()
+            if name in TARGETS_MS and now["p95_ms"] > TARGETS_MS[name]]
+
+
+def best_per_call(fn, n, rounds=5):
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(n):
+            fn()
+        best = min(best, (time.perf_counter() - started) / n)
+    return best
+
+
+def metrics_overhead(calls=20000, requests=2000):
+    """(instrumentation cost / get_property cost, get_property seconds)"""
+    def start_response(status, headers, exc_info=None):
+        pass
+
+    def respond(environ, start_response):
+        view()
+        start_response("200 OK", [("Content-Type", "application/json"), ("Content-Length", "2")])
+        return [b"{}"]
+
+    view = _tagged("api.get_property", lambda: None)
+    instrumented = Metrics()._middleware(None, respond, "/api/")
+    environ = EnvironBuilder(path="/api/properties/1").get_environ()
+    cost = best_per_call(lambda: instrumented(dict(environ), start_response), calls) \
+        - best_per_call(lambda: respond(dict(environ), start_response), calls)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # the response cache stays on: a cached read is the cheapest request to add overhead to
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'rentsafe.db')}",
+                          "PROPAGATE_EXCEPTIONS": True})
+        init_db(app)
+        with app.app_context():
+            engine = db.engine
+        generate(engine, 1)
+        with engine.connect() as conn:
+            property_id = conn.execute(text("SELECT min(id) FROM properties")).scalar()
+        bare = app.wsgi_app.__wrapped__
+        environ = EnvironBuilder(path=f"/api/properties/{property_id}",
+                                 headers={"Origin": "http://localhost:5173"}).get_environ()
+        request_seconds = best_per_call(lambda: b"".join(bare(dict(environ), start_response)), requests)
+        engine.dispose()
+    return cost / request_seconds, request_seconds
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--properties", type=int, default=5000, help="dataset size (db/synthetic.py)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per route; the best counts")
+    parser.add_argument("--round-seconds", type=float, default=0.2, help="length of a read-route round")
+    parser.add_argument("--batch", type=int, default=30, help="tenants per workflow round")
+    parser.add_argument("--routes", type=lambda s: s.split(","), help="comma-separated route name prefixes")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed ops/s drop (0.25 = 25%%)")
+    parser.add_argument("--alloc-tolerance", type=float, default=0.2, help="allowed alloc_kib growth")
+    parser.add_argument("--metrics-overhead", action="store_true",
+                        help="time the /api/metrics instrumentation against get_property instead")
+    args = parser.parse_args(argv)
+
+    if args.metrics_overhead:
+        overhead, per_request = metrics_overhead()
+        if overhead < METRICS_OVERHEAD_BUDGET:
+            print(f"✅ Metrics overhead on get_property {overhead:+.1%} ({per_request * 1e6:.0f} µs per request)")
+            return 0
+        print(f"❌ Metrics overhead on get_property is {overhead:.1%} (budget {METRICS_OVERHEAD_BUDGET:.0%})")
+        return 1
+
+    baseline = None
+    if not args.save:
+        if not os.path.exists(args.baseline):
+            print(f"❌ No baseline at {args.baseline}; record one with --save")
+            return 1
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["dataset"] != {"properties": args.properties, "seed": args.seed}:
+            print(f"❌ The baseline was recorded with --properties {baseline['dataset']['properties']} "
+                  f"--seed {baseline['dataset']['seed']}; run with those or --save a new one")
+            return 1
+
+    print(f"⏱️  Benchmarking on {args.properties} properties (seed {args.seed}), best of {args.rounds} rounds...")
+    try:
+        current = run(args.properties, args.seed, args.rounds, args.round_seconds, args.batch, args.routes)
+    except BenchError as e:
+        print(f"❌ {e}")
+        return 1
+
+    rows = dict(compare(baseline, current, args.tolerance, args.alloc_tolerance)) if baseline else {}
+    slow = over_target(current)
+    for name, _, target in slow:
+        rows.setdefault(name, []).append(f"p95 over the {target} ms target")
+    print(f"\n{'route':28}{'ops/s':>10}{'vs base':>9}{'p95 ms':>8}{'alloc KiB':>11}{'queries':>9}")
+    for name, now in current["routes"].items():
+        then = baseline["routes"].get(name) if baseline else None
+        delta = f"{now['ops_per_s'] / then['ops_per_s'] - 1:+.0%}" if then else ""
+        p95 = f"{now['p95_ms']:.1f}" if "p95_ms" in now else ""
+        flag = ("  ❌ " + ", ".join(rows[name])) if rows.get(name) else ""
+        print(f"{name:28}{now['ops_per_s']:>10.0f}{delta:>9}{p95:>8}{now['alloc_kib']:>11.0f}{now['queries']:>9g}{flag}")
+
+    if slow:
+        print(f"\n❌ {len(slow)} routes over their latency target: {', '.join(name for name, _, _ in slow)}")
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n✅ Baseline saved to {args.baseline}")
+        return 1 if slow else 0
+    regressed = [name for name, problems in rows.items() if problems]
+    missing = [name for name in current["routes"] if name not in baseline["routes"]]
+    if missing:
+        print(f"\n⚠️  Not in the baseline (re-save it): {', '.join(missing)}")
+    if regressed:
+        print(f"\n❌ {len(regressed)} routes regressed beyond tolerance: {', '.join(regressed)}")
+        return 1
+    print(f"\n✅ {len(rows)} routes within tolerance of the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,414 @@
+"""
+Workflow load test: many tenants and their landlords through the whole rental
+lifecycle at once, over HTTP, against a locally started server.
+
+Each simulated tenant walks the flow of test_final_flow.py, with the
+landlord's steps in between:
+
+    browse -> apply -> landlord reviews and approves -> find the contract ->
+    landlord uploads photos -> approve photos -> sign -> landlord signs ->
+    pay deposit -> request release -> landlord releases
+
+--concurrency tenants are in flight at a time, each pausing a random
+(exponential, mean --think seconds) think time before every step. A tenant
+whose request fails gives up at that step.
+
+The server runs on a throwaway database filled by db/synthetic.py plus one
+user per simulated tenant: gunicorn with gunicorn.conf.py (--workers x
+--threads) when it is installed, else Werkzeug's threaded server (a single
+process). Or start your own and pass --url with --database, its SQLite file:
+the simulated tenants are registered there, and the final checks read it.
+
+Reported: lifecycles and requests per second, p50/p95/p99/max latency per
+step, and errors per step and kind:
+    busy      503 from the writer queue (WRITER_QUEUE_TIMEOUT)
+    conflict  409: a contract transition lost its compare-and-swap retries
+    http NNN  any other unexpected status
+plus "database is locked" errors counted in the server's log. Then the final
+state is checked: one escrow per contract, no contract or escrow in an
+unknown status, no escrow without its contract, no approved application
+without a contract, no contract contradicting its signatures
+(db/contract_states.impossible_states), dashboard counters matching a recount
+(db/summary.check_summaries), and every completed lifecycle released.
+Exit status 1 when a final-state check fails.
+
+    python bench_workflow.py                                      # 500 tenants, 16 at a time
+    python bench_workflow.py --tenants 5000 --concurrency 64 --workers 4 --threads 8
+    python bench_workflow.py --server werkzeug --concurrency 8 --think 0.5
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+from sqlalchemy import create_engine, text
+
+from app import create_app, init_db
+from config import BASE_DIR
+from db.contract_states import BOTH_SIGNED, impossible_states
+from db.db import db
+from db.summary import check_summaries
+from db.synthetic import CONTRACT_STATUSES, ESCROW_STATUSES, generate
+
+STEPS = [
+    "properties.list", "properties.detail", "application.create", "applications.review", "application.approve",
+    "tenant.contracts_full", "contract.upload_photos", "contract.approve_photos", "contract.tenant_sign",
+    "contract.landlord_sign", "escrow.create", "escrow.request_release", "escrow.approve_release",
+]
+KNOWN_CONTRACT_STATUSES = {status for status, *_ in CONTRACT_STATUSES} | BOTH_SIGNED
+KNOWN_ESCROW_STATUSES = {status for status, _ in ESCROW_STATUSES}
+
+_WERKZEUG = """
+import sys
+from werkzeug.serving import run_simple
+from wsgi import app
+from app import init_db
+init_db(app)
+run_simple("127.0.0.1", int(sys.argv[1]), app, threaded=True)
+"""
+
+
+def tenant_ic(n):
+    return f"97{n // 10000:04d}-97-{n % 10000:04d}"
+
+
+def prepare(db_path, properties, seed):
+    """Create and fill a fresh database."""
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}"})
+    init_db(app)
+    with app.app_context():
+        engine = db.engine
+    generate(engine, properties, seed=seed)
+    engine.dispose()
+
+
+def add_tenants(db_path, tenants, seed):
+    """Register `tenants` new users, numbered on from earlier runs, each with
+    a property to apply for; returns [{ic, name, property_id}]."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    rng = random.Random(seed)
+    try:
+        with engine.begin() as conn:
+            first = conn.execute(text("SELECT COUNT(*) FROM users WHERE ic LIKE '97%-97-%'")).scalar()
+            property_ids = [r[0] for r in conn.execute(text("SELECT id FROM properties ORDER BY id"))]
+            people = [{"ic": tenant_ic(n), "name": f"Load Tenant {n}", "property_id": rng.choice(property_ids)}
+                      for n in range(first, first + tenants)]
+            conn.execute(text("INSERT INTO users (ic, name, age, gender, role) "
+                              "VALUES (:ic, :name, 30, 'Female', 'tenant')"),
+                         [{"ic": p["ic"], "name": p["name"]} for p in people])
+    finally:
+        engine.dispose()
+    return people
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(kind, db_path, tmp, workers, threads):
+    """(process, url, log path) of a server on `db_path`, once it answers."""
+    port = free_port()
+    env = dict(os.environ,
+               RENTSAFE_DATABASE_URL=f"sqlite:///{db_path}",
+               RENTSAFE_CACHE_PATH=os.path.join(tmp, "cache.db"),
+               RENTSAFE_SESSION_PATH=os.path.join(tmp, "sessions.db"),
+               RENTSAFE_IDEMPOTENCY_PATH=os.path.join(tmp, "idempotency.db"),
+               RENTSAFE_METRICS_DIR=os.path.join(tmp, "metrics"),
+               RENTSAFE_BIND=f"127.0.0.1:{port}",
+               RENTSAFE_WORKERS=str(workers),
+               RENTSAFE_THREADS=str(threads))
+    if kind == "gunicorn":
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"]
+    else:
+        command = [sys.executable, "-c", _WERKZEUG, str(port)]
+    log_path = os.path.join(tmp, "server.log")
+    with open(log_path, "w") as log:
+        process = subprocess.Popen(command, cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            if Client(url).request("GET", "/api/")[0] == 200:
+                return process, url, log_path
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    with open(log_path) as log:
+        raise RuntimeError(f"{kind} did not start:\n{log.read()[-2000:]}")
+
+
+class Client:
+    """One keep-alive HTTP connection, like one browser tab."""
+
+    def __init__(self, url, timeout=60):
+        parts = urlsplit(url)
+        self.host, self.port, self.timeout = parts.hostname, parts.port or 80, timeout
+        self.conn = None
+
+    def request(self, method, path, body=None):
+        """(status, parsed JSON body or None)."""
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.conn.request(method, path, payload, headers)
+                response = self.conn.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                # the server closed an idle keep-alive connection before reading the request
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+
+class Tenant:
+    """One simulated tenant (and their landlord) through the lifecycle."""
+
+    def __init__(self, client, person, think, rng, stats):
+        self.client, self.person, self.think, self.rng, self.stats = client, person, think, rng, stats
+
+    def step(self, name, method, path, body=None, expected=200):
+        if self.think:
+            time.sleep(self.rng.expovariate(1 / self.think))
+        started = time.perf_counter()
+        try:
+            status, data = self.client.request(method, path, body)
+        except OSError as e:
+            self.stats.failed(name, type(e).__name__, time.perf_counter() - started)
+            return None
+        seconds = time.perf_counter() - started
+        if status != expected:
+            kind = {503: "busy", 409: "conflict"}.get(status, f"http {status}")
+            self.stats.failed(name, kind, seconds)
+            return None
+        self.stats.observe(name, seconds)
+        return data if data is not None else {}
+
+    def run(self):
+        """True when the whole lifecycle went through."""
+        ic, property_id = self.person["ic"], self.person["property_id"]
+        if self.step("properties.list", "GET", "/api/properties/all?limit=20") is None:
+            return False
+        if self.step("properties.detail", "GET", f"/api/properties/{property_id}") is None:
+            return False
+        created = self.step("application.create", "POST", "/api/applications/create",
+                            {"tenant_ic": ic, "property_id": property_id, "message": "Load test"})
+        if created is None:
+            return False
+        if self.step("applications.review", "GET", f"/api/properties/{property_id}/applications") is None:
+            return False
+        if self.step("application.approve", "POST", f"/api/applications/{created['application_id']}/approve") is None:
+            return False
+        contracts = self.step("tenant.contracts_full", "GET", f"/api/users/{ic}/contracts-full")
+        if contracts is None:
+            return False
+        contract = next((c["contract"] for c in contracts if c["contract"]["propertyId"] == str(property_id)), None)
+        if contract is None:
+            self.stats.failed("tenant.contracts_full", "no contract", 0.0)
+            return False
+        contract_id = contract["id"]
+        for name, path, body in (
+            ("contract.upload_photos", f"/api/contracts/{contract_id}/upload-photos", None),
+            ("contract.approve_photos", f"/api/contracts/{contract_id}/photos/approve", None),
+            ("contract.tenant_sign", f"/api/contracts/{contract_id}/tenant/sign",
+             {"name": self.person["name"], "ic": ic}),
+            ("contract.landlord_sign", f"/api/contracts/{contract_id}/landlord/sign", None),
+        ):
+            if self.step(name, "POST", path, body) is None:
+                return False
+        paid = self.step("escrow.create", "POST", "/api/escrow/create",
+                         {"contract_id": int(contract_id), "amount": contract["depositAmount"]}, expected=201)
+        if paid is None:
+            return False
+        escrow_id = paid["escrow"]["id"]
+        if self.step("escrow.request_release", "POST", f"/api/escrow/{escrow_id}/request-release") is None:
+            return False
+        return self.step("escrow.approve_release", "POST", f"/api/escrow/{escrow_id}/approve-release") is not None
+
+
+class Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = Counter()  # (step, kind) -> count
+        self.completed = []  # tenant ICs
+
+    def observe(self, step, seconds):
+        self.latencies[step].append(seconds)  # list.append is atomic
+
+    def failed(self, step, kind, seconds):
+        with self._lock:
+            self.errors[step, kind] += 1
+
+
+def run_load(url, people, concurrency, think, seed):
+    """Stats after every person has run (or given up), and the wall time."""
+    stats = Stats()
+    pending = iter(people)
+    take = threading.Lock()
+
+    def user(n):
+        client, rng = Client(url), random.Random(seed * 1000 + n)
+        while True:
+            with take:
+                person = next(pending, None)
+            if person is None:
+                return
+            if Tenant(client, person, think, rng, stats).run():
+                stats.completed.append(person["ic"])
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return stats, time.perf_counter() - started
+
+
+def check_final_state(db_path, people, completed):
+    """[(check, problems)]: an empty problem list means the check passed."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    try:
+        with engine.connect() as conn:
+            def rows(sql, **params):
+                return [tuple(r) for r in conn.execute(text(sql), params)]
+
+            done = set(completed)
+            ours = {p["ic"] for p in people}
+            ended = [r for r in rows("SELECT c.tenant_ic, c.status, e.status FROM contracts c "
+                                     "LEFT JOIN escrow e ON e.contract_id = c.id WHERE c.tenant_ic LIKE '97%-97-%'")
+                     if r[0] in ours]
+            return [
+                ("one escrow per contract", rows(
+                    "SELECT contract_id, COUNT(*) FROM escrow GROUP BY contract_id HAVING COUNT(*) > 1")),
+                ("no contract in an unknown status", [
+                    r for r in rows("SELECT id, status FROM contracts") if r[1] not in KNOWN_CONTRACT_STATUSES]),
+                ("no escrow in an unknown status", [
+                    r for r in rows("SELECT id, status FROM escrow") if r[1] not in KNOWN_ESCROW_STATUSES]),
+                ("no escrow without its contract", rows(
+                    "SELECT e.id FROM escrow e LEFT JOIN contracts c ON c.id = e.contract_id WHERE c.id IS NULL")),
+                ("no approved application without a contract", rows(
+                    "SELECT a.id FROM applications a WHERE a.status = 'approved' AND NOT EXISTS ("
+                    "SELECT 1 FROM contracts c WHERE c.property_id = a.property_id AND c.tenant_ic = a.tenant_ic)")),
+                ("one contract per tenant", [r for r in Counter(ic for ic, _, _ in ended).items() if r[1] > 1]),
+                ("no contract contradicting its signatures", impossible_states(conn)),
+                ("dashboard counters match a recount", check_summaries(conn)),
+                ("completed lifecycles ended released", [
+                    r for r in ended if r[0] in done and (r[1], r[2]) != ("deposit_paid", "released")]
+                    + [(ic, "missing") for ic in done - {r[0] for r in ended}]),
+            ]
+    finally:
+        engine.dispose()
+
+
+def percentile(values, q):
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+def report(stats, seconds, people, concurrency, locked):
+    requests = sum(len(v) for v in stats.latencies.values()) + sum(stats.errors.values())
+    failed = len(people) - len(stats.completed)
+    print(f"\n🏁 {len(people)} lifecycles ({len(stats.completed)} completed, {failed} gave up) in {seconds:.1f}s "
+          f"with {concurrency} concurrent tenants")
+    print(f"   {len(stats.completed) / seconds:.1f} lifecycles/s, {requests / seconds:.0f} requests/s\n")
+    print(f"{'step':26}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+    for step in STEPS:
+        values = sorted(stats.latencies.get(step, ()))
+        errors = sum(n for (name, _), n in stats.errors.items() if name == step)
+        if not values:
+            print(f"{step:26}{0:>7}{'':>36}{errors:>8}")
+            continue
+        print(f"{step:26}{len(values):>7}{statistics.median(values) * 1000:>9.1f}"
+              f"{percentile(values, 0.95) * 1000:>9.1f}{percentile(values, 0.99) * 1000:>9.1f}"
+              f"{values[-1] * 1000:>9.1f}{errors:>8}")
+    if stats.errors:
+        print("\nErrors:")
+        for (step, kind), n in stats.errors.most_common():
+            print(f"   {n} × {step}: {kind}")
+    lock_errors = sum(n for (_, kind), n in stats.errors.items() if kind in ("busy", "conflict"))
+    print(f"\n🔒 {lock_errors} busy/conflict responses"
+          + (f", {locked} 'database is locked' errors in the server log" if locked is not None else ""))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=500, help="simulated tenants (lifecycles)")
+    parser.add_argument("--concurrency", type=int, default=16, help="tenants in flight at once")
+    parser.add_argument("--think", type=float, default=0.05, help="mean think time before each step, seconds")
+    parser.add_argument("--properties", type=int, default=2000, help="dataset size (db/synthetic.py)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--server", choices=["auto", "gunicorn", "werkzeug"], default="auto")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--threads", type=int, default=4, help="gunicorn threads per worker")
+    parser.add_argument("--url", help="use a running server instead of starting one")
+    parser.add_argument("--database", help="with --url: the server's SQLite file (tenants are added to it)")
+    args = parser.parse_args(argv)
+
+    kind = args.server
+    if kind == "auto":
+        try:
+            import gunicorn  # noqa: F401
+            kind = "gunicorn"
+        except ImportError:
+            kind = "werkzeug"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        process = log_path = None
+        if args.url:
+            if not args.database:
+                parser.error("--url needs --database: the simulated tenants are registered in it")
+            url, db_path = args.url, args.database
+            people = add_tenants(db_path, args.tenants, args.seed)
+            print(f"🎯 Using the server at {url}")
+        else:
+            db_path = os.path.join(tmp, "rentsafe.db")
+            print(f"📦 Generating {args.properties} properties and {args.tenants} tenants...")
+            prepare(db_path, args.properties, args.seed)
+            people = add_tenants(db_path, args.tenants, args.seed)
+            process, url, log_path = start_server(kind, db_path, tmp, args.workers, args.threads)
+            shape = f"{args.workers} workers × {args.threads} threads" if kind == "gunicorn" else "one process"
+            print(f"🚀 {kind} ({shape}) at {url}")
+        try:
+            stats, seconds = run_load(url, people, args.concurrency, args.think, args.seed)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+        locked = None
+        if log_path:
+            with open(log_path, errors="replace") as log:
+                locked = log.read().count("database is locked")
+        report(stats, seconds, people, args.concurrency, locked)
+
+        print("\nFinal state:")
+        checks = check_final_state(db_path, people, stats.completed)
+        for name, problems in checks:
+            print(f"   {'✅' if not problems else '❌'} {name}" + (f": {problems[:5]}" if problems else ""))
+        return 1 if any(problems for _, problems in checks) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,106 @@
+"""Settings for create_app(). Pick one with RENTSAFE_ENV or create_app("production")."""
+import os
+
+from db.engine import DEFAULT_PRAGMAS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Config:
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        "RENTSAFE_DATABASE_URL", f"sqlite:///{os.path.join(BASE_DIR, 'rentsafe.db')}")
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Vite / React dev server
+    CORS_ORIGINS = ["http://localhost:5173", "http://127.0.0.1:5173"]
+    CACHE_BACKEND = "memory"
+    # Login tokens (api/sessions.py): single-use, expire after SESSION_TTL seconds
+    SESSION_BACKEND = "memory"
+    SESSION_TTL = 600
+    SESSION_MAX = 10000
+    # Responses to requests sent with an Idempotency-Key (api/idempotency.py)
+    # are replayed to retries for IDEMPOTENCY_TTL seconds
+    IDEMPOTENCY_BACKEND = "memory"
+    IDEMPOTENCY_TTL = 24 * 3600
+    IDEMPOTENCY_MAX = 10000
+
+    # Per-route request metrics at /api/metrics (api/metrics.py). With several
+    # worker processes, METRICS_DIR holds each worker's snapshot so any of them
+    # can report the whole host
+    METRICS_ENABLED = True
+    METRICS_DIR = None
+    METRICS_FLUSH_SECONDS = 1.0
+
+    # Slow-query log (db/slow_queries.py): statements slower than SLOW_QUERY_MS
+    # are logged with their route, redacted parameters and query plan.
+    # Opt-in: None disables it
+    SLOW_QUERY_MS = float(os.environ["RENTSAFE_SLOW_QUERY_MS"]) if os.environ.get("RENTSAFE_SLOW_QUERY_MS") else None
+    SLOW_QUERY_LOG = os.environ.get("RENTSAFE_SLOW_QUERY_LOG", os.path.join(BASE_DIR, "slow_queries.log"))
+    SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+    SLOW_QUERY_LOG_BACKUPS = 5
+
+    # On-demand profiling (api/profiling.py): requests with an X-Profile header
+    # signed with PROFILE_SECRET, and 1 in PROFILE_SAMPLE_RATE others, run
+    # under cProfile; PROFILE_DIR keeps the newest PROFILE_MAX_FILES profiles.
+    # Opt-in: no secret and a rate of 0 install nothing
+    PROFILE_SECRET = os.environ.get("RENTSAFE_PROFILE_SECRET") or None
+    PROFILE_SAMPLE_RATE = int(os.environ.get("RENTSAFE_PROFILE_SAMPLE_RATE") or 0)
+    PROFILE_DIR = os.environ.get("RENTSAFE_PROFILE_DIR", os.path.join(BASE_DIR, "profiles"))
+    PROFILE_MAX_FILES = 200
+
+    # Table dumps at /api/export/<table> (api/export.py) need an
+    # "Authorization: Bearer <EXPORT_TOKEN>" header.
+    # Opt-in: with no token the route answers 404
+    EXPORT_TOKEN = os.environ.get("RENTSAFE_EXPORT_TOKEN") or None
+
+    # SQLite engine profile (db/engine.py): pragmas run on every connection
+    # (None keeps the driver defaults), and the pool holds one connection per
+    # worker thread plus headroom
+    SQLITE_PRAGMAS = DEFAULT_PRAGMAS
+    WORKER_THREADS = int(os.environ.get("RENTSAFE_THREADS", 4))
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": WORKER_THREADS + 1,
+        "max_overflow": WORKER_THREADS,
+        "pool_timeout": 10,
+    }
+    # Seconds a write request may queue behind other writers before a 503
+    # (None disables the writer queue)
+    WRITER_QUEUE_TIMEOUT = 10.0
+
+    # A fresh worker must be able to serve traffic within this many seconds
+    STARTUP_BUDGET_SECONDS = 1.0
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+
+
+class ProductionConfig(Config):
+    DEBUG = False
+    CORS_ORIGINS = [o for o in os.environ.get("RENTSAFE_CORS_ORIGINS", "").split(",") if o] or Config.CORS_ORIGINS
+    # Shared by every worker on the host; /dev/shm keeps it in memory
+    CACHE_BACKEND = "sqlite"
+    CACHE_PATH = os.environ.get(
+        "RENTSAFE_CACHE_PATH",
+        "/dev/shm/rentsafe-cache.db" if os.path.isdir("/dev/shm") else os.path.join(BASE_DIR, "cache.db"))
+    # A login may be redeemed on any worker
+    SESSION_BACKEND = "sqlite"
+    SESSION_PATH = os.environ.get(
+        "RENTSAFE_SESSION_PATH",
+        "/dev/shm/rentsafe-sessions.db" if os.path.isdir("/dev/shm") else os.path.join(BASE_DIR, "sessions.db"))
+    # Retries may land on any worker, and stored responses survive a restart
+    IDEMPOTENCY_BACKEND = "sqlite"
+    IDEMPOTENCY_PATH = os.environ.get("RENTSAFE_IDEMPOTENCY_PATH", os.path.join(BASE_DIR, "idempotency.db"))
+    # Scrapes may land on any worker
+    METRICS_DIR = os.environ.get(
+        "RENTSAFE_METRICS_DIR",
+        "/dev/shm/rentsafe-metrics" if os.path.isdir("/dev/shm") else os.path.join(BASE_DIR, "metrics"))
+
+
+CONFIGS = {
+    "development": DevelopmentConfig,
+    "production": ProductionConfig,
+}
+
+
+def get_config(name=None):
+    return CONFIGS[name or os.environ.get("RENTSAFE_ENV", "development")]
@@ -0,0 +1,37 @@
+"""Catalog generation: one counter that changes with every property write.
+
+The listing and search ETags are built from it, so deciding that a client's
+copy of the catalog is current is a single-row lookup however many listings
+there are. An after_flush hook bumps it on the same connection whenever a
+Property is inserted, updated or deleted, so the bump commits or rolls back
+with the write. Writes that bypass the ORM (bulk imports, the synthetic
+loader) must call `bump_generation` in their transaction.
+"""
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from db.db_tables import Property
+
+_BUMP = text("""
+    INSERT INTO catalog_generation (id, generation) VALUES (1, 1)
+    ON CONFLICT (id) DO UPDATE SET generation = generation + 1
+""")
+
+
+def bump_generation(conn):
+    conn.execute(_BUMP)
+
+
+def read_generation(conn):
+    """The current generation; 0 before the first property write."""
+    return conn.execute(text("SELECT generation FROM catalog_generation WHERE id = 1")).scalar() or 0
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_property_write(session, flush_context):
+    touched = (any(isinstance(obj, Property) for obj in session.new) or
+               any(isinstance(obj, Property) for obj in session.deleted) or
+               any(isinstance(obj, Property) and session.is_modified(obj, include_collections=False)
+                   for obj in session.dirty))
+    if touched:
+        bump_generation(session.connection())
@@ -0,0 +1,210 @@
+"""Contract state machine.
+
+Every contract status change goes through `apply_transition(contract_id,
+event, payload)`. TRANSITIONS lists, per event, the statuses it may start from,
+the status it leads to and any guard/effect. The change is written as a
+compare-and-swap: Contract.version is the mapper's version_id_col, so the
+UPDATE carries `WHERE id = :id AND version = :read_version` and matches no
+row if anyone changed the contract after we read it. On such a conflict the
+transaction is rolled back and, after a short jittered backoff, the
+transition is re-evaluated against a fresh read, up to `retries` times.
+
+Successful transitions are announced on the `contract_transitioned` signal
+(sender: the contract; kwargs: event, from_status, to_status).
+"""
+import random
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from blinker import Namespace
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm.exc import StaleDataError
+
+from db.db import db
+from db.db_tables import Contract, Escrow
+
+contract_transitioned = Namespace().signal("contract-transitioned")
+
+# "signed" is what older builds stored when the tenant signed second
+BOTH_SIGNED = {"active", "signed"}
+
+MOCK_PHOTOS = [
+    "https://placehold.co/600x400?text=Living+Room",
+    "https://placehold.co/600x400?text=Kitchen",
+    "https://placehold.co/600x400?text=Bedroom",
+]
+
+# sources: statuses the event may start from
+# target:  next status, or fn(contract) -> status
+# action:  verb phrase for errors, read as "Cannot <action> a contract in status ..."
+# guard:   fn(contract, payload) -> error message, or None to allow
+# effect:  fn(contract, payload) applying the event's other column changes
+Transition = namedtuple("Transition", "sources target action guard effect", defaults=(None, None))
+
+
+def _upload_photos(contract, payload):
+    contract.property_photos = ",".join(payload.get("photos") or MOCK_PHOTOS)
+    contract.photos_approved = False
+
+
+def _has_photos(contract, payload):
+    return None if contract.property_photos else "No photos to approve"
+
+
+def _approve_photos(contract, payload):
+    contract.photos_approved = True
+
+
+def _reject_photos(contract, payload):
+    contract.photos_approved = False
+
+
+def _can_tenant_sign(contract, payload):
+    if not contract.photos_approved:
+        return "Photos must be approved before signing"
+    if not payload.get("name") or not payload.get("ic"):
+        return "name and ic are required for signing"
+    return None
+
+
+def _tenant_sign(contract, payload):
+    contract.tenant_signature_name = payload["name"]
+    contract.tenant_signature_ic = payload["ic"]
+    contract.tenant_signature_at = datetime.utcnow()
+    contract.tenant_document_hash = payload.get("document_hash")
+    contract.tenant_signed = True
+
+
+def _landlord_sign(contract, payload):
+    contract.landlord_signed = True
+    contract.landlord_signature_data = f"Signed by {contract.landlord_ic} at {datetime.utcnow()}"
+
+
+def _no_escrow_yet(contract, payload):
+    if payload.get("amount") is None:
+        return "amount is required"
+    if Escrow.query.filter_by(contract_id=contract.id).first():
+        return "Escrow already exists"
+    return None
+
+
+def _pay_deposit(contract, payload):
+    # For this mock flow, creating an escrow represents a completed (secured) payment
+    db.session.add(Escrow(
+        contract_id=contract.id,
+        amount=payload["amount"],
+        status="secured",
+        payment_method=payload.get("payment_method", "FPX"),
+        paid_at=datetime.utcnow(),
+    ))
+
+
+TRANSITIONS = {
+    "upload_photos": Transition(
+        {"pending_photos", "pending_tenant_approval", "photos_rejected_by_tenant"},
+        "pending_tenant_approval", "upload photos for", effect=_upload_photos),
+    "approve_photos": Transition(
+        {"pending_tenant_approval", "photos_rejected_by_tenant"},
+        "awaiting_tenant_signature", "approve the photos of", _has_photos, _approve_photos),
+    "reject_photos": Transition(
+        {"pending_tenant_approval"},
+        "photos_rejected_by_tenant", "reject the photos of", effect=_reject_photos),
+    "tenant_sign": Transition(
+        {"awaiting_tenant_signature", "pending_signatures"},
+        lambda c: "active" if c.landlord_signed else "tenant_signed_waiting_landlord",
+        "have the tenant sign", _can_tenant_sign, _tenant_sign),
+    # the landlord may sign first, but only once the tenant has approved the
+    # photos; otherwise the contract would stall in pending_signatures
+    "landlord_sign": Transition(
+        {"awaiting_tenant_signature", "tenant_signed_waiting_landlord"},
+        lambda c: "active" if c.tenant_signed else "pending_signatures",
+        "have the landlord sign", effect=_landlord_sign),
+    "pay_deposit": Transition(
+        BOTH_SIGNED,
+        "deposit_paid", "pay the deposit for", _no_escrow_yet, _pay_deposit),
+}
+
+
+class TransitionError(Exception):
+    """The event is not allowed for the contract as it stands (HTTP 400/409)."""
+    status_code = 409
+
+
+class GuardFailed(TransitionError):
+    status_code = 400
+
+
+class ContractNotFound(TransitionError):
+    status_code = 404
+
+
+class TransitionConflict(TransitionError):
+    """Lost the compare-and-swap on every attempt."""
+
+
+def _is_conflict(error):
+    # IntegrityError: a concurrent transition inserted the same unique row
+    # (uq_escrow_contract_id); the retry's guard reports it
+    if isinstance(error, (StaleDataError, IntegrityError)):
+        return True
+    # WAL: our read snapshot went stale before we could take the write lock
+    return isinstance(error, OperationalError) and "locked" in str(error.orig)
+
+
+def apply_transition(contract_id, event, payload=None, retries=3):
+    """Apply `event` to a contract and commit; returns the updated contract."""
+    transition = TRANSITIONS[event]
+    payload = payload or {}
+    for attempt in range(retries + 1):
+        contract = db.session.get(Contract, contract_id, populate_existing=True)
+        if contract is None:
+            raise ContractNotFound("Contract not found")
+        from_status = contract.status
+        if from_status not in transition.sources:
+            raise TransitionError(f"Cannot {transition.action} a contract in status '{from_status}'")
+        error = transition.guard(contract, payload) if transition.guard else None
+        if error:
+            raise GuardFailed(error)
+
+        if transition.effect:
+            transition.effect(contract, payload)
+        contract.status = transition.target(contract) if callable(transition.target) else transition.target
+        try:
+            db.session.commit()
+        except (StaleDataError, IntegrityError, OperationalError) as e:
+            db.session.rollback()
+            if not _is_conflict(e):
+                raise
+            time.sleep(random.uniform(0, 0.01 * (attempt + 1)))  # let the winner finish
+            continue
+
+        contract_transitioned.send(contract, event=event, from_status=from_status, to_status=contract.status)
+        return contract
+    raise TransitionConflict(f"Contract {contract_id} changed concurrently; please retry")
+
+
+def impossible_states(conn):
+    """Return [(contract id, status, reason)] for contracts whose status
+    contradicts their signature/photo/escrow columns."""
+    rules = [
+        ("status says both signed but a signature is missing",
+         "status IN ('active', 'signed') AND NOT (tenant_signed AND landlord_signed)"),
+        ("both signed but status lags behind",
+         "tenant_signed AND landlord_signed AND status NOT IN ('active', 'signed', 'deposit_paid')"),
+        ("waiting for landlord without a tenant-only signature",
+         "status = 'tenant_signed_waiting_landlord' AND NOT (tenant_signed AND NOT landlord_signed)"),
+        ("pending signatures without a landlord-only signature",
+         "status = 'pending_signatures' AND NOT (landlord_signed AND NOT tenant_signed)"),
+        ("signing with unapproved photos",
+         "(tenant_signed OR landlord_signed OR status IN ('awaiting_tenant_signature', 'pending_signatures')) "
+         "AND NOT photos_approved"),
+        ("deposit paid without an escrow",
+         "status = 'deposit_paid' AND NOT EXISTS (SELECT 1 FROM escrow e WHERE e.contract_id = contracts.id)"),
+    ]
+    problems = []
+    for reason, condition in rules:
+        for contract_id, status in conn.execute(text(f"SELECT id, status FROM contracts WHERE {condition}")):
+            problems.append((contract_id, status, reason))
+    return problems
@@ -1,7 +1,11 @@
 from db.db import db
+from db.search import install_search_index, drop_search_index
 from sqlalchemy import UniqueConstraint
+from sqlalchemy import event
 from sqlalchemy import func
+from sqlalchemy.orm import validates
 from datetime import datetime
+import re
 
 
 class User(db.Model):
@@ -26,6 +30,9 @@ class User(db.Model):
 
 class SavedListing(db.Model):
     __tablename__= "saved_listings"
+    __table_args__ = (
+        db.Index("uq_saved_listings_user_listing", "user_id", "listing_id", unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
     listing_id = db.Column(db.Integer, db.ForeignKey("properties.id"))
@@ -33,7 +40,7 @@ class SavedListing(db.Model):
 class TenantPreference(db.Model):
     __tablename__ = "tenant_preferences"
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"))
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), index=True)
 
     preferred_location = db.Column(db.String(200), nullable=True)
     min_rent = db.Column(db.Integer, nullable=True)
@@ -49,8 +56,56 @@ class TenantPreference(db.Model):
 #     apply_date = db.Column(db.Date)
 #     status = db.Column(db.String(50))
 
+# Canonical labels for the amenities offered in the landlord form. Keys are
+# what PropertyAmenity stores and what ?amenities= filters match on.
+AMENITY_LABELS = {
+    'wifi': 'WiFi',
+    'air_conditioning': 'Air Conditioning',
+    'swimming_pool': 'Swimming Pool',
+    'gym': 'Gym',
+    'security': 'Security',
+    'parking': 'Parking',
+    'garden': 'Garden',
+    'playground': 'Playground',
+    'near_schools': 'Near Schools',
+    'washing_machine': 'Washing Machine',
+    'smart_home': 'Smart Home',
+    'concierge': 'Concierge',
+}
+AMENITY_ALIASES = {'pool': 'swimming_pool', 'wi_fi': 'wifi', 'aircon': 'air_conditioning', 'ac': 'air_conditioning'}
+
+
+def amenity_key(name):
+    key = re.sub(r'[^a-z0-9]+', '_', name.strip().lower()).strip('_')
+    return AMENITY_ALIASES.get(key, key)
+
+
+def normalize_amenities(value):
+    """Turn a comma string or list into unique [(key, label)], keeping order."""
+    names = value.split(',') if isinstance(value, str) else (value or [])
+    result, seen = [], set()
+    for name in names:
+        key = amenity_key(str(name))
+        if key and key not in seen:
+            seen.add(key)
+            result.append((key, AMENITY_LABELS.get(key, str(name).strip())))
+    return result
+
+
+def split_location(location):
+    """(city, state) from a comma-separated address, as the frontend has always shown them."""
+    parts = [p.strip() for p in (location or '').split(',')]
+    if len(parts) == 1:
+        return location, "Malaysia"
+    return parts[1], parts[-1]
+
+
 class Property(db.Model):
     __tablename__ = 'properties'
+    __table_args__ = (
+        db.Index('ix_properties_created_at_id', 'created_at', 'id'),
+        db.Index('ix_properties_landlord_ic_created_at_id', 'landlord_ic', 'created_at', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
@@ -65,26 +120,49 @@ class Property(db.Model):
     image_url = db.Column(db.String(255), nullable=True)
     status = db.Column(db.String(20), default='available')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped by the ORM on every UPDATE; drive ETags (see api/routes.py)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    __mapper_args__ = {'version_id_col': version}
+    # Derived at write time from location / amenities (see validators below)
+    city = db.Column(db.String(100), nullable=True, index=True)
+    state = db.Column(db.String(100), nullable=True)
+    amenity_rows = db.relationship('PropertyAmenity', lazy='selectin', cascade='all, delete-orphan',
+                                   order_by='PropertyAmenity.position')
+
+    @validates('location')
+    def _derive_city_state(self, key, value):
+        self.city, self.state = split_location(value)
+        return value
+
+    @validates('amenities')
+    def _normalize_amenities(self, key, value):
+        existing = {a.key: a for a in self.amenity_rows}
+        rows = []
+        for position, (amenity, label) in enumerate(normalize_amenities(value)):
+            row = existing.get(amenity) or PropertyAmenity(key=amenity)
+            row.name, row.position = label, position
+            rows.append(row)
+        self.amenity_rows = rows
+        return ", ".join(a.name for a in rows)
 
     def to_dict(self):
         """Return a frontend-friendly shape compatible with landlord pages."""
         photos = [self.image_url] if self.image_url else ["https://placehold.co/600x400"]
-        city = self.location.split(',')[1].strip() if ',' in self.location and len(self.location.split(',')) > 1 else self.location
-        state = self.location.split(',')[-1].strip() if ',' in self.location else "Malaysia"
         return {
             'id': str(self.id),
             'title': self.title,
             'description': self.description or "",
             'address': self.location,
             'location': self.location,
-            'city': city,
-            'state': state,
+            'city': self.city,
+            'state': self.state,
             'price': self.price,
             'bedrooms': self.bedrooms,
             'bathrooms': self.bathrooms,
             'size': self.size_sqft,
             'housingType': self.property_type,
-            'amenities': self.amenities.split(',') if self.amenities else [],
+            'amenities': [a.name for a in self.amenity_rows],
             'photos': photos,
             'available': self.status == 'available',
             'status': self.status or 'unverified',
@@ -94,15 +172,38 @@ class Property(db.Model):
         }
 
 
+class PropertyAmenity(db.Model):
+    __tablename__ = 'property_amenities'
+    __table_args__ = (
+        # "has pool AND gym" probes this once per amenity
+        db.Index('ix_property_amenities_key_property_id', 'key', 'property_id'),
+    )
+    property_id = db.Column(db.Integer, db.ForeignKey('properties.id', ondelete='CASCADE'), primary_key=True)
+    key = db.Column(db.String(50), primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    position = db.Column(db.Integer, default=0)
+
+
+# Keep the FTS5 search index alive across create_all()/drop_all() (generate_data.py --reset)
+event.listen(Property.__table__, 'after_create', lambda target, conn, **kw: install_search_index(conn))
+event.listen(Property.__table__, 'before_drop', lambda target, conn, **kw: drop_search_index(conn))
+
+
 # 2. APPLICATION MODEL
 class Application(db.Model):
     __tablename__ = 'applications'
+    __table_args__ = (
+        db.Index('ix_applications_property_id_status', 'property_id', 'status'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=False)
-    tenant_ic = db.Column(db.String(20), nullable=False)
+    tenant_ic = db.Column(db.String(20), nullable=False, index=True)
     tenant_name = db.Column(db.String(100), nullable=False)
     status = db.Column(db.String(20), default='pending')
     applied_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    __mapper_args__ = {'version_id_col': version}
     property = db.relationship('Property', backref=db.backref('applications', lazy=True))
 
     def to_dict(self):
@@ -120,9 +221,15 @@ class Application(db.Model):
 # 3. CONTRACT MODEL
 class Contract(db.Model):
     __tablename__ = 'contracts'
+    __table_args__ = (
+        db.Index('ix_contracts_landlord_ic_status', 'landlord_ic', 'status'),
+        db.Index('ix_contracts_property_id_tenant_ic', 'property_id', 'tenant_ic'),
+        db.Index('ix_contracts_landlord_ic_end_date_id', 'landlord_ic', 'end_date', 'id'),
+        db.Index('ix_contracts_updated_at', 'updated_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     property_id = db.Column(db.Integer, db.ForeignKey('properties.id'), nullable=False)
-    tenant_ic = db.Column(db.String(20), nullable=False)
+    tenant_ic = db.Column(db.String(20), nullable=False, index=True)
     landlord_ic = db.Column(db.String(20), nullable=False)
     monthly_rent = db.Column(db.Float, nullable=False)
     deposit_amount = db.Column(db.Float, nullable=False)
@@ -134,6 +241,9 @@ class Contract(db.Model):
     landlord_signed = db.Column(db.Boolean, default=False)
     landlord_signature_data = db.Column(db.Text, nullable=True)
     photos_approved = db.Column(db.Boolean, default=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    __mapper_args__ = {'version_id_col': version}
     property = db.relationship('Property', backref=db.backref('contracts', lazy=True))
 
     tenant_signature_name = db.Column(db.String(100), nullable=True)
@@ -170,6 +280,11 @@ class Contract(db.Model):
 # 4. ESCROW MODEL (NEW!)
 class Escrow(db.Model):
     __tablename__ = 'escrow'
+    __table_args__ = (
+        # one deposit per contract, even if two payment requests race
+        db.Index('uq_escrow_contract_id', 'contract_id', unique=True),
+        db.Index('ix_escrow_updated_at', 'updated_at'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     contract_id = db.Column(db.Integer, db.ForeignKey('contracts.id'), nullable=False)
@@ -180,6 +295,9 @@ class Escrow(db.Model):
     payment_method = db.Column(db.String(50), nullable=True)  # FPX, DuitNow
     paid_at = db.Column(db.DateTime, nullable=True)
     released_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    __mapper_args__ = {'version_id_col': version}
 
     contract = db.relationship('Contract', backref=db.backref('escrow', uselist=False))
 
@@ -194,3 +312,21 @@ class Escrow(db.Model):
             'releasedAt': self.released_at.isoformat() if self.released_at else None
         }
 
+
+# 5. DASHBOARD SUMMARY (materialized counters, maintained by db/summary.py)
+class DashboardSummary(db.Model):
+    __tablename__ = 'dashboard_summaries'
+
+    ic = db.Column(db.String(20), primary_key=True)
+    role = db.Column(db.String(20), primary_key=True)  # landlord, tenant
+    metric = db.Column(db.String(60), primary_key=True)  # e.g. contracts:active, escrow:secured
+    count = db.Column(db.Integer, nullable=False, default=0)
+    amount = db.Column(db.Float, nullable=False, default=0)
+
+
+# 6. CATALOG GENERATION (one row, bumped by every property write; see db/catalog.py)
+class CatalogGeneration(db.Model):
+    __tablename__ = 'catalog_generation'
+
+    id = db.Column(db.Integer, primary_key=True)  # always 1
+    generation = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,108 @@
+"""SQLite engine profile: per-connection pragmas and a serialized writer queue.
+
+`configure_sqlite(engine, pragmas)` runs the pragmas on every new pooled
+connection and takes over transaction control from pysqlite so a write
+transaction can start with BEGIN IMMEDIATE. Taking the write lock up front
+means a writer waits on busy_timeout instead of failing with "database is
+locked" when it upgrades from a read.
+
+`WriterQueue` serializes write transactions inside one process in arrival
+order, so concurrent writers queue rather than race for the SQLite lock.
+Other processes queue on the lock itself via busy_timeout.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+# PRAGMAs that belong to the connection, not the database file
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",        # readers never block on the writer
+    "synchronous": "NORMAL",      # fsync at checkpoints only; safe with WAL
+    "busy_timeout": 5000,         # ms to wait for another process's write lock
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64000,         # negative = KiB, i.e. 64 MB page cache
+    "temp_store": "MEMORY",
+}
+
+# True while the current request/thread holds the writer queue
+_writing = ContextVar("sqlite_writing", default=False)
+
+
+def configure_sqlite(engine, pragmas=None):
+    if engine.dialect.name != "sqlite":
+        return
+    pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, connection_record):
+        # let SQLAlchemy's "begin" event issue BEGIN itself (see below)
+        dbapi_conn.isolation_level = None
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN IMMEDIATE" if _writing.get() else "BEGIN")
+
+
+class WriterBusy(Exception):
+    """Raised when a writer waited longer than the queue timeout."""
+
+
+class WriterQueue:
+    """FIFO lock for write transactions within one process."""
+
+    def __init__(self, timeout=10.0):
+        self.timeout = timeout
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._serving = 0
+        self._abandoned = set()
+        self.waiting = 0
+        self.served = 0
+        self.max_wait = 0.0
+
+    def acquire(self):
+        started = time.perf_counter()
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            self.waiting += 1
+            try:
+                deadline = time.monotonic() + self.timeout
+                while self._serving != ticket:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._abandoned.add(ticket)
+                        raise WriterBusy(f"waited {self.timeout}s for the writer queue")
+                    self._cond.wait(remaining)
+            finally:
+                self.waiting -= 1
+        self.max_wait = max(self.max_wait, time.perf_counter() - started)
+        _writing.set(True)
+
+    def release(self):
+        _writing.set(False)
+        with self._cond:
+            self._serving += 1
+            while self._serving in self._abandoned:
+                self._abandoned.discard(self._serving)
+                self._serving += 1
+            self.served += 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def hold(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        return {"waiting": self.waiting, "served": self.served, "maxWaitMs": round(self.max_wait * 1000, 1)}
@@ -0,0 +1,232 @@
+"""Versioned schema migrations for existing SQLite databases.
+
+`db.create_all()` only creates tables that are missing, so a live
+`rentsafe.db` never picks up new indexes or columns. Each migration below
+runs once, in version order, and is recorded in `schema_migrations`.
+Migrations must be safe to run against a database that `create_all()` just
+built from the current models (use IF NOT EXISTS / column checks). Spell
+out their DDL as it stood at that version rather than creating tables from
+the models, which keep changing after the migration has shipped.
+"""
+from datetime import datetime
+from sqlalchemy import text
+from db.search import drop_search_index, install_search_index
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    """Register a migration function `fn(conn)` under a version number."""
+    def register(fn):
+        MIGRATIONS.append((version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, "
+        "name VARCHAR(100) NOT NULL, "
+        "applied_at DATETIME NOT NULL)"
+    ))
+
+
+def _has_column(conn, table, column):
+    rows = conn.execute(text(f"PRAGMA table_info({table})")).fetchall()
+    return any(r[1] == column for r in rows)
+
+
+def _add_column(conn, table, column, ddl):
+    """ALTER TABLE ADD COLUMN unless the column already exists."""
+    if not _has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def applied_versions(engine):
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        return {r[0] for r in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(engine):
+    """Apply every pending migration, each in its own transaction."""
+    done = applied_versions(engine)
+    applied = []
+    for version, name, fn in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            fn(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+                {"v": version, "n": name, "t": datetime.utcnow()},
+            )
+        applied.append((version, name))
+    return applied
+
+
+# --- Migrations ---
+
+@migration(1, "hot lookup indexes")
+def _hot_lookup_indexes(conn):
+    # saved_listings may already hold duplicate (user_id, listing_id) rows
+    # from double-clicks; keep the oldest so the unique index can be built.
+    conn.execute(text(
+        "DELETE FROM saved_listings WHERE id NOT IN ("
+        "SELECT MIN(id) FROM saved_listings GROUP BY user_id, listing_id)"
+    ))
+    for stmt in (
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_saved_listings_user_listing ON saved_listings (user_id, listing_id)",
+        "CREATE INDEX IF NOT EXISTS ix_tenant_preferences_user_id ON tenant_preferences (user_id)",
+        "CREATE INDEX IF NOT EXISTS ix_properties_landlord_ic ON properties (landlord_ic)",
+        "CREATE INDEX IF NOT EXISTS ix_applications_tenant_ic ON applications (tenant_ic)",
+        "CREATE INDEX IF NOT EXISTS ix_applications_property_id_status ON applications (property_id, status)",
+        "CREATE INDEX IF NOT EXISTS ix_contracts_tenant_ic ON contracts (tenant_ic)",
+        "CREATE INDEX IF NOT EXISTS ix_contracts_landlord_ic_status ON contracts (landlord_ic, status)",
+        "CREATE INDEX IF NOT EXISTS ix_contracts_property_id_tenant_ic ON contracts (property_id, tenant_ic)",
+        "CREATE INDEX IF NOT EXISTS ix_escrow_contract_id ON escrow (contract_id)",
+    ):
+        conn.execute(text(stmt))
+    conn.execute(text("ANALYZE"))
+
+
+@migration(2, "property keyset pagination index")
+def _property_keyset_index(conn):
+    # Keyset pages compare (created_at, id); a NULL created_at would never match.
+    conn.execute(
+        text("UPDATE properties SET created_at = :now WHERE created_at IS NULL"),
+        {"now": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S.%f")},
+    )
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_properties_created_at_id ON properties (created_at, id)"))
+
+
+@migration(3, "properties full-text search index")
+def _properties_fts(conn):
+    install_search_index(conn, rebuild=True)
+
+
+@migration(4, "precomputed property city/state and amenity rows")
+def _property_derived_columns(conn):
+    _add_column(conn, "properties", "city", "VARCHAR(100)")
+    _add_column(conn, "properties", "state", "VARCHAR(100)")
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_properties_city ON properties (city)"))
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS property_amenities ("
+        "property_id INTEGER NOT NULL, "
+        '"key" VARCHAR(50) NOT NULL, '
+        "name VARCHAR(100) NOT NULL, "
+        "position INTEGER, "
+        'PRIMARY KEY (property_id, "key"), '
+        "FOREIGN KEY(property_id) REFERENCES properties (id) ON DELETE CASCADE)"
+    ))
+    conn.execute(text('CREATE INDEX IF NOT EXISTS ix_property_amenities_key_property_id '
+                      'ON property_amenities ("key", property_id)'))
+    backfill_property_fields(conn)
+
+
+def backfill_property_fields(conn, batch_size=1000):
+    """Recompute city, state and amenity rows for every property, in id order."""
+    from db.db_tables import normalize_amenities, split_location
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            text("SELECT id, location, amenities FROM properties WHERE id > :last ORDER BY id LIMIT :n"),
+            {"last": last_id, "n": batch_size},
+        ).fetchall()
+        if not rows:
+            return
+        updates, amenity_rows = [], []
+        for row_id, location, amenities in rows:
+            city, state = split_location(location)
+            pairs = normalize_amenities(amenities)
+            updates.append({"id": row_id, "city": city, "state": state,
+                            "amenities": ", ".join(name for _, name in pairs)})
+            amenity_rows.extend({"pid": row_id, "key": key, "name": name, "pos": pos}
+                                for pos, (key, name) in enumerate(pairs))
+        conn.execute(text("UPDATE properties SET city = :city, state = :state, amenities = :amenities WHERE id = :id"), updates)
+        conn.execute(text("DELETE FROM property_amenities WHERE property_id BETWEEN :lo AND :hi"),
+                     {"lo": rows[0][0], "hi": rows[-1][0]})
+        if amenity_rows:
+            conn.execute(text("INSERT INTO property_amenities (property_id, key, name, position) "
+                              "VALUES (:pid, :key, :name, :pos)"), amenity_rows)
+        last_id = rows[-1][0]
+
+
+@migration(5, "landlord tenant-history keyset index")
+def _tenant_history_index(conn):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_contracts_landlord_ic_end_date_id ON contracts (landlord_ic, end_date, id)"
+    ))
+
+
+@migration(6, "materialized dashboard summaries")
+def _dashboard_summaries(conn):
+    from db.summary import rebuild_summaries
+
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS dashboard_summaries ("
+        "ic VARCHAR(20) NOT NULL, "
+        "role VARCHAR(20) NOT NULL, "
+        "metric VARCHAR(60) NOT NULL, "
+        "count INTEGER NOT NULL, "
+        "amount FLOAT NOT NULL, "
+        "PRIMARY KEY (ic, role, metric))"
+    ))
+    rebuild_summaries(conn)
+
+
+@migration(7, "row versions and updated_at for ETags")
+def _row_versions(conn):
+    for table, since in (("properties", "created_at"), ("applications", "applied_at"),
+                         ("contracts", "start_date"), ("escrow", "paid_at")):
+        _add_column(conn, table, "version", "INTEGER NOT NULL DEFAULT 1")
+        _add_column(conn, table, "updated_at", "DATETIME")
+        conn.execute(text(f"UPDATE {table} SET updated_at = COALESCE({since}, :now) WHERE updated_at IS NULL"),
+                     {"now": datetime.utcnow()})
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_properties_updated_at ON properties (updated_at)"))
+
+
+@migration(8, "one escrow per contract")
+def _unique_escrow(conn):
+    # unlike saved listings, duplicate deposits are money: refuse rather than pick one
+    duplicates = [r[0] for r in conn.execute(text(
+        "SELECT contract_id FROM escrow GROUP BY contract_id HAVING COUNT(*) > 1"))]
+    if duplicates:
+        raise RuntimeError(f"contracts {duplicates} have more than one escrow; resolve them before migrating")
+    conn.execute(text("DROP INDEX IF EXISTS ix_escrow_contract_id"))
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_escrow_contract_id ON escrow (contract_id)"))
+
+
+@migration(9, "updated_at indexes for incremental exports")
+def _export_indexes(conn):
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_contracts_updated_at ON contracts (updated_at)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_escrow_updated_at ON escrow (updated_at)"))
+
+
+@migration(10, "landlord property keyset index")
+def _landlord_property_index(conn):
+    # serves both "properties of a landlord" and their (created_at, id) pages
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_properties_landlord_ic_created_at_id "
+                      "ON properties (landlord_ic, created_at, id)"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_properties_landlord_ic"))
+
+
+@migration(11, "catalog generation for listing ETags")
+def _catalog_generation(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS catalog_generation ("
+        "id INTEGER NOT NULL, "
+        "generation INTEGER NOT NULL, "
+        "PRIMARY KEY (id))"
+    ))
+    conn.execute(text("INSERT OR IGNORE INTO catalog_generation (id, generation) VALUES (1, 1)"))
+
+
+@migration(12, "longer search prefix indexes")
+def _search_prefixes(conn):
+    # FTS5 fixes its prefix indexes at creation: rebuild with search.PREFIX_LENGTHS
+    drop_search_index(conn)
+    install_search_index(conn, rebuild=True)
@@ -0,0 +1,22 @@
+"""Count the SQL statements an engine executes inside a block.
+
+    with count_queries(db.engine) as statements:
+        client.get("/api/users/<ic>/contracts-full")
+    assert len(statements) <= 4
+"""
+from contextlib import contextmanager
+from sqlalchemy import event
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
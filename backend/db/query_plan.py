@@ -0,0 +1,51 @@
+"""Helpers for inspecting SQLite's EXPLAIN QUERY PLAN output."""
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import event, text
+
+# "SCAN contracts" (or "SCAN TABLE contracts" on older SQLite) reads the whole
+# table. "SCAN ... USING INDEX" walks an index in order, which is what a
+# keyset page with LIMIT wants, and "SEARCH ..." is a keyed lookup.
+_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(?!CONSTANT ROW)(\w+)$")
+
+
+def compile_query(query, dialect=None):
+    """Render an ORM query / select() to SQL text with literal parameters."""
+    stmt = getattr(query, "statement", query)
+    return str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+
+def explain(conn, sql, params=None):
+    """Return the `detail` column of EXPLAIN QUERY PLAN for a statement.
+
+    `params` is a dict for named parameters, or a tuple for a statement as
+    the driver received it (qmark style, see `recorded_statements`)."""
+    if isinstance(params, (tuple, list)):
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", tuple(params)).fetchall()
+    else:
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params or {}).fetchall()
+    return [r[-1] for r in rows]
+
+
+@contextmanager
+def recorded_statements(engine):
+    """Collect (statement, parameters) for every statement `engine` runs
+    inside the block, exactly as sent to the driver; executemany batches are
+    left out."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def full_scans(plan):
+    """Tables the plan reads with a full scan instead of an index."""
+    return [m.group(1) for m in (_FULL_SCAN.match(line) for line in plan) if m]
@@ -0,0 +1,189 @@
+"""Full-text listing search backed by an SQLite FTS5 index.
+
+`properties_fts` is an external-content FTS5 table over properties
+(title, description, location, amenities). Triggers keep it in sync on every
+INSERT/UPDATE/DELETE, so bulk writes that bypass the ORM stay searchable too.
+
+Searches stay fast however broad the query:
+  - one-letter words are ignored, and words no prefix index covers (two
+    letters, or longer than ten) match whole words only;
+  - at most SCAN_LIMIT matches, the newest, are ranked and counted into
+    facets; a query matching more is answered from those and flagged
+    `approximate`;
+  - words found in SCAN_LIMIT listings or more select results but do not
+    rank them: bm25() reads a word's whole doclist to weigh it, and such a
+    word's weight is close to zero anyway.
+"""
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+# A prefix query of a length without its own prefix index reads and merges
+# every matching term's doclist up front: "furnished"* took 12 ms at 1M rows
+# without one and well under a millisecond with one.
+PREFIX_LENGTHS = (3, 4, 5, 6, 7, 8, 9, 10)
+
+FTS_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS properties_fts USING fts5(
+        title, description, location, amenities,
+        content='properties', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='{" ".join(map(str, PREFIX_LENGTHS))}'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS properties_fts_ai AFTER INSERT ON properties BEGIN
+        INSERT INTO properties_fts (rowid, title, description, location, amenities)
+        VALUES (new.id, new.title, new.description, new.location, new.amenities);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS properties_fts_ad AFTER DELETE ON properties BEGIN
+        INSERT INTO properties_fts (properties_fts, rowid, title, description, location, amenities)
+        VALUES ('delete', old.id, old.title, old.description, old.location, old.amenities);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS properties_fts_au AFTER UPDATE OF title, description, location, amenities ON properties BEGIN
+        INSERT INTO properties_fts (properties_fts, rowid, title, description, location, amenities)
+        VALUES ('delete', old.id, old.title, old.description, old.location, old.amenities);
+        INSERT INTO properties_fts (rowid, title, description, location, amenities)
+        VALUES (new.id, new.title, new.description, new.location, new.amenities);
+    END""",
+]
+
+# Column weights for bm25(): title and location matter more than free text.
+BM25_WEIGHTS = "10.0, 1.0, 5.0, 2.0"
+# Shorter words are dropped: "a"* would merge a large part of the vocabulary.
+MIN_TERM_LENGTH = 2
+# Matches ranked and faceted per search, newest first; also the number of
+# listings from which a word is too common to rank by. "condo" alone matches
+# 40% of the generated catalog.
+SCAN_LIMIT = 2000
+# FTS5 buffers this many bytes of terms before writing a segment (1 MB is
+# its default); a full rebuild with a bigger buffer writes fewer segments
+DEFAULT_HASHSIZE = 1024 * 1024
+REBUILD_HASHSIZE = 64 * 1024 * 1024
+
+
+def install_search_index(conn, rebuild=False):
+    """Create the FTS table and sync triggers; optionally reindex existing rows."""
+    for stmt in FTS_DDL:
+        conn.execute(text(stmt))
+    if rebuild:
+        rebuild_search_index(conn)
+
+
+def rebuild_search_index(conn):
+    """Reindex every property in one pass (after migrations and bulk loads)."""
+    set_hashsize = text("INSERT INTO properties_fts (properties_fts, rank) VALUES ('hashsize', :size)")
+    conn.execute(set_hashsize, {"size": REBUILD_HASHSIZE})
+    conn.execute(text("INSERT INTO properties_fts (properties_fts) VALUES ('rebuild')"))
+    # the setting is stored in the index: put it back for everyday writes
+    conn.execute(set_hashsize, {"size": DEFAULT_HASHSIZE})
+
+
+@contextmanager
+def deferred_indexing(conn, first_id):
+    """Index rows with id >= first_id in one pass instead of per-row triggers.
+
+    For bulk inserts inside one write transaction: the insert trigger is
+    dropped for the duration and recreated before the block ends, so other
+    connections never see it missing (SQLite DDL is transactional). If the
+    block raises, rolling the transaction back restores the trigger.
+    """
+    conn.execute(text("DROP TRIGGER IF EXISTS properties_fts_ai"))
+    yield
+    conn.execute(text(
+        "INSERT INTO properties_fts (rowid, title, description, location, amenities) "
+        "SELECT id, title, description, location, amenities FROM properties WHERE id >= :first_id"
+    ), {"first_id": first_id})
+    conn.execute(text(FTS_DDL[1]))
+
+
+def drop_search_index(conn):
+    conn.execute(text("DROP TABLE IF EXISTS properties_fts"))
+
+
+def match_phrases(q):
+    """Turn free text into safe FTS5 phrases, one per word; every word must
+    match, as a prefix when a prefix index covers its length."""
+    terms = [t for t in re.findall(r"\w+", q or "") if len(t) >= MIN_TERM_LENGTH]
+    return [f'"{t}"*' if len(t) in PREFIX_LENGTHS else f'"{t}"' for t in terms]
+
+
+def _city_phrase(city):
+    """The city as a location phrase, so the index rather than the join narrows
+    the matches (rows are still checked against the exact city)."""
+    words = re.findall(r"\w+", city or "")
+    return [f'location : "{" ".join(words)}"'] if words else []
+
+
+def _rare(conn, phrase, limit):
+    """Whether fewer than `limit` listings match `phrase`; stops at `limit`."""
+    return conn.execute(text(
+        "SELECT COUNT(*) FROM (SELECT rowid FROM properties_fts WHERE properties_fts MATCH :phrase LIMIT :n)"
+    ), {"phrase": phrase, "n": limit}).scalar() < limit
+
+
+def search_properties(conn, q, limit=20, offset=0, filters=None, scan_limit=SCAN_LIMIT):
+    """Return (ranked [(id, score)], facets, approximate) for a search.
+
+    Hits and facet counts share one materialized match set of at most
+    `scan_limit` rows, the newest matches. `approximate` is True when the
+    scan stopped there: hits and facets then cover those, and there may be
+    more. Results are ranked by bm25() over the words rarer than
+    `scan_limit` listings, then newest first.
+    """
+    phrases = match_phrases(q)
+    if not phrases:
+        return [], {"city": {}, "property_type": {}, "bedrooms": {}}, False
+    ranking = [phrase for phrase in phrases if _rare(conn, phrase, scan_limit)]
+
+    params = {"match": " ".join(phrases + _city_phrase((filters or {}).get("city"))), "rank": " ".join(ranking),
+              "limit": limit, "offset": offset, "scan": scan_limit}
+    where = []
+    for key, clause in (
+        ("type", "p.property_type = :type"),
+        ("city", "p.city = :city"),
+        ("status", "p.status = :status"),
+        ("min_price", "p.price >= :min_price"),
+        ("max_price", "p.price <= :max_price"),
+        ("min_bedrooms", "p.bedrooms >= :min_bedrooms"),
+    ):
+        if filters and filters.get(key) is not None:
+            where.append(clause)
+            params[key] = filters[key]
+
+    # FTS5 walks its doclists newest rowid first, so the LIMIT stops the scan.
+    # `ranked` only holds rows matching every rare word: fewer than scan_limit.
+    ranked = f"""
+        ranked AS MATERIALIZED (
+            SELECT rowid AS id, bm25(properties_fts, {BM25_WEIGHTS}) AS score
+            FROM properties_fts WHERE properties_fts MATCH :rank
+        ),""" if ranking else ""
+    sql = f"""
+        WITH matches AS (
+            SELECT rowid AS id FROM properties_fts WHERE properties_fts MATCH :match
+            ORDER BY rowid DESC LIMIT :scan
+        ),{ranked}
+        hits AS (
+            SELECT p.id AS id, p.city AS city, p.property_type AS property_type,
+                   p.bedrooms AS bedrooms, {'COALESCE(ranked.score, 0.0)' if ranking else '0.0'} AS score
+            FROM matches JOIN properties p ON p.id = matches.id
+            {'LEFT JOIN ranked ON ranked.id = matches.id' if ranking else ''}
+            {'WHERE ' + ' AND '.join(where) if where else ''}
+        )
+        SELECT 'hit', CAST(id AS TEXT), score
+            FROM (SELECT id, score FROM hits ORDER BY score, id DESC LIMIT :limit OFFSET :offset)
+        UNION ALL SELECT 'matched', NULL, COUNT(*) FROM matches
+        UNION ALL SELECT 'city', city, COUNT(*) FROM hits GROUP BY city
+        UNION ALL SELECT 'property_type', property_type, COUNT(*) FROM hits GROUP BY property_type
+        UNION ALL SELECT 'bedrooms', CAST(bedrooms AS TEXT), COUNT(*) FROM hits GROUP BY bedrooms
+    """
+
+    hits, approximate = [], False
+    facets = {"city": {}, "property_type": {}, "bedrooms": {}}
+    for kind, value, n in conn.execute(text(sql), params):
+        if kind == "hit":
+            hits.append((int(value), n))
+        elif kind == "matched":
+            approximate = n >= scan_limit
+        else:
+            facets[kind]["unknown" if value is None else value] = n
+    hits.sort(key=lambda h: (h[1], -h[0]))
+    return hits, facets, approximate
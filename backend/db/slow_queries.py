@@ -0,0 +1,183 @@
+"""Slow-query log: every SQL statement slower than a threshold, with where it
+came from and how SQLite planned it.
+
+    log = SlowQueryLog(path, threshold_ms=50, origin=current_route)
+    log.install(engine)
+
+Each slow statement is one JSON line:
+    ts, ms          when it finished and how long it took
+    route           `origin()` (the Flask endpoint, or the script outside a request)
+    shape, sql      an id for the statement shape and its normalized text:
+                    whitespace folded, IN (?, ?, ...) and multi-row VALUES
+                    lists collapsed, so one query is one shape at any size
+    params          the bound parameters, IC numbers masked to the last 4 digits
+    rows            executemany batch size (1 otherwise)
+    plan            EXPLAIN QUERY PLAN, run once per shape per process and
+                    reused for later occurrences
+    full_scan       tables the plan reads without an index (db/query_plan.py)
+
+The file rotates at `max_bytes` keeping `backups` old files. Each process
+rotates on its own, so with several workers a file can end a little over
+the limit; summarize() reads the current file and every backup.
+`python slow_query_report.py` ranks shapes by total time.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+from db.query_plan import full_scans
+
+# MyKad numbers, with or without dashes: YYMMDD-PB-###G
+_IC = re.compile(r"\b(\d{6})-?(\d{2})-?(\d{4})\b")
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"\(\?(?:, \?)+\)")
+_REPEATED_ROWS = re.compile(r"(\((?:\?, )*\?\))(?:, \1)+")
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+
+
+def redact(value):
+    """Mask IC numbers in a parameter (or any string), keeping the last 4 digits."""
+    if isinstance(value, str):
+        return _IC.sub(lambda m: f"XXXXXX-XX-{m.group(3)}", value)
+    if isinstance(value, (list, tuple)):
+        return [redact(v) for v in value]
+    if isinstance(value, dict):
+        return {k: redact(v) for k, v in value.items()}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<{len(value)} bytes>"
+    return value
+
+
+def shape_of(statement):
+    """Normalize a statement so the same query at any IN-list / batch size has one shape."""
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _REPEATED_ROWS.sub(r"\1", sql)
+    return _PLACEHOLDER_LIST.sub("(?, ...)", sql)
+
+
+class SlowQueryLog:
+    def __init__(self, path, threshold_ms=100, origin=None, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS):
+        self.path = path
+        self.threshold = threshold_ms / 1000
+        self.origin = origin or (lambda: None)
+        self._plans = {}  # shape -> (plan lines, full-scan tables)
+        self._plans_lock = threading.Lock()
+        self.explained = 0  # EXPLAINs run, i.e. distinct shapes seen
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # one logger per file, shared by every engine that logs to it
+        self.logger = logging.getLogger(f"rentsafe.slow_queries.{os.path.abspath(path)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        if not self.logger.handlers:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self.logger.addHandler(handler)
+
+    def install(self, engine):
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info["slow_query_started"] = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.pop("slow_query_started", None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if elapsed >= self.threshold:
+            self.record(cursor.connection, statement, parameters, executemany, elapsed)
+
+    def plan_for(self, dbapi_conn, shape, statement, parameters):
+        """EXPLAIN QUERY PLAN for a shape, run the first time the shape is seen."""
+        with self._plans_lock:
+            cached = self._plans.get(shape)
+        if cached is not None:
+            return cached
+        plan = []
+        if statement.lstrip()[:7].upper().startswith(_EXPLAINABLE):
+            try:
+                plan = [row[-1] for row in dbapi_conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            except Exception as exc:  # the plan is a diagnostic; never fail the query for it
+                plan = [f"EXPLAIN failed: {exc}"]
+        cached = (plan, full_scans(plan))
+        with self._plans_lock:
+            if shape not in self._plans:
+                self._plans[shape] = cached
+                self.explained += 1
+        return cached
+
+    def record(self, dbapi_conn, statement, parameters, executemany, elapsed):
+        shape = shape_of(statement)
+        rows = len(parameters) if executemany else 1
+        first = parameters[0] if executemany and parameters else parameters
+        plan, scans = self.plan_for(dbapi_conn, shape, statement, first or ())
+        self.logger.info(json.dumps({
+            "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "ms": round(elapsed * 1000, 3),
+            "route": self.origin(),
+            "shape": hashlib.sha1(shape.encode()).hexdigest()[:12],
+            "sql": redact(shape),
+            "params": redact(first if first is not None else []),
+            "rows": rows,
+            "plan": plan,
+            "full_scan": scans,
+        }, default=str))
+
+
+def log_files(path):
+    """The log and its rotated backups, oldest first."""
+    directory, base = os.path.split(os.path.abspath(path))
+    if not os.path.isdir(directory):
+        return []
+    backups = sorted((name for name in os.listdir(directory)
+                      if name.startswith(base + ".") and name[len(base) + 1:].isdigit()),
+                     key=lambda name: -int(name[len(base) + 1:]))
+    files = [os.path.join(directory, name) for name in backups]
+    return files + [path] if os.path.exists(path) else files
+
+
+def summarize(path, route=None):
+    """Statement shapes ranked by total time, from the log and its backups.
+
+    Each item: shape, sql, count, total_ms, mean_ms, max_ms, routes (Counter),
+    full_scan (tables), plan, example params (from the slowest occurrence).
+    """
+    shapes = {}
+    for file in log_files(path):
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash or a rotation race
+                if route and entry.get("route") != route:
+                    continue
+                item = shapes.get(entry["shape"])
+                if item is None:
+                    item = shapes[entry["shape"]] = {
+                        "shape": entry["shape"], "sql": entry["sql"], "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                        "routes": Counter(), "full_scan": entry["full_scan"], "plan": entry["plan"], "params": None,
+                    }
+                item["count"] += 1
+                item["total_ms"] += entry["ms"]
+                item["routes"][entry["route"]] += 1
+                if entry["ms"] >= item["max_ms"]:
+                    item["max_ms"], item["params"] = entry["ms"], entry["params"]
+    ranked = sorted(shapes.values(), key=lambda item: item["total_ms"], reverse=True)
+    for item in ranked:
+        item["mean_ms"] = item["total_ms"] / item["count"]
+    return ranked
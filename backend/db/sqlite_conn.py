@@ -0,0 +1,30 @@
+"""Per-thread sqlite3 connections for the side stores kept next to the app DB.
+
+The response cache, the auth token store and the idempotency store each keep
+their own SQLite file and talk to it through the sqlite3 module rather than
+SQLAlchemy. `ThreadLocalConnection(path)()` returns the calling thread's
+connection to `path`, opening it on first use and again in a forked worker,
+which must not share its parent's file handles. Connections run in autocommit
+(isolation_level=None) with WAL and synchronous=NORMAL, so readers never
+block on a writer and commits fsync only at checkpoints.
+"""
+import os
+import sqlite3
+import threading
+
+
+class ThreadLocalConnection:
+    def __init__(self, path, timeout=5):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def __call__(self):
+        # one connection per thread, reopened in forked workers
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            self._local.pid = os.getpid()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
@@ -0,0 +1,163 @@
+"""Materialized per-user dashboard counters.
+
+`dashboard_summaries` holds one row per (ic, role, metric) with a count and
+an amount, e.g. ("800515-01-5678", "landlord", "contracts:active", 3, 8400.0).
+Metrics are:
+
+    properties                  landlord only
+    applications:<status>       landlord (via property) and tenant
+    contracts:<status>          both sides, amount = monthly rent
+    escrow:<status>             both sides, amount = escrow amount
+
+An after_flush hook turns every ORM insert/update/delete of those models into
+counter deltas and applies them on the same connection, so they commit or roll
+back with the transition that caused them. Writes that bypass the ORM (raw
+SQL, bulk imports) must call `count_inserted` / `apply_deltas` for the rows
+they add, or `rebuild_summaries` afterwards.
+"""
+from collections import defaultdict
+
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import Session
+
+from db.db_tables import Application, Contract, Escrow, Property
+
+_REBUILD_SELECT = """
+    SELECT landlord_ic, 'landlord', 'properties', COUNT(*), 0
+        FROM properties WHERE landlord_ic IS NOT NULL GROUP BY landlord_ic
+    UNION ALL
+    SELECT p.landlord_ic, 'landlord', 'applications:' || COALESCE(a.status, 'unknown'), COUNT(*), 0
+        FROM applications a JOIN properties p ON p.id = a.property_id
+        WHERE p.landlord_ic IS NOT NULL GROUP BY p.landlord_ic, a.status
+    UNION ALL
+    SELECT tenant_ic, 'tenant', 'applications:' || COALESCE(status, 'unknown'), COUNT(*), 0
+        FROM applications GROUP BY tenant_ic, status
+    UNION ALL
+    SELECT landlord_ic, 'landlord', 'contracts:' || COALESCE(status, 'unknown'), COUNT(*), COALESCE(SUM(monthly_rent), 0)
+        FROM contracts GROUP BY landlord_ic, status
+    UNION ALL
+    SELECT tenant_ic, 'tenant', 'contracts:' || COALESCE(status, 'unknown'), COUNT(*), COALESCE(SUM(monthly_rent), 0)
+        FROM contracts GROUP BY tenant_ic, status
+    UNION ALL
+    SELECT c.landlord_ic, 'landlord', 'escrow:' || COALESCE(e.status, 'unknown'), COUNT(*), COALESCE(SUM(e.amount), 0)
+        FROM escrow e JOIN contracts c ON c.id = e.contract_id GROUP BY c.landlord_ic, e.status
+    UNION ALL
+    SELECT c.tenant_ic, 'tenant', 'escrow:' || COALESCE(e.status, 'unknown'), COUNT(*), COALESCE(SUM(e.amount), 0)
+        FROM escrow e JOIN contracts c ON c.id = e.contract_id GROUP BY c.tenant_ic, e.status
+"""
+
+_UPSERT = text("""
+    INSERT INTO dashboard_summaries (ic, role, metric, count, amount)
+    VALUES (:ic, :role, :metric, :count, :amount)
+    ON CONFLICT (ic, role, metric) DO UPDATE SET
+        count = count + excluded.count,
+        amount = amount + excluded.amount
+""")
+
+
+def rebuild_summaries(conn):
+    """Recompute every counter from the source tables."""
+    conn.execute(text("DELETE FROM dashboard_summaries"))
+    conn.execute(text(f"INSERT INTO dashboard_summaries (ic, role, metric, count, amount) {_REBUILD_SELECT}"))
+
+
+def check_summaries(conn):
+    """Return [(ic, role, metric, stored, expected)] for counters that drifted."""
+    expected = {(ic, role, metric): (count, float(amount or 0))
+                for ic, role, metric, count, amount in conn.execute(text(_REBUILD_SELECT))}
+    stored = {(ic, role, metric): (count, float(amount or 0))
+              for ic, role, metric, count, amount in conn.execute(
+                  text("SELECT ic, role, metric, count, amount FROM dashboard_summaries WHERE count != 0"))}
+    return [(*key, stored.get(key), expected.get(key))
+            for key in sorted(set(expected) | set(stored), key=str)
+            if stored.get(key) != expected.get(key)]
+
+
+def read_summary(conn, ic, role):
+    """{metric: (count, amount)} for one user and role — a primary-key range read."""
+    rows = conn.execute(
+        text("SELECT metric, count, amount FROM dashboard_summaries WHERE ic = :ic AND role = :role"),
+        {"ic": ic, "role": role},
+    )
+    return {metric: (count, amount) for metric, count, amount in rows if count}
+
+
+# --- Incremental maintenance ---
+
+def _value(obj, attr, old):
+    """Current value of an attribute, or the value it had before this flush."""
+    if not old:
+        return getattr(obj, attr)
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return history.unchanged[0] if history.unchanged else getattr(obj, attr)
+
+
+def _contributions(session, obj, old=False):
+    """Counter rows (ic, role, metric, count, amount) an object adds to the summary."""
+    v = lambda attr: _value(obj, attr, old)
+    if isinstance(obj, Property):
+        return [(v('landlord_ic'), 'landlord', 'properties', 1, 0)]
+    if isinstance(obj, Application):
+        metric = f"applications:{v('status') or 'unknown'}"
+        prop = session.get(Property, v('property_id'))
+        rows = [(v('tenant_ic'), 'tenant', metric, 1, 0)]
+        if prop is not None:
+            rows.append((prop.landlord_ic, 'landlord', metric, 1, 0))
+        return rows
+    if isinstance(obj, Contract):
+        metric = f"contracts:{v('status') or 'unknown'}"
+        rent = float(v('monthly_rent') or 0)
+        return [(v('landlord_ic'), 'landlord', metric, 1, rent), (v('tenant_ic'), 'tenant', metric, 1, rent)]
+    if isinstance(obj, Escrow):
+        contract = session.get(Contract, v('contract_id'))
+        if contract is None:
+            return []
+        metric = f"escrow:{v('status') or 'unknown'}"
+        amount = float(v('amount') or 0)
+        return [(contract.landlord_ic, 'landlord', metric, 1, amount), (contract.tenant_ic, 'tenant', metric, 1, amount)]
+    return []
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_summary_deltas(session, flush_context):
+    deltas = defaultdict(lambda: [0, 0.0])
+    with session.no_autoflush:
+        for obj in session.new:
+            for ic, role, metric, count, amount in _contributions(session, obj):
+                deltas[(ic, role, metric)][0] += count
+                deltas[(ic, role, metric)][1] += amount
+        for obj in session.dirty:
+            if not session.is_modified(obj, include_collections=False):
+                continue
+            for sign, old in ((-1, True), (1, False)):
+                for ic, role, metric, count, amount in _contributions(session, obj, old):
+                    deltas[(ic, role, metric)][0] += sign * count
+                    deltas[(ic, role, metric)][1] += sign * amount
+        for obj in session.deleted:
+            for ic, role, metric, count, amount in _contributions(session, obj, old=True):
+                deltas[(ic, role, metric)][0] -= count
+                deltas[(ic, role, metric)][1] -= amount
+
+    apply_deltas(session.connection(), deltas)
+
+
+def count_inserted(session, objs):
+    """Count rows inserted outside the unit of work (e.g. one multi-row INSERT)
+    in the same transaction; `objs` are transient model instances."""
+    deltas = defaultdict(lambda: [0, 0.0])
+    for obj in objs:
+        for ic, role, metric, count, amount in _contributions(session, obj):
+            deltas[(ic, role, metric)][0] += count
+            deltas[(ic, role, metric)][1] += amount
+    apply_deltas(session.connection(), deltas)
+
+
+def apply_deltas(conn, deltas):
+    """Add {(ic, role, metric): (count, amount)} to the stored counters."""
+    rows = [{"ic": ic, "role": role, "metric": metric, "count": count, "amount": amount}
+            for (ic, role, metric), (count, amount) in deltas.items()
+            if ic is not None and (count or amount)]
+    if rows:
+        conn.execute(_UPSERT, rows)
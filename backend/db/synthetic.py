@@ -0,0 +1,538 @@
+"""Deterministic synthetic data at production scale.
+
+    python generate_data.py --properties 1000000 --reset
+
+Fills the database with users (landlords and tenants), properties with their
+amenity rows, applications, contracts in every status, escrows for the
+contracts whose deposit is paid, saved listings and tenant preferences. The
+same seed and sizes always produce the same rows.
+
+Distributions follow what production looks like rather than uniform noise:
+
+    landlords    Zipf-distributed portfolios: the largest owns thousands of
+                 units, most own a handful
+    popularity   a lognormal weight per listing; applications and saved
+                 listings are drawn by it, so a few listings get most interest
+    cities       weighted toward the Klang Valley; rent follows city,
+                 bedrooms and property type
+    contracts    one per approved application, spread over every status in
+                 db/contract_states.py with matching photo/signature columns
+
+Columns are drawn with numpy up front and written with driver-level
+executemany, one transaction per `batch_size` rows. The search index is filled
+per batch (db.search.deferred_indexing), the dashboard counters get the
+deltas the generated rows add (db.summary.apply_deltas) and the catalog
+generation is bumped (db.catalog), so nothing depends on ORM flush hooks.
+Into an empty database, secondary indexes and the search index are built
+once after the load instead.
+
+The demo accounts of the old seed scripts (landlord 800515-01-5678, tenant
+950101-01-1234, ...) come first, so the frontend's demo logins see data;
+landlord 800515-01-5678 gets the largest portfolio.
+"""
+import json
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import bindparam, text
+
+from db.catalog import bump_generation
+from db.contract_states import MOCK_PHOTOS
+from db.db_tables import AMENITY_LABELS
+from db.search import deferred_indexing, install_search_index
+from db.summary import apply_deltas
+
+AS_OF = datetime(2026, 1, 1)
+DEFAULT_BATCH_SIZE = 50000
+
+DEMO_LANDLORDS = [("800515-01-5678", "Encik Razak", 46, "Male"), ("750820-02-9012", "Puan Mei Ling", 50, "Female"),
+                  ("000000-00-0000", "Demo Landlord", 40, "Male")]
+DEMO_TENANTS = [("950101-01-1234", "Ahmad Bin Abdullah", 31, "Male"), ("960202-02-2222", "Nur Aina Salleh", 30, "Female"),
+                ("920707-07-7777", "Chan Li Wei", 34, "Female"), ("930808-08-8888", "Lim Wei Jie", 33, "Male")]
+
+# (city, state, share of listings, rent factor)
+CITIES = [
+    ("Kuala Lumpur", "WP Kuala Lumpur", 24, 1.35),
+    ("Petaling Jaya", "Selangor", 12, 1.15),
+    ("Subang Jaya", "Selangor", 8, 1.05),
+    ("Shah Alam", "Selangor", 7, 0.95),
+    ("Puchong", "Selangor", 5, 0.85),
+    ("Cyberjaya", "Selangor", 4, 0.9),
+    ("Johor Bahru", "Johor", 10, 0.9),
+    ("George Town", "Penang", 8, 1.0),
+    ("Bayan Lepas", "Penang", 4, 0.9),
+    ("Ipoh", "Perak", 5, 0.7),
+    ("Melaka", "Melaka", 4, 0.75),
+    ("Seremban", "Negeri Sembilan", 3, 0.7),
+    ("Kota Kinabalu", "Sabah", 3, 0.85),
+    ("Kuching", "Sarawak", 3, 0.8),
+]
+STREETS = ["Jalan Ampang", "Jalan Bukit Bintang", "Jalan Tun Razak", "Jalan Sultan Ismail", "Jalan Kerinchi",
+           "Jalan Telawi", "Jalan SS 15/4", "Jalan Kiara", "Persiaran Gurney", "Jalan Masjid", "Jalan Klang Lama",
+           "Jalan Cheras", "Jalan Puchong", "Jalan Tebrau", "Jalan Sultan Azlan Shah", "Lorong Maarof"]
+# (property_type, share, label, rent factor, extra bedrooms)
+PROPERTY_TYPES = [
+    ("condo", 40, "Condo", 1.1, 0),
+    ("apartment", 25, "Apartment", 0.85, 0),
+    ("studio", 10, "Studio", 0.9, None),
+    ("terrace", 15, "Terrace House", 1.0, 1),
+    ("semi-d", 5, "Semi-D", 1.4, 2),
+    ("bungalow", 2, "Bungalow", 2.0, 2),
+    ("penthouse", 3, "Penthouse", 2.2, 1),
+]
+ADJECTIVES = ["Cozy", "Modern", "Spacious", "Renovated", "Fully Furnished", "Bright", "Quiet", "Family"]
+DESCRIPTIONS = [
+    "Near LRT and shopping mall. Move-in ready.",
+    "Quiet neighbourhood with 24-hour security.",
+    "Walking distance to schools, clinics and food courts.",
+    "Unblocked view, high floor, partially furnished.",
+    "Newly renovated kitchen and bathrooms.",
+    "Easy access to highways and public transport.",
+]
+IMAGES = [
+    "https://images.unsplash.com/photo-1522708323590-d24dbb6b0267?w=800&h=600&fit=crop",
+    "https://images.unsplash.com/photo-1600607687939-ce8a6c25118c?w=800&h=600&fit=crop",
+    "https://images.unsplash.com/photo-1600585154340-be6161a56a0c?w=800&h=600&fit=crop",
+    "https://images.unsplash.com/photo-1613977257363-707ba9348227?w=800&h=600&fit=crop",
+]
+FIRST_NAMES = ["Ahmad", "Muhammad", "Nur", "Siti", "Aisyah", "Hafiz", "Farah", "Wei Ming", "Mei Ling", "Jia Hui",
+               "Kok Leong", "Priya", "Arjun", "Kavitha", "Rajesh", "Daniel", "Sarah", "Aiman", "Hui Min", "Suresh"]
+LAST_NAMES = ["Abdullah", "Ismail", "Rahman", "Hassan", "Tan", "Lim", "Lee", "Wong", "Ng", "Chong", "Kumar",
+              "Raj", "Pillai", "Nair", "Yusof", "Othman", "Goh", "Teo", "Ong", "Singh"]
+BIRTHPLACES = ["01", "02", "03", "04", "05", "06", "07", "08", "09", "10", "11", "12", "13", "14", "15", "16"]
+
+PROPERTY_STATUSES = [("verified", 55), ("available", 35), ("unverified", 10)]
+# every status of db/contract_states.py; (status, share, photos, photos_approved, tenant_signed, landlord_signed)
+CONTRACT_STATUSES = [
+    ("pending_photos", 8, False, False, False, False),
+    ("pending_tenant_approval", 6, True, False, False, False),
+    ("photos_rejected_by_tenant", 2, True, False, False, False),
+    ("awaiting_tenant_signature", 6, True, True, False, False),
+    ("tenant_signed_waiting_landlord", 4, True, True, True, False),
+    ("pending_signatures", 3, True, True, False, True),
+    ("active", 30, True, True, True, True),
+    ("deposit_paid", 41, True, True, True, True),
+]
+ESCROW_STATUSES = [("secured", 60), ("release_requested", 10), ("released", 25), ("disputed", 5)]
+# share of listings with applications whose first applicant was approved
+RENTED_SHARE = 0.45
+LANDLORD_ZIPF = 1.1
+DAY_US = 86400 * 1000000
+
+USER_COLUMNS = ["id", "ic", "name", "age", "gender", "created_at", "role"]
+PROPERTY_COLUMNS = ["id", "title", "description", "location", "price", "landlord_ic", "bedrooms", "bathrooms",
+                    "size_sqft", "property_type", "amenities", "image_url", "status", "created_at", "updated_at",
+                    "version", "city", "state"]
+APPLICATION_COLUMNS = ["id", "property_id", "tenant_ic", "tenant_name", "status", "applied_at", "updated_at",
+                       "version"]
+CONTRACT_COLUMNS = ["id", "property_id", "tenant_ic", "landlord_ic", "monthly_rent", "deposit_amount", "start_date",
+                    "end_date", "status", "property_photos", "tenant_signed", "landlord_signed",
+                    "landlord_signature_data", "photos_approved", "updated_at", "version", "tenant_signature_name",
+                    "tenant_signature_ic", "tenant_signature_at", "tenant_document_hash"]
+ESCROW_COLUMNS = ["id", "contract_id", "amount", "status", "payment_method", "paid_at", "released_at", "updated_at",
+                  "version"]
+
+
+def _pick(rng, choices, n, share=1):
+    """n indexes into `choices`, drawn by each tuple's share (at index `share`)."""
+    shares = np.array([c[share] for c in choices], dtype=float)
+    return rng.choice(len(choices), n, p=shares / shares.sum())
+
+
+def _insert(conn, table, columns, rows):
+    conn.exec_driver_sql(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                         rows)
+
+
+class _Clock:
+    """Timestamps as microsecond offsets from `as_of`, rendered the way
+    SQLAlchemy stores DateTime in SQLite."""
+
+    def __init__(self, as_of):
+        self.as_of = np.datetime64(as_of, "us")
+
+    def days_ago(self, rng, n, max_days):
+        return -rng.integers(0, max_days * DAY_US, n)
+
+    def render(self, offsets):
+        stamps = np.datetime_as_string(self.as_of + offsets.astype("timedelta64[us]"), unit="us")
+        return [s.replace("T", " ") for s in stamps.tolist()]
+
+
+class SyntheticData:
+    """Draws every column up front from one seeded generator, then writes
+    tables in batches. `offsets` are the current MAX(id) per table, so rows
+    can be appended to a database that already has data."""
+
+    def __init__(self, properties, users=None, landlords=None, applications_per_property=1.5,
+                 saves_per_tenant=5.0, seed=42, as_of=AS_OF, offsets=None, existing_ics=()):
+        self.rng = np.random.default_rng(seed)
+        self.clock = _Clock(as_of)
+        self.as_of = as_of
+        self.offsets = Counter(offsets or {})
+        self.n_properties = properties
+        n_users = users if users is not None else max(properties // 5, 50)
+        n_landlords = landlords if landlords is not None else max(n_users // 25, len(DEMO_LANDLORDS))
+        if n_landlords >= n_users:
+            raise ValueError("need more users than landlords")
+        self._users(n_users, n_landlords, set(existing_ics))
+        self._properties()
+        self._applications(applications_per_property)
+        self._contracts()
+        self._saved_listings(saves_per_tenant)
+
+    # --- column generation ---
+
+    def _users(self, n_users, n_landlords, existing_ics):
+        rng = self.rng
+        demo_landlords = [u for u in DEMO_LANDLORDS if u[0] not in existing_ics]
+        demo_tenants = [u for u in DEMO_TENANTS if u[0] not in existing_ics]
+        n_generated = n_users - len(demo_landlords) - len(demo_tenants)
+        # unique by construction: birth date from k % 15000, serial from k // 15000;
+        # starting at the current MAX(id) keeps appended runs clear of earlier ones
+        k = np.arange(self.offsets["users"], self.offsets["users"] + n_generated)
+        birth = np.datetime64("1960-01-01") + (k * 7919 % 15000).astype("timedelta64[D]")
+        male = rng.integers(0, 2, n_generated)
+        serial = (k // 15000) * 2 + male  # odd last digit: male
+        place = rng.choice(BIRTHPLACES, n_generated)
+        dates = np.datetime_as_string(birth).tolist()
+        ics = [f"{d[2:4]}{d[5:7]}{d[8:10]}-{p}-{s:04d}" for d, p, s in zip(dates, place.tolist(), serial.tolist())]
+        first = rng.choice(FIRST_NAMES, n_generated).tolist()
+        last = rng.choice(LAST_NAMES, n_generated).tolist()
+        names = [f"{f} {l}"[:20] for f, l in zip(first, last)]
+        ages = (self.as_of.year - birth.astype("datetime64[Y]").astype(int) - 1970).tolist()
+        genders = ["Male" if m else "Female" for m in male.tolist()]
+
+        generated = list(zip(ics, names, ages, genders))
+        n_generated_landlords = n_landlords - len(demo_landlords)
+        landlords = demo_landlords + generated[:n_generated_landlords]
+        tenants = demo_tenants + generated[n_generated_landlords:]
+        self.users = [(ic, name, age, gender, "landlord") for ic, name, age, gender in landlords] + \
+                     [(ic, name, age, gender, "tenant") for ic, name, age, gender in tenants]
+        self.user_created = self.clock.render(self.clock.days_ago(rng, len(self.users), 1095))
+        self.landlord_ics = np.array([u[0] for u in landlords], dtype=object)
+        self.tenant_ics = np.array([u[0] for u in tenants], dtype=object)
+        self.tenant_names = np.array([u[1] for u in tenants], dtype=object)
+        # saved listings / preferences reference users.id
+        self.tenant_ids = np.arange(len(landlords), len(self.users)) + self.offsets["users"] + 1
+
+    def _properties(self):
+        rng, n = self.rng, self.n_properties
+        ranks = np.arange(1, len(self.landlord_ics) + 1, dtype=float)
+        weights = ranks ** -LANDLORD_ZIPF
+        self.landlord = rng.choice(len(ranks), n, p=weights / weights.sum())
+        self.city = _pick(rng, CITIES, n, share=2)
+        self.kind = _pick(rng, PROPERTY_TYPES, n)
+        extra = np.array([t[4] if t[4] is not None else -9 for t in PROPERTY_TYPES])[self.kind]
+        self.bedrooms = np.where(extra < 0, 1, np.clip(rng.poisson(1.3, n) + 1 + extra, 1, 7))
+        self.bathrooms = np.clip(self.bedrooms - rng.integers(0, 2, n), 1, None)
+        self.size = self.bedrooms * 320 + rng.integers(150, 500, n)
+        rent = (500 + 550 * self.bedrooms) * np.array([c[3] for c in CITIES])[self.city] \
+            * np.array([t[3] for t in PROPERTY_TYPES])[self.kind] * rng.lognormal(0, 0.2, n)
+        self.price = (np.round(rent / 50) * 50).astype(float)
+        self.status = _pick(rng, PROPERTY_STATUSES, n)
+        # ids grow with time, like a live table
+        self.created = np.sort(self.clock.days_ago(rng, n, 730))
+        self.touched = rng.random(n) < 0.2
+        self.updated = np.where(self.touched, self.created + (-self.created * rng.random(n)).astype(np.int64),
+                                self.created)
+        self.popularity = rng.lognormal(0, 1.2, n)
+        self.popularity /= self.popularity.sum()
+        self.street = rng.integers(0, len(STREETS), n)
+        self.number = rng.integers(1, 300, n)
+        self.adjective = rng.integers(0, len(ADJECTIVES), n)
+        self.description = rng.integers(0, len(DESCRIPTIONS), n)
+        self.image = rng.integers(0, len(IMAGES), n)
+        # a fixed pool of amenity lists, as real listings repeat the form's checkboxes
+        keys = list(AMENITY_LABELS)
+        self.amenity_sets = [sorted(rng.choice(len(keys), rng.integers(2, 7), replace=False).tolist())
+                             for _ in range(256)]
+        self.amenity_sets = [[(keys[i], AMENITY_LABELS[keys[i]]) for i in s] for s in self.amenity_sets]
+        self.amenities = rng.integers(0, len(self.amenity_sets), n)
+
+    def _applications(self, per_property):
+        rng = self.rng
+        n = int(round(self.n_properties * per_property))
+        prop = rng.choice(self.n_properties, n, p=self.popularity)
+        delay = (rng.exponential(20, n) * DAY_US).astype(np.int64)
+        applied = np.minimum(self.created[prop] + delay, 0)
+        order = np.argsort(applied, kind="stable")
+        self.app_property, self.app_applied = prop[order], applied[order]
+        self.app_tenant = rng.integers(0, len(self.tenant_ics), n)
+
+        # the first applicant of some listings was approved; the rest of those
+        # listings' applicants were mostly turned down
+        _, first = np.unique(self.app_property, return_index=True)
+        approved = first[rng.random(len(first)) < RENTED_SHARE]
+        rented = np.zeros(self.n_properties, dtype=bool)
+        rented[self.app_property[approved]] = True
+        roll = rng.random(n)
+        status = np.where(rented[self.app_property], np.where(roll < 0.7, 1, 0), np.where(roll < 0.4, 1, 0))
+        status[approved] = 2
+        self.app_status = status  # 0 pending, 1 rejected, 2 approved
+        self.approved = approved
+
+    def _contracts(self):
+        rng = self.rng
+        n = len(self.approved)
+        self.con_app = self.approved
+        self.con_status = _pick(rng, CONTRACT_STATUSES, n)
+        self.con_start = self.app_applied[self.approved] + rng.integers(7, 31, n) * DAY_US
+        self.con_end = self.con_start + np.where(rng.random(n) < 0.2, 730, 365) * DAY_US
+        self.con_updated = np.minimum(self.con_start, 0)
+        paid = np.flatnonzero(np.array([s[0] for s in CONTRACT_STATUSES])[self.con_status] == "deposit_paid")
+        self.esc_contract = paid
+        self.esc_status = _pick(rng, ESCROW_STATUSES, len(paid))
+        self.esc_method = np.where(rng.random(len(paid)) < 0.7, "FPX", "DuitNow")
+        self.esc_paid = np.minimum(self.con_start[paid] - 3 * DAY_US, 0)
+
+    def _saved_listings(self, per_tenant):
+        rng = self.rng
+        n = int(round(len(self.tenant_ics) * per_tenant))
+        pairs = np.unique(rng.integers(0, len(self.tenant_ics), n).astype(np.int64) * self.n_properties
+                          + rng.choice(self.n_properties, n, p=self.popularity))
+        self.saved_tenant, self.saved_property = pairs // self.n_properties, pairs % self.n_properties
+        self.pref_tenant = np.flatnonzero(rng.random(len(self.tenant_ics)) < 0.5)
+        self.pref_city = rng.integers(0, len(CITIES), len(self.pref_tenant))
+        self.pref_min = rng.integers(5, 25, len(self.pref_tenant)) * 100
+        self.pref_bedrooms = rng.integers(1, 4, len(self.pref_tenant))
+
+    # --- rows ---
+
+    def property_rows(self, lo, hi):
+        c = self.clock
+        created, updated = c.render(self.created[lo:hi]), c.render(self.updated[lo:hi])
+        amenity_text = [", ".join(label for _, label in a) for a in self.amenity_sets]
+        landlord_ics = self.landlord_ics[self.landlord[lo:hi]].tolist()
+        first_id = self.offsets["properties"] + 1 + lo
+        rows = []
+        # plain lists: indexing numpy arrays element by element is the slow part here
+        for pid, city, kind, bedrooms, bathrooms, size, price, amenities, number, street, adjective, description, \
+                image, status, touched, landlord_ic, created_at, updated_at in zip(
+                    range(first_id, first_id + hi - lo), *(a[lo:hi].tolist() for a in (
+                        self.city, self.kind, self.bedrooms, self.bathrooms, self.size, self.price, self.amenities,
+                        self.number, self.street, self.adjective, self.description, self.image, self.status,
+                        self.touched)), landlord_ics, created, updated):
+            city, state = CITIES[city][:2]
+            kind = PROPERTY_TYPES[kind]
+            rows.append((
+                pid, f"{ADJECTIVES[adjective]} {bedrooms}BR {kind[2]} in {city}", DESCRIPTIONS[description],
+                f"{number} {STREETS[street]}, {city}, {state}", price, landlord_ic, bedrooms, bathrooms, size,
+                kind[0], amenity_text[amenities], IMAGES[image], PROPERTY_STATUSES[status][0], created_at,
+                updated_at, 2 if touched else 1, city, state,
+            ))
+        return rows
+
+    def application_rows(self, lo, hi):
+        applied = self.clock.render(self.app_applied[lo:hi])
+        names = ("pending", "rejected", "approved")
+        first_id, first_property = self.offsets["applications"] + 1 + lo, self.offsets["properties"] + 1
+        tenants = self.app_tenant[lo:hi]
+        return [(app_id, first_property + prop, tenant_ic, tenant_name, names[status], stamp, stamp, 1)
+                for app_id, prop, tenant_ic, tenant_name, status, stamp in zip(
+                    range(first_id, first_id + hi - lo), self.app_property[lo:hi].tolist(),
+                    self.tenant_ics[tenants].tolist(), self.tenant_names[tenants].tolist(),
+                    self.app_status[lo:hi].tolist(), applied)]
+
+    def contract_rows(self, lo, hi):
+        c = self.clock
+        start, end = c.render(self.con_start[lo:hi]), c.render(self.con_end[lo:hi])
+        updated = c.render(self.con_updated[lo:hi])
+        signed = c.render(self.con_start[lo:hi] - 2 * DAY_US)
+        photos = ",".join(MOCK_PHOTOS)
+        first_id, first_property = self.offsets["contracts"] + 1, self.offsets["properties"] + 1
+        rows = []
+        for j, i in enumerate(range(lo, hi)):
+            app = self.con_app[i]
+            prop, tenant = int(self.app_property[app]), self.app_tenant[app]
+            status, _, has_photos, approved, tenant_signed, landlord_signed = CONTRACT_STATUSES[self.con_status[i]]
+            landlord_ic, tenant_ic = self.landlord_ics[self.landlord[prop]], self.tenant_ics[tenant]
+            rent = float(self.price[prop])
+            rows.append((
+                first_id + i, first_property + prop, tenant_ic, landlord_ic, rent, rent * 2, start[j], end[j], status,
+                photos if has_photos else None, tenant_signed, landlord_signed,
+                f"Signed by {landlord_ic} at {signed[j]}" if landlord_signed else None, approved, updated[j], 1,
+                self.tenant_names[tenant] if tenant_signed else None, tenant_ic if tenant_signed else None,
+                signed[j] if tenant_signed else None, None,
+            ))
+        return rows
+
+    def escrow_rows(self, lo, hi):
+        c = self.clock
+        paid = c.render(self.esc_paid[lo:hi])
+        released = c.render(np.minimum(self.con_end[self.esc_contract[lo:hi]], 0))
+        first_id, first_contract = self.offsets["escrow"] + 1, self.offsets["contracts"] + 1
+        rows = []
+        for j, i in enumerate(range(lo, hi)):
+            contract = self.esc_contract[i]
+            status = ESCROW_STATUSES[self.esc_status[i]][0]
+            rent = float(self.price[self.app_property[self.con_app[contract]]])
+            rows.append((first_id + i, first_contract + int(contract), rent * 2, status, self.esc_method[i], paid[j],
+                         released[j] if status == "released" else None,
+                         released[j] if status == "released" else paid[j], 1))
+        return rows
+
+    def summary_deltas(self):
+        """{(ic, role, metric): (count, amount)} for every generated row: what
+        db/summary.py's flush hook would have counted, without a rebuild."""
+        deltas = {}
+
+        def count(role, ics, who, metric, names, status, amounts=None):
+            key = who.astype(np.int64) * len(names) + status
+            groups, inverse = np.unique(key, return_inverse=True)
+            sums = np.bincount(inverse, weights=amounts) if amounts is not None else np.zeros(len(groups))
+            for group, n, amount in zip(groups.tolist(), np.bincount(inverse).tolist(), sums.tolist()):
+                name = names[group % len(names)]
+                deltas[(ics[group // len(names)], role, f"{metric}:{name}" if name else metric)] = (n, amount)
+
+        statuses = [s[0] for s in CONTRACT_STATUSES]
+        app_landlord = self.landlord[self.app_property]
+        con_property, con_tenant = self.app_property[self.con_app], self.app_tenant[self.con_app]
+        rent = self.price[con_property]
+        count("landlord", self.landlord_ics, self.landlord, "properties", [None], 0)
+        for role, ics, who in (("landlord", self.landlord_ics, app_landlord), ("tenant", self.tenant_ics, self.app_tenant)):
+            count(role, ics, who, "applications", ["pending", "rejected", "approved"], self.app_status)
+        for role, ics, who in (("landlord", self.landlord_ics, self.landlord[con_property]),
+                               ("tenant", self.tenant_ics, con_tenant)):
+            count(role, ics, who, "contracts", statuses, self.con_status, rent)
+            count(role, ics, who[self.esc_contract], "escrow", [s[0] for s in ESCROW_STATUSES], self.esc_status,
+                  rent[self.esc_contract] * 2)
+        return deltas
+
+    # --- writing ---
+
+    def tables(self):
+        """(table, row count, fn(lo, hi) -> rows) in foreign-key order."""
+        user_created = self.user_created
+        first_user = self.offsets["users"] + 1
+        first_property = self.offsets["properties"] + 1
+        return [
+            ("users", len(self.users),
+             lambda lo, hi: [(first_user + i, *self.users[i][:4], user_created[i], self.users[i][4])
+                             for i in range(lo, hi)]),
+            ("properties", self.n_properties, self.property_rows),
+            ("applications", len(self.app_property), self.application_rows),
+            ("contracts", len(self.con_app), self.contract_rows),
+            ("escrow", len(self.esc_contract), self.escrow_rows),
+            ("saved_listings", len(self.saved_tenant),
+             lambda lo, hi: [(int(self.tenant_ids[t]), first_property + int(p))
+                             for t, p in zip(self.saved_tenant[lo:hi], self.saved_property[lo:hi])]),
+            ("tenant_preferences", len(self.pref_tenant),
+             lambda lo, hi: [(int(self.tenant_ids[t]), CITIES[city][0], int(low), int(low) * 2, int(beds))
+                             for t, city, low, beds in zip(self.pref_tenant[lo:hi], self.pref_city[lo:hi],
+                                                           self.pref_min[lo:hi], self.pref_bedrooms[lo:hi])]),
+        ]
+
+
+COLUMNS = {
+    "users": USER_COLUMNS,
+    "properties": PROPERTY_COLUMNS,
+    "applications": APPLICATION_COLUMNS,
+    "contracts": CONTRACT_COLUMNS,
+    "escrow": ESCROW_COLUMNS,
+    "saved_listings": ["user_id", "listing_id"],
+    "tenant_preferences": ["user_id", "preferred_location", "min_rent", "max_rent", "min_bedrooms"],
+}
+# a batch's property_amenities rows, expanded by SQLite: parameters are the
+# batch's first property id and a JSON array of each property's amenity set
+_INSERT_AMENITIES = (
+    "INSERT INTO property_amenities (property_id, key, name, position) "
+    "SELECT ? + CAST(p.key AS INTEGER), s.key, s.name, s.position "
+    "FROM json_each(?) AS p JOIN amenity_sets AS s ON s.set_id = p.value ORDER BY p.key, s.position"
+)
+LOADED_TABLES = [*COLUMNS, "property_amenities"]
+# rows reach these in index order anyway (a handful of keys, then ascending
+# ids or times), so keeping them is cheaper than sorting them afterwards
+KEEP_DURING_LOAD = {"ix_property_amenities_key_property_id", "ix_properties_city", "ix_properties_created_at_id"}
+
+
+def current_offsets(conn):
+    return {table: conn.execute(text(f"SELECT COALESCE(MAX(id), 0) FROM {table}")).scalar()
+            for table in ("users", "properties", "applications", "contracts", "escrow")}
+
+
+@contextmanager
+def _fresh_load(conn, batch_lock):
+    """Load into an empty database without secondary indexes or the search
+    trigger, then build them once at the end: sorting each index in one pass
+    is several times faster than updating it row by row."""
+    # nothing to protect until the load is done; restored below
+    raw = conn.connection.dbapi_connection
+    synchronous = raw.execute("PRAGMA synchronous").fetchone()[0]
+    raw.execute("PRAGMA synchronous=OFF")
+    tables = bindparam("tables", LOADED_TABLES, expanding=True)
+    indexes = conn.execute(text(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND tbl_name IN :tables"
+    ).bindparams(tables)).all()
+    indexes = [(name, sql) for name, sql in indexes if name not in KEEP_DURING_LOAD]
+    with batch_lock():
+        for name, _ in indexes:
+            conn.execute(text(f"DROP INDEX {name}"))
+        conn.execute(text("DROP TRIGGER IF EXISTS properties_fts_ai"))
+        conn.commit()
+    try:
+        yield
+    finally:
+        # also on failure: never leave the schema without its indexes
+        with batch_lock():
+            for _, sql in indexes:
+                conn.execute(text(sql))
+            install_search_index(conn, rebuild=True)
+            conn.commit()
+        raw.execute(f"PRAGMA synchronous={synchronous}")
+
+
+def generate(engine, properties, batch_size=DEFAULT_BATCH_SIZE, batch_lock=nullcontext, progress=None, **options):
+    """Write a SyntheticData set through `engine`; returns {table: rows written}.
+
+    `options` go to SyntheticData (users, landlords, applications_per_property,
+    saves_per_tenant, seed, as_of). `batch_lock()` is entered around each
+    batch's transaction; `progress(table, done, total)` is called after each.
+
+    Into an empty database, indexes are built after the load (don't run the
+    server meanwhile); otherwise rows are appended with indexes in place.
+    """
+    with engine.connect() as conn:
+        offsets = current_offsets(conn)
+        demo = text("SELECT ic FROM users WHERE ic IN :ics").bindparams(bindparam("ics", expanding=True))
+        existing = {r[0] for r in conn.execute(demo, {"ics": [u[0] for u in DEMO_LANDLORDS + DEMO_TENANTS]})}
+        conn.rollback()
+        data = SyntheticData(properties, offsets=offsets, existing_ics=existing, **options)
+        fresh = not any(offsets.values())
+        conn.exec_driver_sql("CREATE TEMP TABLE IF NOT EXISTS amenity_sets (set_id INTEGER, position INTEGER, "
+                             "key TEXT, name TEXT, PRIMARY KEY (set_id, position))")
+        conn.exec_driver_sql("DELETE FROM amenity_sets")
+        _insert(conn, "amenity_sets", ["set_id", "key", "name", "position"],
+                [(set_id, key, label, position) for set_id, amenities in enumerate(data.amenity_sets)
+                 for position, (key, label) in enumerate(amenities)])
+        conn.commit()
+
+        written = Counter()
+        with _fresh_load(conn, batch_lock) if fresh else nullcontext():
+            for table, total, rows_for in data.tables():
+                for lo in range(0, total, batch_size):
+                    hi = min(lo + batch_size, total)
+                    with batch_lock():
+                        if table == "properties":
+                            rows = rows_for(lo, hi)
+                            with nullcontext() if fresh else deferred_indexing(conn, rows[0][0]):
+                                _insert(conn, table, COLUMNS[table], rows)
+                            # expanded from the set pool by SQLite: no per-row parameters
+                            conn.exec_driver_sql(_INSERT_AMENITIES, (rows[0][0], json.dumps(
+                                data.amenities[lo:hi].tolist())))
+                        else:
+                            _insert(conn, table, COLUMNS[table], rows_for(lo, hi))
+                        conn.commit()
+                    written[table] += hi - lo
+                    if progress:
+                        progress(table, hi, total)
+
+        with batch_lock():
+            apply_deltas(conn, data.summary_deltas())
+            bump_generation(conn)
+            conn.commit()
+        conn.exec_driver_sql("DROP TABLE temp.amenity_sets")
+        conn.commit()
+    return dict(written)
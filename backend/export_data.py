@@ -0,0 +1,48 @@
+"""
+Export properties, contracts or escrow from rentsafe.db as NDJSON or CSV.
+
+Rows are streamed from the database in chunks, so memory use doesn't grow
+with the table. The export's watermark is printed at the end (on stderr);
+pass it back as --since to export only what changed afterwards.
+
+Usage:
+    python export_data.py contracts > contracts.ndjson
+    python export_data.py escrow --format csv -o escrow.csv
+    python export_data.py escrow --format csv --since 2026-10-01T08:30:00 -o escrow-delta.csv
+"""
+import argparse
+import sys
+
+from app import app
+from api.export import DEFAULT_CHUNK_SIZE, FORMATS, TABLES, Export, parse_since
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Stream a table out as NDJSON or CSV.")
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("--format", choices=sorted(FORMATS), default="ndjson")
+    parser.add_argument("--since", type=parse_since, help="only rows changed after this watermark (ISO 8601)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("-o", "--output", help="default: stdout")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    with app.app_context():
+        export = Export(args.table, args.since, args.chunk_size)
+        try:
+            for part in export.serialize(args.format):
+                out.write(part)
+        finally:
+            export.close()
+            if out is not sys.stdout:
+                out.close()
+
+    watermark = export.watermark.isoformat() if export.watermark else "none (table is empty)"
+    print(f"✅ Exported {export.rows} {args.table} rows. Watermark: {watermark}", file=sys.stderr)
+    if export.watermark:
+        print(f"   next incremental export: --since {watermark}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,39 @@
+"""
+Multi-process serving: `gunicorn -c gunicorn.conf.py wsgi:app` (pip install gunicorn).
+
+The app is imported once in the master (preload_app) and forked into
+workers, so each worker starts with Flask, SQLAlchemy and NumPy already loaded.
+Settings can be overridden with environment variables.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("RENTSAFE_BIND", "0.0.0.0:8889")
+workers = int(os.environ.get("RENTSAFE_WORKERS", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.environ.get("RENTSAFE_THREADS", 4))
+preload_app = True
+timeout = 30
+graceful_timeout = 20
+max_requests = 2000  # recycle workers to bound memory growth
+max_requests_jitter = 200
+
+
+def when_ready(server):
+    # Runs in the master after the app is preloaded and before any worker forks
+    from app import app, init_db
+    from api.metrics import metrics
+    from db.db import db
+
+    for version, name in init_db(app):
+        server.log.info("Applied migration %s: %s", version, name)
+    with app.app_context():
+        db.engine.dispose()  # no pooled connection may cross the fork
+    metrics.clear_directory()  # request counters start again with the new master
+    server.log.info("create_app took %.0f ms", app.config["STARTUP_SECONDS"] * 1000)
+
+
+def worker_exit(server, worker):
+    # keep the requests this worker served since its last metrics snapshot
+    from api.metrics import metrics
+
+    metrics.flush()
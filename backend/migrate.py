@@ -0,0 +1,32 @@
+"""
+Create missing tables and apply pending schema migrations to rentsafe.db
+without rebuilding it.
+
+Usage:
+    python migrate.py           # apply pending migrations
+    python migrate.py --status  # list applied / pending versions
+"""
+import sys
+from app import app, init_db
+from db.db import db
+from db.migrations import MIGRATIONS, applied_versions
+
+
+def main(argv):
+    with app.app_context():
+        if "--status" in argv:
+            done = applied_versions(db.engine)
+            for version, name, _ in MIGRATIONS:
+                mark = "applied" if version in done else "pending"
+                print(f"{version:>4}  {mark:<8} {name}")
+            return
+
+        applied = init_db(app)
+        if not applied:
+            print("Schema is up to date.")
+        for version, name in applied:
+            print(f"✅ Applied migration {version}: {name}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,81 @@
+"""
+Aggregate the request profiles written by the profiling hook (api/profiling.py).
+
+Turn the hook on with RENTSAFE_PROFILE_SECRET (profile requests on demand)
+and/or RENTSAFE_PROFILE_SAMPLE_RATE=N (profile 1 in N requests) before
+starting the server. Profiles land in PROFILE_DIR (profiles/ next to app.py
+by default).
+
+Usage:
+    python profile_report.py --token                  # X-Profile header value, valid 10 minutes
+    curl -H "X-Profile: $(python profile_report.py --token)" localhost:8889/api/properties/all
+    python profile_report.py                          # time split per route
+    python profile_report.py --route api.get_all_properties --top 15
+    python profile_report.py --route api.get_all_properties --collapsed > all.folded
+    flamegraph.pl all.folded > all.svg                # or open all.folded in speedscope
+"""
+import argparse
+import io
+import json
+import pstats
+import sys
+
+from api.profiling import CATEGORIES, DEFAULT_TOKEN_TTL, folded, profile_files, sign, summarize
+from config import get_config
+
+
+def main(argv):
+    config = get_config()
+    parser = argparse.ArgumentParser(description="Summarize request profiles.")
+    parser.add_argument("--dir", default=config.PROFILE_DIR)
+    parser.add_argument("--route", help="only this endpoint, e.g. api.get_property")
+    parser.add_argument("--top", type=int, default=0, help="also list the N functions with the most own time")
+    parser.add_argument("--collapsed", action="store_true", help="print folded stacks for a flamegraph")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    parser.add_argument("--token", action="store_true", help="print a signed X-Profile header value")
+    parser.add_argument("--ttl", type=int, default=DEFAULT_TOKEN_TTL, help="seconds the --token stays valid")
+    args = parser.parse_args(argv)
+
+    if args.token:
+        if not config.PROFILE_SECRET:
+            print("❌ Set RENTSAFE_PROFILE_SECRET (the server's) to sign tokens", file=sys.stderr)
+            return 1
+        print(sign(config.PROFILE_SECRET, args.ttl))
+        return 0
+
+    files = profile_files(args.dir, args.route)
+    if not files:
+        print(f"❌ No profiles in {args.dir}" + (f" for {args.route}" if args.route else ""))
+        return 1
+    if args.collapsed:
+        print("\n".join(folded([path for path, _ in files])))
+        return 0
+
+    ranked = summarize(args.dir, args.route)
+    if args.json:
+        print(json.dumps([{key: value for key, value in item.items() if key not in ("stats", "files")}
+                          for item in ranked], indent=2))
+        return 0
+
+    print(f"🔬 {len(files)} profiles, {len(ranked)} routes\n")
+    for item in ranked:
+        profiled = sum(item["categories"].values()) or 1
+        print(f"{item['route']}: {item['count']}× mean {item['mean_ms']:.1f} ms, max {item['max_ms']:.1f} ms "
+              "(profiled, so slower than usual)")
+        for name in CATEGORIES:
+            ms = item["categories"][name]
+            if ms >= 0.05:
+                print(f"    {name:<14} {ms:8.1f} ms  {ms / profiled:4.0%}  {'█' * round(30 * ms / profiled)}")
+        if args.top:
+            out = io.StringIO()
+            item["stats"].stream = out
+            item["stats"].sort_stats(pstats.SortKey.TIME).print_stats(args.top)
+            lines = out.getvalue().splitlines()
+            start = next((i for i, line in enumerate(lines) if line.lstrip().startswith("ncalls")), 0)
+            print("\n".join("    " + line for line in lines[start:] if line.strip()))
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
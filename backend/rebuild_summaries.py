@@ -0,0 +1,35 @@
+"""
+Recompute the materialized dashboard counters (dashboard_summaries) from the
+contracts, escrow, applications and properties tables.
+
+Run after writes that bypass the ORM, or whenever --check reports drift.
+
+Usage:
+    python rebuild_summaries.py          # rebuild every counter
+    python rebuild_summaries.py --check  # report drifted counters, change nothing
+"""
+import sys
+from app import app
+from db.db import db
+from db.summary import check_summaries, rebuild_summaries
+
+
+def main(argv):
+    with app.app_context():
+        with db.engine.begin() as conn:
+            if "--check" in argv:
+                drift = check_summaries(conn)
+                for ic, role, metric, stored, expected in drift:
+                    print(f"❌ {ic} {role} {metric}: stored {stored}, expected {expected}")
+                if not drift:
+                    print("✅ Dashboard summaries are consistent.")
+                return 1 if drift else 0
+
+            rebuild_summaries(conn)
+            total = conn.execute(db.text("SELECT COUNT(*) FROM dashboard_summaries")).scalar()
+            print(f"✅ Rebuilt {total} dashboard counters.")
+            return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,61 @@
+"""
+Rank the statements in the slow-query log by total time.
+
+Enable the log with RENTSAFE_SLOW_QUERY_MS (e.g. 50) before starting the
+server; it is written to SLOW_QUERY_LOG (slow_queries.log next to app.py by
+default) and rotated. This reads the log and every rotated backup.
+
+Usage:
+    python slow_query_report.py                       # top 10 shapes
+    python slow_query_report.py --top 3 --plans       # with their query plans
+    python slow_query_report.py --route get_landlord_tenant_history
+    python slow_query_report.py --log /var/log/rentsafe/slow_queries.log --json
+"""
+import argparse
+import json
+import sys
+
+from config import get_config
+from db.slow_queries import log_files, summarize
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Summarize the slow-query log.")
+    parser.add_argument("--log", default=get_config().SLOW_QUERY_LOG)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--route", help="only statements run by this route")
+    parser.add_argument("--plans", action="store_true", help="print each shape's EXPLAIN QUERY PLAN")
+    parser.add_argument("--json", action="store_true", help="machine-readable output")
+    args = parser.parse_args(argv)
+
+    if not log_files(args.log):
+        print(f"❌ No slow-query log at {args.log} (is RENTSAFE_SLOW_QUERY_MS set?)")
+        return 1
+    ranked = summarize(args.log, route=args.route)
+    if args.json:
+        print(json.dumps(ranked[:args.top], indent=2))
+        return 0
+    if not ranked:
+        print("✅ No slow statements logged.")
+        return 0
+
+    total = sum(item["total_ms"] for item in ranked)
+    print(f"🐢 {sum(item['count'] for item in ranked)} slow statements, {len(ranked)} shapes, "
+          f"{total / 1000:.1f}s in total\n")
+    for rank, item in enumerate(ranked[:args.top], 1):
+        flag = f"  ⚠️  FULL SCAN of {', '.join(item['full_scan'])}" if item["full_scan"] else ""
+        routes = ", ".join(f"{route} ×{n}" for route, n in item["routes"].most_common(3))
+        print(f"{rank:>2}. [{item['shape']}] {item['total_ms']:.0f} ms total ({item['total_ms'] / total:.0%}), "
+              f"{item['count']}× mean {item['mean_ms']:.1f} ms, max {item['max_ms']:.1f} ms{flag}")
+        print(f"    routes: {routes}")
+        print(f"    {item['sql'][:300]}")
+        print(f"    slowest with: {json.dumps(item['params'])[:200]}")
+        if args.plans:
+            for line in item["plan"]:
+                print(f"      {line}")
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,95 @@
+"""
+Route benchmark: bench_routes.py measures every route on a generated dataset,
+saves the results as a JSON baseline, passes against its own baseline and
+fails when a route gets slower, allocates more or runs more queries than
+the baseline allows, or misses its fixed latency target.
+
+Uses a tiny dataset and short rounds in a throwaway database, so
+rentsafe.db is never touched and the numbers are only checked for shape.
+
+    python test_bench_routes.py      # or: python -m pytest test_bench_routes.py
+"""
+import copy
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+
+import bench_routes
+
+QUICK = ["--properties", "300", "--rounds", "1", "--round-seconds", "0.01", "--batch", "3"]
+
+
+def result(ops_per_s=100.0, alloc_kib=50.0, queries=4):
+    return {"dataset": {"properties": 300, "seed": 42},
+            "routes": {"properties.detail": {"ops_per_s": ops_per_s, "alloc_kib": alloc_kib, "queries": queries}}}
+
+
+def test_compare_thresholds():
+    baseline = result()
+    assert bench_routes.compare(baseline, result(ops_per_s=80)) == [("properties.detail", [])]
+    (_, problems), = bench_routes.compare(baseline, result(ops_per_s=70), tolerance=0.25)
+    assert problems == ["ops/s -30%"]
+    (_, problems), = bench_routes.compare(baseline, result(alloc_kib=70, queries=5))
+    assert problems == ["alloc +20 KiB", "queries 4 -> 5"]
+    assert bench_routes.compare(baseline, result(alloc_kib=63)) == [("properties.detail", [])]  # 20% + 4 KiB
+
+
+def test_latency_targets():
+    current = {"routes": {"properties.search": {"p95_ms": 60.0}, "properties.search_filtered": {"p95_ms": 20.0},
+                          "properties.detail": {"p95_ms": 500.0}}}  # no target
+    assert bench_routes.over_target(current) == [("properties.search", 60.0, 50)]
+
+
+def run_main(argv):
+    # Three requests a round give no stable p95; test_latency_targets covers the targets
+    targets, bench_routes.TARGETS_MS = bench_routes.TARGETS_MS, {}
+    out = StringIO()
+    try:
+        with redirect_stdout(out):
+            status = bench_routes.main(argv)
+    finally:
+        bench_routes.TARGETS_MS = targets
+    return status, out.getvalue()
+
+
+def test_save_then_compare():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "baseline.json")
+        status, output = run_main(QUICK + ["--save", "--baseline", path])
+        assert status == 0, output
+        with open(path) as f:
+            baseline = json.load(f)
+        assert sorted(baseline["routes"]) == sorted(bench_routes.ROUTES)
+        for name, numbers in baseline["routes"].items():
+            assert numbers["ops_per_s"] > 0 and numbers["alloc_kib"] > 0 and numbers["queries"] >= 1, name
+            assert name in bench_routes.WORKFLOW or numbers["p95_ms"] > 0, name
+
+        # a baseline this run cannot match: far faster, one query fewer
+        doctored = copy.deepcopy(baseline)
+        doctored["routes"]["tenant.rental_history"]["ops_per_s"] *= 100
+        doctored["routes"]["contract.tenant_sign"]["queries"] -= 1
+        with open(path, "w") as f:
+            json.dump(doctored, f)
+        status, output = run_main(QUICK + ["--baseline", path, "--routes", "tenant.rental,contract.tenant"])
+        assert status == 1, output
+        assert "tenant.rental_history" in output.split("regressed")[-1] and "queries" in output
+
+        # the dataset must match the baseline's
+        status, output = run_main(["--properties", "301", "--baseline", path])
+        assert status == 1 and "--properties 300" in output
+
+
+def test_metrics_overhead_shape():
+    # timing only: whether it fits the budget is up to `bench_routes.py --metrics-overhead`
+    overhead, per_request = bench_routes.metrics_overhead(calls=200, requests=20)
+    assert isinstance(overhead, float) and 0 < per_request < 1
+
+
+if __name__ == "__main__":
+    test_compare_thresholds()
+    test_latency_targets()
+    test_save_then_compare()
+    test_metrics_overhead_shape()
+    print("✅ bench_routes.py records a baseline for every route and flags regressions against it.")
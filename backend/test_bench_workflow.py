@@ -0,0 +1,61 @@
+"""
+Workflow load test: bench_workflow.py starts a server on a generated
+database, takes concurrent tenants through the whole lifecycle (apply ->
+approve -> photos -> sign -> escrow -> release) with no errors, reports every
+step, and its final-state checks catch unknown statuses, an orphaned escrow
+and lifecycles that did not end released.
+
+Starts a local server on a throwaway database, so rentsafe.db is never
+touched.
+
+    python test_bench_workflow.py      # or: python -m pytest test_bench_workflow.py
+"""
+import os
+import sqlite3
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+
+import bench_workflow
+
+
+def test_concurrent_lifecycles_end_consistent():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "rentsafe.db")
+        bench_workflow.prepare(db_path, 200, seed=1)
+        people = bench_workflow.add_tenants(db_path, 24, seed=1)
+        assert len({p["ic"] for p in people}) == 24
+        process, url, _ = bench_workflow.start_server("werkzeug", db_path, tmp, 1, 4)
+        try:
+            stats, seconds = bench_workflow.run_load(url, people, concurrency=6, think=0.005, seed=1)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        assert not stats.errors, stats.errors
+        assert sorted(stats.completed) == sorted(p["ic"] for p in people)
+        for step in bench_workflow.STEPS:
+            assert len(stats.latencies[step]) == 24, step
+
+        out = StringIO()
+        with redirect_stdout(out):
+            bench_workflow.report(stats, seconds, people, 6, locked=0)
+        assert "24 completed" in out.getvalue() and "escrow.approve_release" in out.getvalue()
+
+        checks = bench_workflow.check_final_state(db_path, people, stats.completed)
+        assert checks and not [name for name, problems in checks if problems], checks
+
+        # break the final state three ways; each check must notice
+        with sqlite3.connect(db_path) as conn:
+            conn.execute("UPDATE escrow SET status = 'lost' WHERE contract_id IN "
+                         "(SELECT id FROM contracts WHERE tenant_ic = ?)", (people[0]["ic"],))
+            conn.execute("UPDATE contracts SET status = 'limbo' WHERE tenant_ic = ?", (people[1]["ic"],))
+            conn.execute("DELETE FROM contracts WHERE tenant_ic = ?", (people[2]["ic"],))
+        failed = {name for name, problems in bench_workflow.check_final_state(db_path, people, stats.completed)
+                  if problems}
+        assert {"no escrow in an unknown status", "no contract in an unknown status", "no escrow without its contract",
+                "no approved application without a contract", "completed lifecycles ended released"} <= failed, failed
+
+
+if __name__ == "__main__":
+    test_concurrent_lifecycles_end_consistent()
+    print("✅ Concurrent tenants complete the whole lifecycle; the final-state checks catch inconsistencies.")
@@ -0,0 +1,184 @@
+"""
+Bulk property import: CSV and JSONL uploads are streamed into batched
+INSERTs with the same normalization as /properties/create, bad rows are
+reported without aborting their batch, and the imported rows are searchable,
+counted on the dashboard and visible through the (cached) catalog.
+
+Uses a throwaway database, so rentsafe.db is never touched.
+
+    python test_bulk_import.py      # or: python -m pytest test_bulk_import.py
+"""
+import io
+import json
+import os
+import tempfile
+import threading
+
+from db.db import db
+from db.db_tables import Property, PropertyAmenity
+from db.summary import check_summaries, read_summary
+from test_query_counts import LANDLORD_IC, make_app
+from app import create_app, init_db
+
+CSV = """title,price,location,bedrooms,amenities,housingType
+Ampang Loft,1800,"12, Jalan Ampang, Kuala Lumpur",2,"WiFi, Gym",Condominium
+Missing price,,"1, Jalan Bukit, Penang",1,,
+Bangsar Studio,abc,"3, Jalan Telawi, Kuala Lumpur",x,Pool,
+"""
+
+JSONL = "\n".join([
+    json.dumps({"title": "Cheras Terrace", "price": 2200, "city": "Kuala Lumpur", "state": "WP",
+                "address": "8 Jalan Cheras", "amenities": ["Parking", "Gym"]}),
+    "{not json",
+    json.dumps({"title": None, "price": 1000, "location": "5, Jalan Imbi, Kuala Lumpur"}),  # NOT NULL title
+    json.dumps(["a list"]),
+    "",
+    json.dumps({"title": "Imbi Suite", "price": 1500, "location": "5, Jalan Imbi, Kuala Lumpur"}),
+])
+
+
+def post(client, body, **params):
+    return client.post("/api/properties/import", data=body, query_string=params,
+                       content_type="text/csv" if params.get("format") == "csv" else "application/x-ndjson")
+
+
+def test_csv_and_jsonl_import():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        client = app.test_client()
+        first = client.get("/api/properties/all?all=true")
+        before = first.get_json()
+
+        csv_report = post(client, CSV, format="csv", landlord_ic=LANDLORD_IC).get_json()
+        assert (csv_report["imported"], csv_report["failed"]) == (2, 1), csv_report
+        assert csv_report["errors"][0]["row"] == 3
+
+        # batch_size=2 puts the NOT NULL failure in a batch with a good row
+        jsonl_report = post(client, JSONL, format="jsonl", batch_size=2, landlord_ic=LANDLORD_IC).get_json()
+        assert (jsonl_report["imported"], jsonl_report["failed"]) == (2, 3), jsonl_report
+        assert [e["row"] for e in sorted(jsonl_report["errors"], key=lambda e: e["row"])] == [2, 3, 4]
+
+        revalidated = client.get("/api/properties/all?all=true", headers={"If-None-Match": first.headers["ETag"]})
+        assert revalidated.status_code == 200, "catalog generation was not bumped"
+        after = revalidated.get_json()
+        assert len(after) == len(before) + 4, "catalog cache was not invalidated"
+        assert {p["title"] for p in client.get("/api/properties/search?q=imbi").get_json()["items"]} == {"Imbi Suite"}
+
+        with app.app_context():
+            loft = Property.query.filter_by(title="Ampang Loft").one()
+            studio = Property.query.filter_by(title="Bangsar Studio").one()
+            terrace = Property.query.filter_by(title="Cheras Terrace").one()
+            # same coercions as add_property
+            assert (loft.city, loft.state, loft.bedrooms, loft.amenities) == (
+                "Jalan Ampang", "Kuala Lumpur", 2, "WiFi, Gym")
+            assert (studio.price, studio.bedrooms, studio.size_sqft) == (0.0, 1, 800)
+            assert (terrace.city, terrace.state, terrace.location) == ("Kuala Lumpur", "WP", "8 Jalan Cheras")
+            assert {a.key for a in PropertyAmenity.query.filter_by(property_id=terrace.id)} == {"parking", "gym"}
+            with db.engine.connect() as conn:
+                assert not check_summaries(conn)
+                assert read_summary(conn, LANDLORD_IC, "landlord")["properties"][0] == 4
+            db.engine.dispose()
+
+
+class PausedUpload:
+    """A request body that stalls after its first part until `resume` is set."""
+
+    def __init__(self, first, rest):
+        self.parts = [first.encode(), rest.encode()]
+        self.size = sum(len(part) for part in self.parts)
+        self.resume = threading.Event()
+        self.position = 0
+
+    def read(self, size=-1):
+        if not self.parts:
+            return b""
+        if len(self.parts) == 1:
+            self.resume.wait(10)
+        part = self.parts[0]
+        if 0 <= size < len(part):
+            self.parts[0] = part[size:]
+            return part[:size]
+        return self.parts.pop(0)
+
+    # the test client seeks to the end to measure Content-Length
+    def seek(self, offset, whence=io.SEEK_SET):
+        self.position = self.size + offset if whence == io.SEEK_END else offset
+        return self.position
+
+    def tell(self):
+        return self.position
+
+
+def test_import_queues_per_batch():
+    header = "title,price,location\n"
+    row = '{},1500,"1, Jalan Ampang, Kuala Lumpur"\n'
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'rentsafe.db')}",
+                          "TESTING": True, "WRITER_QUEUE_TIMEOUT": 2.0})
+        init_db(app)
+        client = app.test_client()
+        upload = PausedUpload(header + row.format("A") + row.format("B"), row.format("C") + row.format("D"))
+        done = {}
+
+        def run_import():
+            done["import"] = client.post("/api/properties/import", input_stream=upload, content_type="text/csv",
+                                         query_string={"format": "csv", "batch_size": 2, "landlord_ic": LANDLORD_IC})
+
+        importer = threading.Thread(target=run_import)
+        importer.start()
+        try:
+            # the first batch is committed and the upload is stalled: other writes must not wait for it
+            for _ in range(200):
+                with app.app_context():
+                    if Property.query.count() == 2:
+                        break
+                threading.Event().wait(0.01)
+            created = client.post("/api/properties/create", json={
+                "title": "Between batches", "price": 1700, "location": "2, Jalan Ampang, Kuala Lumpur",
+                "landlord_ic": LANDLORD_IC})
+            assert created.status_code == 201, created.get_json()
+        finally:
+            upload.resume.set()
+            importer.join()
+        report = done["import"].get_json()
+        assert (done["import"].status_code, report["imported"], report["batches"]) == (200, 4, 2), report
+
+        # a batch that can't get the queue stops the import; committed batches are reported
+        writer = app.extensions["sqlite_writer"]
+        writer.timeout = 0.05
+        writer.acquire()
+        try:
+            busy = post(client, header + row.format("E"), format="csv", landlord_ic=LANDLORD_IC)
+        finally:
+            writer.release()
+        assert busy.status_code == 503 and busy.get_json()["imported"] == 0, busy.get_json()
+        with app.app_context():
+            assert Property.query.count() == 5
+            db.engine.dispose()
+
+
+def import_throughput(n=10000):
+    body = io.StringIO()
+    body.write("title,price,location,bedrooms,amenities\n")
+    for i in range(n):
+        body.write(f'Unit {i},{1500 + i % 500},"{i}, Jalan Ampang, Kuala Lumpur",{i % 4 + 1},"WiFi, Gym"\n')
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        report = post(app.test_client(), body.getvalue(), format="csv", landlord_ic=LANDLORD_IC).get_json()
+        with app.app_context():
+            db.engine.dispose()
+    return report
+
+
+def test_import_throughput():
+    report = import_throughput()
+    assert report["imported"] == 10000, report
+    # far below the ~10k rows/s target, but catches a fall back to per-row ORM inserts
+    assert report["rowsPerSecond"] > 2000, report
+
+
+if __name__ == "__main__":
+    test_csv_and_jsonl_import()
+    test_import_queues_per_batch()
+    report = import_throughput()
+    print(f"✅ Imported {report['imported']} rows at {report['rowsPerSecond']} rows/s; bad rows reported per line.")
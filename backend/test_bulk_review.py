@@ -0,0 +1,99 @@
+"""
+Bulk application review: one request approves/rejects many applications,
+creates the missing contracts with one INSERT and optionally rejects the
+other applicants, with a query count that doesn't grow with the batch.
+
+Uses a throwaway database, so rentsafe.db is never touched.
+
+    python test_bulk_review.py      # or: python -m pytest test_bulk_review.py
+"""
+import os
+import tempfile
+from collections import Counter
+
+from db.db import db
+from db.db_tables import Application, Contract, Property
+from db.query_count import count_queries
+from db.summary import check_summaries
+from test_query_counts import LANDLORD_IC, make_app
+
+
+def review(n):
+    """Approve one applicant per property for n properties (3 applicants each,
+    one already under contract), reject one, auto-reject the rest."""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            props = [Property(title=f"Unit {i}", location="Jalan Ampang, Kuala Lumpur", price=1500 + i,
+                              landlord_ic=LANDLORD_IC) for i in range(n)]
+            db.session.add_all(props)
+            db.session.flush()
+            apps = [Application(property_id=p.id, tenant_ic=f"9{i:03d}{j:02d}-01-0000", tenant_name=f"T{i}{j}")
+                    for i, p in enumerate(props) for j in range(3)]
+            db.session.add_all(apps)
+            db.session.flush()
+            # the first approval already has a contract (e.g. approved once before)
+            db.session.add(Contract(property_id=props[0].id, tenant_ic=apps[0].tenant_ic, landlord_ic=LANDLORD_IC,
+                                    monthly_rent=1500, deposit_amount=3000))
+            db.session.commit()
+            approve = [apps[3 * i].id for i in range(n)]
+            reject = [apps[1].id]
+            engine = db.engine
+
+        decisions = ([{"application_id": i, "decision": "approve"} for i in approve]
+                     + [{"application_id": i, "decision": "reject"} for i in reject]
+                     + [{"application_id": 99999, "decision": "approve"}])
+        client = app.test_client()
+        with count_queries(engine) as statements:
+            response = client.post("/api/applications/bulk-review",
+                                   json={"decisions": decisions, "auto_reject_others": True})
+        body = response.get_json()
+
+        with app.app_context():
+            statuses = Counter(a.status for a in Application.query)
+            contracts = Contract.query.count()
+            with db.engine.connect() as conn:
+                drift = check_summaries(conn)
+            db.engine.dispose()
+        kinds = Counter(s.split()[0] for s in statements if not s.lstrip().startswith("INSERT INTO dashboard"))
+        return response.status_code, body, statuses, contracts, drift, kinds
+
+
+def test_bulk_review():
+    code, body, statuses, contracts, drift, kinds = review(4)
+    assert code == 200, body
+    assert statuses == Counter(approved=4, rejected=8), statuses
+    assert contracts == 4 and body["contractsCreated"] == 3, (contracts, body)
+    assert len(body["autoRejected"]) == 7
+    assert all("contractId" in r for r in body["results"][:4])
+    assert body["results"][-1]["error"] == "Application not found"
+    assert not drift, drift
+
+
+def test_bulk_review_query_count_is_constant():
+    small, large = review(2)[-1], review(10)[-1]
+    # reads and inserts don't grow with the batch; UPDATEs are one per row
+    # because each carries its own version check
+    assert (small["SELECT"], small["INSERT"]) == (large["SELECT"], large["INSERT"]), (small, large)
+
+
+def test_bulk_review_rejects_bad_input():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        client = app.test_client()
+        assert client.post("/api/applications/bulk-review", json={"decisions": []}).status_code == 400
+        body = client.post("/api/applications/bulk-review",
+                           json={"decisions": [{"application_id": 1, "decision": "maybe"}]}).get_json()
+        assert "error" in body["results"][0]
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    code, body, statuses, contracts, drift, kinds = review(4)
+    small, large = review(2)[-1], review(10)[-1]
+    if code != 200 or drift or (small["SELECT"], small["INSERT"]) != (large["SELECT"], large["INSERT"]):
+        print(f"❌ {code} {body} drift={drift} statements: {dict(small)} vs {dict(large)}")
+    else:
+        print(f"✅ Bulk review: {dict(statuses)}, {body['contractsCreated']} contracts created, "
+              f"{large['SELECT']} SELECTs and {large['INSERT']} INSERT for any batch size.")
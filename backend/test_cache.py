@@ -0,0 +1,95 @@
+"""
+Response cache: LRU/TTL bounds, tag invalidation after commit, and a SQLite
+backend shared between processes.
+
+    python test_cache.py      # or: python -m pytest test_cache.py
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from api.cache import MemoryBackend, SQLiteBackend, cache
+from db.db import db
+from db.db_tables import Property
+from test_query_counts import LANDLORD_IC, make_app
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", b"1", 60, {})
+    backend.set("b", b"2", 60, {})
+    backend.get("a")
+    backend.set("c", b"3", 60, {})
+    assert backend.get("b") is None and backend.get("a") == b"1" and backend.evictions == 1
+
+
+def test_memory_backend_expires_and_respects_byte_bound():
+    backend = MemoryBackend(max_bytes=4)
+    backend.set("a", b"12", 0.01, {})
+    backend.set("b", b"345", 60, {})
+    assert backend.get("a") is None  # pushed out by the byte bound
+    backend.set("c", b"6", 0.01, {})
+    time.sleep(0.02)
+    assert backend.get("c") is None and backend.get("b") == b"345"
+
+
+def test_tag_bump_invalidates_only_tagged_entries():
+    backend = MemoryBackend()
+    backend.set("p1", b"x", 60, backend.generations(["property:1"]))
+    backend.set("p2", b"y", 60, backend.generations(["property:2"]))
+    backend.bump(["property:1"])
+    assert backend.get("p1") is None and backend.get("p2") == b"y"
+
+
+_OTHER_PROCESS = """
+import sys
+from api.cache import SQLiteBackend
+backend = SQLiteBackend(sys.argv[1])
+assert backend.get("k") == b"shared", backend.get("k")
+backend.bump(["property:1"])
+"""
+
+
+def test_sqlite_backend_is_shared_across_processes():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        backend = SQLiteBackend(path)
+        backend.set("k", b"shared", 60, backend.generations(["property:1"]))
+        subprocess.run([sys.executable, "-c", _OTHER_PROCESS, path], check=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        assert backend.get("k") is None  # invalidated by the other process
+
+
+def test_writes_invalidate_cached_routes_after_commit():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            db.session.add(Property(title="Unit A", location="Jalan Ampang, Kuala Lumpur", price=1500,
+                                    landlord_ic=LANDLORD_IC))
+            db.session.commit()
+        client = app.test_client()
+
+        assert client.get("/api/properties/1").get_json()["price"] == 1500
+        client.get("/api/properties/1")
+        assert cache.stats()["hits"] == 1
+
+        with app.app_context():
+            prop = db.session.get(Property, 1)
+            prop.price = 1700
+            db.session.flush()
+            # flushed but uncommitted: the cached copy is still the committed state
+            assert client.get("/api/properties/1").get_json()["price"] == 1500
+            db.session.commit()
+        assert client.get("/api/properties/1").get_json()["price"] == 1700
+
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in dict(globals()).items() if k.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
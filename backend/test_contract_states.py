@@ -0,0 +1,156 @@
+"""
+Contract state machine under concurrent signatures: tenant and landlord sign
+(and try to pay the deposit) at the same time, twice each, for many
+contracts. Every transition is a compare-and-swap on Contract.version, so
+each party signs exactly once, at most one escrow is created, and no contract
+ends in a status its columns contradict.
+
+Runs with the writer queue (tuned) and without it (default), where the
+version check is the only thing stopping lost updates. Uses a throwaway
+database, so rentsafe.db is never touched.
+
+    python test_contract_states.py      # or: python -m pytest test_contract_states.py
+"""
+import os
+import random
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app, init_db
+from db.contract_states import TRANSITIONS, contract_transitioned, impossible_states
+from db.db import db
+from db.db_tables import Contract, Escrow, Property
+from db.summary import check_summaries
+from test_query_counts import LANDLORD_IC, TENANT_IC
+
+PROFILES = {
+    "tuned": {},
+    "default": {"SQLITE_PRAGMAS": None, "WRITER_QUEUE_TIMEOUT": None},
+}
+N_CONTRACTS = 20
+THREADS = 8
+
+
+def requests_for(contract_id):
+    sign = {"name": "Ahmad", "ic": TENANT_IC}
+    pay = {"contract_id": contract_id, "amount": 3000}
+    return [
+        ("tenant_sign", f"/api/contracts/{contract_id}/tenant/sign", sign),
+        ("tenant_sign", f"/api/contracts/{contract_id}/tenant/sign", sign),
+        ("landlord_sign", f"/api/contracts/{contract_id}/landlord/sign", None),
+        ("landlord_sign", f"/api/contracts/{contract_id}/landlord/sign", None),
+        ("pay_deposit", "/api/escrow/create", pay),
+        ("pay_deposit", "/api/escrow/create", pay),
+    ]
+
+
+def run_stress(profile):
+    """Return a list of failure messages (empty when the state machine held)."""
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'rentsafe.db')}",
+                          "TESTING": True, "CACHE_BACKEND": "none", **PROFILES[profile]})
+        init_db(app)
+        with app.app_context():
+            prop = Property(title="Unit A", location="Jalan Ampang, Kuala Lumpur", price=1500, landlord_ic=LANDLORD_IC)
+            db.session.add(prop)
+            db.session.flush()
+            contracts = [Contract(property_id=prop.id, tenant_ic=TENANT_IC, landlord_ic=LANDLORD_IC,
+                                  monthly_rent=1500, deposit_amount=3000, status="awaiting_tenant_signature",
+                                  property_photos="living-room.jpg", photos_approved=True)
+                         for _ in range(N_CONTRACTS)]
+            db.session.add_all(contracts)
+            db.session.commit()
+            contract_ids = [c.id for c in contracts]
+
+        jobs = [(cid, *job) for cid in contract_ids for job in requests_for(cid)]
+        random.Random(7).shuffle(jobs)
+        events = Counter()
+
+        def on_transition(contract, event, **kwargs):
+            events[contract.id, event] += 1
+
+        def fire(job):
+            cid, event, url, body = job
+            return cid, event, app.test_client().post(url, json=body).status_code
+
+        contract_transitioned.connect(on_transition)
+        try:
+            with ThreadPoolExecutor(THREADS) as pool:
+                results = list(pool.map(fire, jobs))
+        finally:
+            contract_transitioned.disconnect(on_transition)
+
+        succeeded = Counter((cid, event) for cid, event, code in results if code in (200, 201))
+        codes = Counter(code for _, _, code in results)
+        if set(codes) - {200, 201, 400, 409}:
+            failures.append(f"[{profile}] unexpected status codes {dict(codes)}")
+
+        with app.app_context():
+            with db.engine.connect() as conn:
+                for cid, status, reason in impossible_states(conn):
+                    failures.append(f"[{profile}] contract {cid} is {status}: {reason}")
+                for drift in check_summaries(conn):
+                    failures.append(f"[{profile}] summary drifted: {drift}")
+            escrows = Counter(cid for (cid,) in db.session.query(Escrow.contract_id))
+            for contract in Contract.query.filter(Contract.id.in_(contract_ids)):
+                cid = contract.id
+                if succeeded[cid, "tenant_sign"] > 1 or succeeded[cid, "landlord_sign"] > 1:
+                    failures.append(f"[{profile}] contract {cid} signed twice by one party")
+                if escrows[cid] != succeeded[cid, "pay_deposit"] or escrows[cid] > 1:
+                    failures.append(f"[{profile}] contract {cid} has {escrows[cid]} escrows")
+                if contract.tenant_signed != bool(succeeded[cid, "tenant_sign"]):
+                    failures.append(f"[{profile}] contract {cid} tenant_signed={contract.tenant_signed} "
+                                    f"after {succeeded[cid, 'tenant_sign']} successful signatures")
+                if contract.landlord_signed != bool(succeeded[cid, "landlord_sign"]):
+                    failures.append(f"[{profile}] contract {cid} landlord_signed={contract.landlord_signed} "
+                                    f"after {succeeded[cid, 'landlord_sign']} successful signatures")
+            if events != succeeded:
+                failures.append(f"[{profile}] transition events {sum(events.values())} != "
+                                f"successful requests {sum(succeeded.values())}")
+            db.engine.dispose()
+    return failures
+
+
+def test_concurrent_signatures_tuned():
+    failures = run_stress("tuned")
+    assert not failures, "\n".join(failures)
+
+
+def test_concurrent_signatures_without_writer_queue():
+    failures = run_stress("default")
+    assert not failures, "\n".join(failures)
+
+
+def test_transition_messages():
+    assert all(t.action for t in TRANSITIONS.values())
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'rentsafe.db')}",
+                          "TESTING": True})
+        init_db(app)
+        with app.app_context():
+            prop = Property(title="Unit A", location="Jalan Ampang, Kuala Lumpur", price=1500, landlord_ic=LANDLORD_IC)
+            db.session.add(prop)
+            db.session.flush()
+            contract = Contract(property_id=prop.id, tenant_ic=TENANT_IC, landlord_ic=LANDLORD_IC,
+                                monthly_rent=1500, deposit_amount=3000, status="pending_photos")
+            db.session.add(contract)
+            db.session.commit()
+            cid = contract.id
+
+        response = app.test_client().post("/api/escrow/create", json={"contract_id": cid, "amount": 3000})
+        assert response.status_code == 409
+        assert response.get_json()["error"] == "Cannot pay the deposit for a contract in status 'pending_photos'"
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_transition_messages()
+    for profile in PROFILES:
+        failures = run_stress(profile)
+        for failure in failures:
+            print(f"❌ {failure}")
+        if not failures:
+            print(f"✅ [{profile}] {N_CONTRACTS} contracts signed concurrently; no impossible states.")
@@ -0,0 +1,93 @@
+"""
+Walk one tenancy through every dashboard transition route and check that the
+materialized dashboard_summaries counters match a full recompute after each
+step (and after a rolled-back write).
+
+Uses a throwaway database, so rentsafe.db is never touched.
+
+    python test_dashboard_summary.py      # or: python -m pytest test_dashboard_summary.py
+"""
+import os
+import tempfile
+
+from db.db import db
+from db.db_tables import Application, Property
+from db.summary import check_summaries
+from test_query_counts import LANDLORD_IC, TENANT_IC, make_app
+
+# (method, url template, json body built from the ids seen so far, expected status)
+FLOW = [
+    ("post", "/api/applications/{app_id}/approve", None, 200),
+    ("post", "/api/contracts/{contract_id}/upload-photos", None, 200),
+    ("post", "/api/contracts/{contract_id}/photos/reject", None, 200),
+    ("post", "/api/contracts/{contract_id}/upload-photos", None, 200),
+    ("post", "/api/contracts/{contract_id}/photos/approve", None, 200),
+    ("post", "/api/contracts/{contract_id}/tenant/sign", lambda ids: {"name": "Ahmad", "ic": TENANT_IC}, 200),
+    ("post", "/api/contracts/{contract_id}/landlord/sign", None, 200),
+    ("post", "/api/escrow/create", lambda ids: {"contract_id": ids["contract_id"], "amount": "3000"}, 201),
+    ("post", "/api/escrow/{escrow_id}/request-release", None, 200),
+    ("post", "/api/escrow/{escrow_id}/reject-release", None, 200),
+    ("post", "/api/escrow/{escrow_id}/approve-release", None, 200),
+    ("post", "/api/applications/{other_app_id}/reject", None, 200),
+]
+
+
+def run_flow():
+    """Return [(step, drifted counters)] for every step that left the summary inconsistent."""
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            prop = Property(title="Unit A", location="Jalan Ampang, Kuala Lumpur", price=1500, landlord_ic=LANDLORD_IC)
+            db.session.add(prop)
+            db.session.flush()
+            application = Application(property_id=prop.id, tenant_ic=TENANT_IC, tenant_name="Ahmad", status="pending")
+            other = Application(property_id=prop.id, tenant_ic="990101-01-0000", tenant_name="Siti", status="pending")
+            db.session.add_all([application, other])
+            db.session.commit()
+            ids = {"app_id": application.id, "other_app_id": other.id}
+
+            # a rolled-back write must not leave counter deltas behind
+            other.status = "approved"
+            db.session.flush()
+            db.session.rollback()
+            drift = check_summaries(db.session.connection())
+            if drift:
+                failures.append(("rollback", drift))
+
+        client = app.test_client()
+        for method, url, body, expected in FLOW:
+            with app.app_context():
+                ids["contract_id"] = db.session.execute(db.text("SELECT MAX(id) FROM contracts")).scalar()
+                ids["escrow_id"] = db.session.execute(db.text("SELECT MAX(id) FROM escrow")).scalar()
+            step = url.format(**ids)
+            response = getattr(client, method)(step, json=body(ids) if body else None)
+            assert response.status_code == expected, f"{step} -> {response.status_code}"
+            with app.app_context():
+                drift = check_summaries(db.session.connection())
+                if drift:
+                    failures.append((step, drift))
+
+        summary = client.get(f"/api/users/{LANDLORD_IC}/landlord-dashboard/summary").get_json()
+        assert summary["contractsByStatus"] == {"deposit_paid": 1}, summary
+        assert summary["escrowByStatus"] == {"released": {"count": 1, "amount": 3000.0}}, summary
+        assert summary["applicationsByStatus"] == {"approved": 1, "rejected": 1}, summary
+        tenant = client.get(f"/api/users/{TENANT_IC}/tenant-dashboard/summary").get_json()
+        assert tenant["escrowByStatus"] == summary["escrowByStatus"], tenant
+
+        with app.app_context():
+            db.engine.dispose()
+    return failures
+
+
+def test_summary_counters_follow_transitions():
+    failures = run_flow()
+    assert not failures, "\n".join(f"{step}: {drift}" for step, drift in failures)
+
+
+if __name__ == "__main__":
+    failures = run_flow()
+    for step, drift in failures:
+        print(f"❌ {step}: {drift}")
+    if not failures:
+        print("✅ Dashboard summary counters stayed consistent through every transition.")
@@ -0,0 +1,94 @@
+"""
+SQLite engine profile: pragmas on every connection, BEGIN IMMEDIATE for
+queued writes, a FIFO writer queue that times out cleanly, and per-thread
+WAL connections for the side stores.
+
+    python test_engine.py      # or: python -m pytest test_engine.py
+"""
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import event
+
+from db.db import db
+from db.engine import WriterBusy, WriterQueue
+from db.sqlite_conn import ThreadLocalConnection
+from test_query_counts import make_app
+
+
+def test_pragmas_and_immediate_writes():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            with db.engine.connect() as conn:
+                assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+                assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 5000
+                assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+
+            engine = db.engine
+
+        begins = []
+        event.listen(engine, "before_cursor_execute",
+                     lambda conn, cursor, stmt, *a: stmt.startswith("BEGIN") and begins.append(stmt))
+        client = app.test_client()
+        client.get("/api/properties/all")
+        client.post("/api/listings/save", json={"user_id": 1, "listing_id": 1})
+        assert begins == ["BEGIN", "BEGIN IMMEDIATE"], begins
+        engine.dispose()
+
+
+def test_writer_queue_is_fifo():
+    queue, order = WriterQueue(), []
+    queue.acquire()
+    threads = []
+    for i in range(5):
+        threads.append(threading.Thread(target=lambda i=i: (queue.acquire(), order.append(i), queue.release())))
+        threads[-1].start()
+        time.sleep(0.02)  # make arrival order deterministic
+    queue.release()
+    for t in threads:
+        t.join()
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_writer_queue_timeout_skips_abandoned_ticket():
+    queue = WriterQueue(timeout=0.05)
+    queue.acquire()
+    try:
+        queue.acquire()
+        raise AssertionError("expected WriterBusy")
+    except WriterBusy:
+        pass
+    queue.release()
+    queue.acquire()  # must not wait for the abandoned ticket
+    queue.release()
+    assert queue.stats()["served"] == 2
+
+
+def test_side_store_connections_are_per_thread():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = ThreadLocalConnection(os.path.join(tmp, "store.db"))
+        mine = conn()
+        assert conn() is mine
+        assert mine.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert mine.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+        other = []
+        thread = threading.Thread(target=lambda: (other.append(conn()), conn().close()))
+        thread.start()
+        thread.join()
+        assert other[0] is not mine
+
+        conn._local.pid = -1  # as seen from a forked worker
+        assert conn() is not mine
+        for c in (mine, conn()):
+            c.close()
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in dict(globals()).items() if k.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
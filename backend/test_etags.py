@@ -0,0 +1,162 @@
+"""
+Conditional GET: versioned reads answer If-None-Match with 304 and no body,
+and any write to the row (or the catalog) changes the ETag. A property edit
+(or application review, or escrow release) that loses the race on its
+version gets a 409, not a 500.
+
+Uses a throwaway database, so rentsafe.db is never touched.
+
+    python test_etags.py      # or: python -m pytest test_etags.py
+"""
+import os
+import tempfile
+
+from sqlalchemy import event, text
+
+from db.db import db
+from db.db_tables import Application, Contract, Escrow, Property
+from test_query_counts import LANDLORD_IC, TENANT_IC, make_app
+
+# (GET url, write that must invalidate it)
+CASES = [
+    ("/api/properties/{pid}", ("put", "/api/properties/{pid}/update", {"price": 1800})),
+    ("/api/properties/all", ("put", "/api/properties/{pid}/update", {"bedrooms": 3})),
+    ("/api/properties/all?all=true", ("post", "/api/properties/create",
+                                      {"title": "Unit B", "location": "Jalan Tun Razak, Kuala Lumpur",
+                                       "price": 2000, "landlord_ic": LANDLORD_IC})),
+    ("/api/properties/search?q=ampang", ("put", "/api/properties/{pid}/update", {"title": "Ampang Loft"})),
+    ("/api/properties/all", ("delete", "/api/properties/{did}/delete", None)),
+    ("/api/contracts/{cid}", ("post", "/api/contracts/{cid}/upload-photos", None)),
+    ("/api/contracts/{cid}", ("put", "/api/properties/{pid}/update", {"price": 1900})),
+    ("/api/escrow/{sid}", ("post", "/api/escrow/create", {"contract_id": "{sid}", "amount": 3000})),
+]
+
+
+def check_etags():
+    """Return a list of failure messages (empty when every case behaves)."""
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            prop = Property(title="Unit A", location="Jalan Ampang, Kuala Lumpur", price=1500, landlord_ic=LANDLORD_IC)
+            doomed = Property(title="Unit Z", location="Jalan Ampang, Kuala Lumpur", price=900, landlord_ic=LANDLORD_IC)
+            db.session.add_all([prop, doomed])
+            db.session.flush()
+            contract = Contract(property_id=prop.id, tenant_ic=TENANT_IC, landlord_ic=LANDLORD_IC,
+                                monthly_rent=1500, deposit_amount=3000)
+            # deposits can only be paid once both parties have signed
+            signed = Contract(property_id=prop.id, tenant_ic=TENANT_IC, landlord_ic=LANDLORD_IC,
+                              monthly_rent=1500, deposit_amount=3000, status="active",
+                              photos_approved=True, tenant_signed=True, landlord_signed=True)
+            db.session.add_all([contract, signed])
+            db.session.commit()
+            ids = {"pid": prop.id, "did": doomed.id, "cid": contract.id, "sid": signed.id}
+
+        client = app.test_client()
+        for url, (method, write_url, body) in CASES:
+            url, write_url = url.format(**ids), write_url.format(**ids)
+            if body:
+                body = {k: (int(v.format(**ids)) if isinstance(v, str) and "{" in v else v) for k, v in body.items()}
+
+            first = client.get(url)
+            tag = first.headers.get("ETag")
+            again = client.get(url, headers={"If-None-Match": tag})
+            if not tag or again.status_code != 304 or again.data:
+                failures.append(f"{url}: expected 304 with empty body for {tag}, got {again.status_code}")
+
+            getattr(client, method)(write_url, json=body)
+            after = client.get(url, headers={"If-None-Match": tag})
+            if after.status_code != 200 or after.headers.get("ETag") == tag:
+                failures.append(f"{url}: still {after.status_code} {tag} after {write_url}")
+
+        with app.app_context():
+            db.engine.dispose()
+    return failures
+
+
+def test_conditional_get():
+    failures = check_etags()
+    assert not failures, "\n".join(failures)
+
+
+def _edited_meanwhile(table):
+    def bump(mapper, connection, target):
+        # another request commits its edit between our read and our UPDATE
+        connection.execute(text(f"UPDATE {table} SET version = version + 1 WHERE id = :id"), {"id": target.id})
+    return bump
+
+
+def _lose_then_win(client, model, table, method, url, body=None):
+    """The first write loses the race on the row's version; the retry goes through."""
+    bump = _edited_meanwhile(table)
+    event.listen(model, "before_update", bump)
+    try:
+        lost = getattr(client, method)(url, json=body)
+    finally:
+        event.remove(model, "before_update", bump)
+    assert lost.status_code == 409, (url, lost.status_code)
+    won = getattr(client, method)(url, json=body)
+    assert won.status_code == 200, (url, won.status_code)
+    return won
+
+
+def test_concurrent_property_edit():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            prop = Property(title="Unit A", location="Jalan Ampang, Kuala Lumpur", price=1500, landlord_ic=LANDLORD_IC)
+            db.session.add(prop)
+            db.session.commit()
+            pid = prop.id
+
+        client = app.test_client()
+        url = f"/api/properties/{pid}/update"
+        bump = _edited_meanwhile("properties")
+        event.listen(Property, "before_update", bump)
+        try:
+            assert client.put(url, json={"price": 1800}).status_code == 409
+        finally:
+            event.remove(Property, "before_update", bump)
+        assert client.get(f"/api/properties/{pid}").get_json()["price"] == 1500  # nothing half-written
+
+        won = _lose_then_win(client, Property, "properties", "put", url, {"price": 1800})
+        assert won.get_json()["property"]["price"] == 1800
+        with app.app_context():
+            db.engine.dispose()
+
+
+def test_concurrent_review_and_release():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            prop = Property(title="Unit A", location="Jalan Ampang, Kuala Lumpur", price=1500, landlord_ic=LANDLORD_IC)
+            db.session.add(prop)
+            db.session.flush()
+            application = Application(property_id=prop.id, tenant_ic=TENANT_IC, tenant_name="Tenant")
+            contract = Contract(property_id=prop.id, tenant_ic=TENANT_IC, landlord_ic=LANDLORD_IC,
+                                monthly_rent=1500, deposit_amount=3000, status="active")
+            db.session.add_all([application, contract])
+            db.session.flush()
+            escrow = Escrow(contract_id=contract.id, amount=3000, status="release_requested")
+            db.session.add(escrow)
+            db.session.commit()
+            app_id, escrow_id = application.id, escrow.id
+
+        client = app.test_client()
+        won = _lose_then_win(client, Application, "applications", "post", f"/api/applications/{app_id}/approve")
+        assert won.get_json()["application"]["status"] == "approved"
+        won = _lose_then_win(client, Escrow, "escrow", "post", f"/api/escrow/{escrow_id}/approve-release")
+        assert won.get_json()["escrow"]["status"] == "released"
+        with app.app_context():
+            assert Contract.query.filter_by(tenant_ic=TENANT_IC).count() == 1  # the lost approval left no contract
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_concurrent_property_edit()
+    test_concurrent_review_and_release()
+    failures = check_etags()
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ ETags revalidate with 304 and change on every write.")
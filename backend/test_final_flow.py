@@ -8,7 +8,7 @@ def run_test():
     print("🚀 STARTING FINAL BACKEND TEST...")
     
     # --- PRE-REQUISITE: WE NEED DATA ---
-    # We assume you have run 'python seed_data.py' or have data in DB.
+    # We assume you have run 'python generate_data.py --reset' or have data in DB.
     # If not, let's just try to hit the endpoints assuming ID=1 exists.
     
     # 1. APPROVE APPLICATION (Triggers Contract Generation)
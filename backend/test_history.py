@@ -22,7 +22,7 @@ def run_history_test():
             raw_data = response.read().decode()
             
             # Parse JSON
-            history_list = json.loads(raw_data)
+            history_list = json.loads(raw_data)["items"]
 
             if status_code == 200:
                 print(f"   ✅ Connection Success! (Status: 200)")
@@ -0,0 +1,175 @@
+"""
+Idempotency-Key: a retried POST gets the first response back instead of
+running twice, a reused key with a different body is refused, a 409 is
+never replayed, and unique indexes stop duplicate escrows / saved rows even
+without a key.
+
+Runs against the memory and sqlite backends with a throwaway database, so
+rentsafe.db is never touched.
+
+    python test_idempotency.py      # or: python -m pytest test_idempotency.py
+"""
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.exc import IntegrityError
+
+from api.idempotency import MemoryIdempotencyStore, SQLiteIdempotencyStore
+from app import create_app, init_db
+from db.db import db
+from db.db_tables import Application, Contract, Escrow, Property, SavedListing, User
+from test_query_counts import LANDLORD_IC, TENANT_IC
+
+
+def make_app(tmp, backend):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'rentsafe.db')}",
+                      "TESTING": True, "IDEMPOTENCY_BACKEND": backend,
+                      "IDEMPOTENCY_PATH": os.path.join(tmp, "idempotency.db")})
+    init_db(app)
+    with app.app_context():
+        user = User(ic=TENANT_IC, name="Ahmad", age=30, gender="Male")
+        prop = Property(title="Unit A", location="Jalan Ampang, Kuala Lumpur", price=1500, landlord_ic=LANDLORD_IC)
+        db.session.add_all([user, prop])
+        db.session.flush()
+        contract = Contract(property_id=prop.id, tenant_ic=TENANT_IC, landlord_ic=LANDLORD_IC, monthly_rent=1500,
+                            deposit_amount=3000, status="active", photos_approved=True,
+                            tenant_signed=True, landlord_signed=True)
+        db.session.add(contract)
+        db.session.commit()
+        ids = {"user_id": user.id, "property_id": prop.id, "contract_id": contract.id}
+    return app, ids
+
+
+def check_replays(backend):
+    """Return a list of failure messages (empty when every case behaves)."""
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app, ids = make_app(tmp, backend)
+        client = app.test_client()
+
+        # a retried payment replays the first response and creates one escrow
+        pay = {"contract_id": ids["contract_id"], "amount": 3000}
+        first = client.post("/api/escrow/create", json=pay, headers={"Idempotency-Key": "pay-1"})
+        retry = client.post("/api/escrow/create", json=pay, headers={"Idempotency-Key": "pay-1"})
+        if first.status_code != 201 or retry.status_code != 201 or retry.data != first.data:
+            failures.append(f"[{backend}] escrow retry: {first.status_code} then {retry.status_code}")
+        if retry.headers.get("Idempotent-Replayed") != "true" or "Idempotent-Replayed" in first.headers:
+            failures.append(f"[{backend}] escrow retry was not marked as a replay")
+
+        # a retried save doesn't flip the listing back to unsaved, with a key
+        # or with an explicit `saved` intent
+        save = {"user_id": ids["user_id"], "listing_id": ids["property_id"]}
+        for _ in range(2):
+            client.post("/api/listings/save", json=save, headers={"Idempotency-Key": "save-1"})
+        for _ in range(2):
+            client.post("/api/listings/save", json={**save, "saved": True})
+
+        # same key, different request
+        other = client.post("/api/escrow/create", json={**pay, "amount": 1}, headers={"Idempotency-Key": "pay-1"})
+        if other.status_code != 422:
+            failures.append(f"[{backend}] reused key with a new body answered {other.status_code}, expected 422")
+
+        # concurrent retries of one application: exactly one runs
+        apply = {"tenant_ic": TENANT_IC, "property_id": ids["property_id"]}
+        with ThreadPoolExecutor(6) as pool:
+            codes = list(pool.map(lambda _: app.test_client().post(
+                "/api/applications/create", json=apply, headers={"Idempotency-Key": "apply-1"}).status_code, range(6)))
+        if set(codes) - {200, 409}:
+            failures.append(f"[{backend}] concurrent retries answered {codes}")
+
+        with app.app_context():
+            escrows = Escrow.query.filter_by(contract_id=ids["contract_id"]).count()
+            saved = SavedListing.query.filter_by(user_id=ids["user_id"]).count()
+            applications = Application.query.filter_by(tenant_ic=TENANT_IC).count()
+            if (escrows, saved, applications) != (1, 1, 1):
+                failures.append(f"[{backend}] expected one escrow, saved row and application; "
+                                f"got {escrows}, {saved}, {applications}")
+            db.engine.dispose()
+    return failures
+
+
+def test_conflicts_are_not_replayed():
+    # a 409 tells the client to retry; storing it would answer every retry
+    # with the same conflict and the tenant could never pay
+    with tempfile.TemporaryDirectory() as tmp:
+        app, ids = make_app(tmp, "sqlite")
+        with app.app_context():
+            contract = db.session.get(Contract, ids["contract_id"])
+            contract.status, contract.landlord_signed = "tenant_signed_waiting_landlord", False
+            db.session.commit()
+        client = app.test_client()
+        pay = {"contract_id": ids["contract_id"], "amount": 3000}
+        early = client.post("/api/escrow/create", json=pay, headers={"Idempotency-Key": "pay-1"})
+        assert early.status_code == 409, early.get_json()
+        client.post(f"/api/contracts/{ids['contract_id']}/landlord/sign")
+        retry = client.post("/api/escrow/create", json=pay, headers={"Idempotency-Key": "pay-1"})
+        assert retry.status_code == 201 and "Idempotent-Replayed" not in retry.headers, retry.get_json()
+        with app.app_context():
+            db.engine.dispose()
+
+
+def test_save_intent_is_idempotent():
+    with tempfile.TemporaryDirectory() as tmp:
+        app, ids = make_app(tmp, "memory")
+        client = app.test_client()
+        save = {"user_id": ids["user_id"], "listing_id": ids["property_id"]}
+
+        def saved():
+            return len(client.get(f"/api/listings/saved/{ids['user_id']}").get_json())
+
+        for intent, expected in ((True, 1), (True, 1), (False, 0), (False, 0)):
+            client.post("/api/listings/save", json={**save, "saved": intent})
+            assert saved() == expected, (intent, expected)
+        client.post("/api/listings/save", json=save)  # no intent: toggles
+        assert saved() == 1
+        with app.app_context():
+            db.engine.dispose()
+
+
+def test_replays_memory():
+    failures = check_replays("memory")
+    assert not failures, "\n".join(failures)
+
+
+def test_replays_sqlite():
+    failures = check_replays("sqlite")
+    assert not failures, "\n".join(failures)
+
+
+def test_store_claims_expire_and_release():
+    with tempfile.TemporaryDirectory() as tmp:
+        for store in (MemoryIdempotencyStore(ttl=0.05), SQLiteIdempotencyStore(os.path.join(tmp, "keys.db"), ttl=0.05)):
+            assert store.claim("k", "fp") is None
+            assert store.claim("k", "fp") == ("fp", None, None, None)  # still running
+            store.release("k")  # e.g. the request failed with a 500
+            assert store.claim("k", "fp") is None
+            store.complete("k", "fp", 201, b"{}", "application/json")
+            assert store.claim("k", "fp") == ("fp", 201, b"{}", "application/json")
+            time.sleep(0.1)
+            assert store.claim("k", "fp") is None, store.name
+
+
+def test_one_escrow_per_contract():
+    with tempfile.TemporaryDirectory() as tmp:
+        app, ids = make_app(tmp, "memory")
+        with app.app_context():
+            for _ in range(2):
+                db.session.add(Escrow(contract_id=ids["contract_id"], amount=3000, status="secured"))
+            try:
+                db.session.commit()
+                raise AssertionError("expected uq_escrow_contract_id to reject a second escrow")
+            except IntegrityError:
+                db.session.rollback()
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_conflicts_are_not_replayed()
+    test_save_intent_is_idempotent()
+    failures = check_replays("memory") + check_replays("sqlite")
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Retried requests replay their first response; duplicates are refused.")
@@ -0,0 +1,126 @@
+"""
+Request metrics: /api/metrics reports per-route request and error counts,
+latency histograms with p50/p95/p99, SQL statements and time per request and
+response sizes in the Prometheus text format; workers sharing METRICS_DIR
+report each other's counts (including workers that have exited). The
+instrumentation's cost is timed by `python bench_routes.py --metrics-overhead`.
+
+Uses throwaway databases, so rentsafe.db is never touched.
+
+    python test_metrics.py      # or: python -m pytest test_metrics.py
+"""
+import os
+import re
+import tempfile
+
+from api.metrics import metrics
+from app import create_app, init_db
+from db.db import db
+from test_export import export_client
+from test_query_counts import make_app, seed
+
+SAMPLE = re.compile(r'^(\w+)\{(.*)\} (\S+)$')
+
+
+def parse(text):
+    """{(name, frozenset of label pairs): value} from the exposition format."""
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        name, labels, value = SAMPLE.match(line).groups()
+        samples[name, frozenset(re.findall(r'(\w+)="([^"]*)"', labels))] = float(value)
+    return samples
+
+
+def sample(samples, name, **labels):
+    return samples[f"rentsafe_{name}", frozenset((k, str(v)) for k, v in labels.items())]
+
+
+def test_metrics_per_route():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+
+        @app.route("/api/test-failure")
+        def failing():
+            raise RuntimeError("boom")
+
+        with app.app_context():
+            seed(3)
+        client = export_client(app)  # also reads /api/export
+        for _ in range(5):
+            assert client.get("/api/properties/1").status_code == 200
+        assert client.get("/api/properties/999").status_code == 404
+        # abort() / routing errors have lazily sent bodies; a server always reads them
+        response = client.get("/api/no-such-route")
+        assert response.status_code == 404
+        response.close()
+        try:
+            client.get("/api/test-failure")
+        except RuntimeError:
+            pass  # TESTING propagates the exception; the metrics still count it
+
+        response = client.get("/api/metrics")
+        assert response.status_code == 200 and response.mimetype == "text/plain"
+        samples = parse(response.get_data(as_text=True))
+        route = {"route": "api.get_property", "method": "GET"}
+        assert sample(samples, "http_requests_total", status=200, **route) == 5
+        assert sample(samples, "http_requests_total", status=404, **route) == 1
+        assert sample(samples, "http_request_errors_total", **route) == 0
+        assert sample(samples, "http_requests_total", route="unmatched", method="GET", status=404) == 1
+        assert sample(samples, "http_request_errors_total", route="failing", method="GET") == 1
+
+        assert sample(samples, "http_request_duration_seconds_count", **route) == 6
+        assert sample(samples, "http_request_duration_seconds_bucket", le="+Inf", **route) == 6
+        p50, p99 = (sample(samples, "http_request_duration_quantile_seconds", quantile=q, **route) for q in (0.5, 0.99))
+        assert 0 < p50 <= p99 <= 10
+        # cached hits run one version query; the first request and the 404 run more
+        assert 6 <= sample(samples, "sql_statements_per_request_sum", **route) < 20
+        assert sample(samples, "sql_seconds_per_request_sum", **route) > 0
+        assert sample(samples, "http_response_bytes_sum", **route) > 5 * 100
+
+        # streamed responses are measured once the body has been sent
+        client.get("/api/export/contracts").get_data()
+        samples = parse(client.get("/api/metrics").get_data(as_text=True))
+        export = {"route": "api.export_table", "method": "GET"}
+        assert sample(samples, "http_response_bytes_sum", **export) == len(client.get("/api/export/contracts").data)
+        assert sample(samples, "sql_statements_per_request_sum", **export) >= 2
+        with app.app_context():
+            db.engine.dispose()
+
+
+def test_workers_share_metrics_dir():
+    if not hasattr(os, "fork"):
+        return  # METRICS_DIR is for multi-process serving
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'rentsafe.db')}",
+                          "TESTING": True, "METRICS_DIR": os.path.join(tmp, "metrics")})
+        init_db(app)
+        with app.app_context():
+            seed(1)
+            db.engine.dispose()
+        for _ in range(2):  # two workers that serve and exit, like recycled gunicorn workers
+            pid = os.fork()
+            if pid == 0:
+                client = app.test_client()
+                for _ in range(3):
+                    client.get("/api/properties/1")
+                metrics.flush()  # gunicorn's worker_exit hook
+                os._exit(0)
+            os.waitpid(pid, 0)
+        client = app.test_client()
+        client.get("/api/properties/1")
+        samples = parse(client.get("/api/metrics").get_data(as_text=True))
+        assert sample(samples, "http_requests_total", route="api.get_property", method="GET", status=200) == 7
+        assert "exited.json" in os.listdir(os.path.join(tmp, "metrics"))
+        # counts of exited workers survive the next scrape too
+        samples = parse(client.get("/api/metrics").get_data(as_text=True))
+        assert sample(samples, "http_requests_total", route="api.get_property", method="GET", status=200) == 7
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_metrics_per_route()
+    test_workers_share_metrics_dir()
+    print("✅ /api/metrics reports every route, and workers sharing METRICS_DIR report each other's counts.")
@@ -0,0 +1,124 @@
+"""
+Request profiling: a request with a valid signed X-Profile header (or the
+1-in-N sampled one) is profiled into PROFILE_DIR, tagged with its route and
+duration; other requests, expired or forged tokens are not; the directory is
+bounded; and profile_report.py splits a route's time between SQL, ORM
+hydration, to_dict and jsonify and prints flamegraph-ready folded stacks.
+
+Uses throwaway databases and directories, so rentsafe.db is never touched.
+
+    python test_profiling.py      # or: python -m pytest test_profiling.py
+"""
+import os
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+
+from api.profiling import CATEGORIES, profile_files, profiler, sign, summarize, verify
+from app import create_app, init_db
+from db.db import db
+from test_export import export_client
+from test_query_counts import seed
+import profile_report
+
+SECRET = "test-profile-secret"
+
+
+def make_app(tmp, **config):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'rentsafe.db')}", "TESTING": True,
+                      "PROFILE_DIR": os.path.join(tmp, "profiles"), **config})
+    init_db(app)
+    return app
+
+
+def test_tokens():
+    now = time.time()
+    token = sign(SECRET, ttl=60, now=now)
+    assert verify(SECRET, token, now=now + 59)
+    assert not verify(SECRET, token, now=now + 61)
+    assert not verify("another secret", token, now=now)
+    assert not verify(SECRET, token[:-1] + ("0" if token[-1] != "0" else "1"), now=now)
+    assert not verify(SECRET, "garbage", now=now) and not verify(None, token, now=now)
+
+
+def test_signed_header_profiles_one_request():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, PROFILE_SECRET=SECRET)
+        with app.app_context():
+            seed(20)
+        client = app.test_client()
+        directory = os.path.join(tmp, "profiles")
+
+        assert "X-Profile-Id" not in client.get("/api/properties/1").headers
+        forged = sign("not the secret")
+        assert "X-Profile-Id" not in client.get("/api/properties/2", headers={"X-Profile": forged}).headers
+        assert profile_files(directory) == []
+
+        response = client.get("/api/properties/all?all=true", headers={"X-Profile": sign(SECRET)})
+        assert response.status_code == 200 and len(response.json) == 20
+        (path, info), = profile_files(directory)
+        assert os.path.basename(path).startswith(response.headers["X-Profile-Id"])
+        assert info["route"] == "api.get_all_properties" and info["status"] == 200 and info["ms"] > 0
+
+        # the time split covers the request and names where it went
+        (item,) = summarize(directory)
+        assert item["route"] == "api.get_all_properties" and item["count"] == 1
+        split = item["categories"]
+        assert set(split) == set(CATEGORIES)
+        for name in ("sql", "orm_hydration", "to_dict", "jsonify"):
+            assert split[name] > 0, split
+        assert 0.5 * info["ms"] < sum(split.values()) <= info["ms"] * 1.05, (split, info["ms"])
+
+        out = StringIO()
+        with redirect_stdout(out):
+            assert profile_report.main(["--dir", directory, "--top", "5"]) == 0
+        report = out.getvalue()
+        assert "api.get_all_properties" in report and "orm_hydration" in report and "tottime" in report
+
+        out = StringIO()
+        with redirect_stdout(out):
+            assert profile_report.main(["--dir", directory, "--collapsed"]) == 0
+        lines = out.getvalue().splitlines()
+        assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+        assert any("to_dict (db/db_tables.py" in line for line in lines)
+        with app.app_context():
+            db.engine.dispose()
+
+
+def test_sampling_and_bounded_directory():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, PROFILE_SAMPLE_RATE=3, PROFILE_MAX_FILES=4)
+        with app.app_context():
+            seed(3)
+        client = export_client(app)  # also reads /api/export
+        tagged = [bool(client.get("/api/properties/1").headers.get("X-Profile-Id")) for _ in range(17)]
+        assert tagged.count(True) == 5 and tagged[2] and not tagged[0]
+        # the 18th request is sampled too; a streamed body is profiled until it has been sent
+        response = client.get("/api/export/contracts")
+        assert response.headers.get("X-Profile-Id")
+        response.get_data()
+        response.close()
+        files = profile_files(os.path.join(tmp, "profiles"))
+        assert len(files) == 4  # the newest PROFILE_MAX_FILES
+        assert files[-1][1]["route"] == "api.export_table"
+        with app.app_context():
+            db.engine.dispose()
+
+
+def test_off_by_default():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, PROFILE_SECRET=None, PROFILE_SAMPLE_RATE=0)
+        assert not profiler.enabled and not hasattr(app.wsgi_app.__wrapped__, "__wrapped__")
+        assert not os.path.exists(os.path.join(tmp, "profiles"))
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_tokens()
+    test_signed_header_profiles_one_request()
+    test_sampling_and_bounded_directory()
+    test_off_by_default()
+    print("✅ Signed or sampled requests are profiled per route; the report splits their time "
+          "between SQL, ORM hydration, to_dict and jsonify.")
@@ -0,0 +1,179 @@
+"""
+Guard against N+1 queries: every list endpoint must run the same number of
+SQL statements whether it returns a few rows or many. The landlord dashboard
+also has a fixed statement budget and bounded lists.
+
+Builds a throwaway database per size, so rentsafe.db is never touched.
+
+    python test_query_counts.py      # or: python -m pytest test_query_counts.py
+"""
+import os
+import tempfile
+from datetime import datetime
+
+from app import create_app, init_db
+from db.db import db
+from db.db_tables import Application, Contract, Escrow, Property, SavedListing, User
+from db.query_count import count_queries
+
+LANDLORD_IC = "800515-01-5678"
+TENANT_IC = "950101-01-1234"
+
+# Endpoints whose response grows with the seeded rows
+LIST_ENDPOINTS = [
+    f"/api/applications/{TENANT_IC}",
+    "/api/properties/1/applications",
+    f"/api/users/{TENANT_IC}/rental-history",
+    f"/api/users/{TENANT_IC}/contracts-full",
+    f"/api/users/{LANDLORD_IC}/landlord-dashboard",
+    f"/api/landlord/{LANDLORD_IC}/tenant-history",
+    f"/api/landlord/{LANDLORD_IC}/contracts",
+    "/api/listings/saved/1",
+    "/api/properties/all?all=true",
+    "/api/properties/all",
+    f"/api/properties/all?landlord_ic={LANDLORD_IC}&limit=100",
+]
+
+
+def make_app(db_path):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}", "TESTING": True})
+    init_db(app)
+    return app
+
+
+def seed(n):
+    """n properties for one landlord, each applied for, contracted, escrowed and saved."""
+    tenant = User(ic=TENANT_IC, name="Ahmad", age=30, gender="Male")
+    db.session.add(tenant)
+    properties = [
+        Property(title=f"Unit {i}", location=f"Unit {i}, Jalan Ampang, Kuala Lumpur", price=1500 + i,
+                 landlord_ic=LANDLORD_IC, amenities="WiFi, Gym")
+        for i in range(n)
+    ]
+    db.session.add_all(properties)
+    db.session.flush()
+    for i, p in enumerate(properties):
+        db.session.add(Application(property_id=p.id, tenant_ic=TENANT_IC, tenant_name="Ahmad", status="pending"))
+        # extra applicants on property 1 so its application list grows too
+        db.session.add(Application(property_id=properties[0].id, tenant_ic=f"9{i:05d}-01-0000",
+                                   tenant_name=f"Applicant {i}", status="pending"))
+        contract = Contract(property_id=p.id, tenant_ic=TENANT_IC, landlord_ic=LANDLORD_IC, monthly_rent=p.price,
+                            deposit_amount=p.price * 2, status="active" if i % 2 else "pending_photos")
+        db.session.add(contract)
+        db.session.flush()
+        db.session.add(Escrow(contract_id=contract.id, amount=p.price * 2, status="secured", paid_at=datetime.utcnow()))
+        db.session.add(SavedListing(user_id=tenant.id, listing_id=p.id))
+    db.session.commit()
+
+
+def statement_counts(n):
+    """{endpoint: statements executed} against a database seeded with n rows."""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            seed(n)
+            engine = db.engine
+        client = app.test_client()
+        counts = {}
+        for url in LIST_ENDPOINTS:
+            with count_queries(engine) as statements:
+                response = client.get(url)
+            assert response.status_code == 200, f"{url} -> {response.status_code}"
+            counts[url] = len(statements)
+        with app.app_context():
+            db.engine.dispose()
+        return counts
+
+
+# BEGIN, counters, properties page, pending applications, contracts, secured
+# escrows, and one amenities load for each of the three property batches
+DASHBOARD_STATEMENTS = 9
+
+
+def check_landlord_dashboard(n=12, limit=5):
+    """Return a list of failure messages for the dashboard of a landlord with n of everything."""
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            seed(n)
+            engine = db.engine
+        client = app.test_client()
+        with count_queries(engine) as statements:
+            body = client.get(f"/api/users/{LANDLORD_IC}/landlord-dashboard?limit={limit}").get_json()
+        if len(statements) > DASHBOARD_STATEMENTS:
+            failures.append(f"{len(statements)} statements, budget {DASHBOARD_STATEMENTS}")
+
+        for key in ("myProperties", "pendingApplications", "activeContracts", "pendingContracts", "securedEscrows"):
+            if len(body[key]) != limit:
+                failures.append(f"{key}: {len(body[key])} rows, expected the newest {limit}")
+        if any(c["status"] != "active" for c in body["activeContracts"]):
+            failures.append("pending contract in activeContracts")
+        counts = body["counts"]
+        expected = {"properties": n, "pendingApplications": 2 * n, "activeContracts": n // 2, "pendingContracts": n // 2,
+                    "activeMonthlyRent": float(sum(1500 + i for i in range(1, n, 2)))}
+        got = {key: counts[key] for key in expected}
+        if got != expected:
+            failures.append(f"counts {got}, expected {expected}")
+
+        seen = [int(p["id"]) for p in body["myProperties"]]
+        cursor = body["myPropertiesNextCursor"]
+        while cursor:
+            page = client.get("/api/properties/all",
+                              query_string={"landlord_ic": LANDLORD_IC, "limit": limit, "cursor": cursor}).get_json()
+            seen += [int(p["id"]) for p in page["items"]]
+            cursor = page["nextCursor"]
+        if sorted(seen) != list(range(1, n + 1)):
+            failures.append(f"following myPropertiesNextCursor gave {seen}")
+        with app.app_context():
+            db.engine.dispose()
+    return failures
+
+
+def test_landlord_contracts_page_through_everything(n=12, limit=5):
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            seed(n)
+        client = app.test_client()
+        for status, expected in ((None, n), ("active", n // 2), ("active,pending_photos", n)):
+            seen, cursor = [], None
+            while True:
+                params = {"limit": limit, **({"cursor": cursor} if cursor else {}), **({"status": status} if status else {})}
+                page = client.get(f"/api/landlord/{LANDLORD_IC}/contracts", query_string=params).get_json()
+                assert len(page["items"]) <= limit
+                seen += [item["contract"]["id"] for item in page["items"]]
+                assert all(item["escrow"]["status"] == "secured" for item in page["items"])
+                cursor = page["nextCursor"]
+                if not cursor:
+                    break
+            assert len(seen) == len(set(seen)) == expected, (status, seen)
+        with app.app_context():
+            db.engine.dispose()
+
+
+def test_landlord_dashboard_is_bounded():
+    failures = check_landlord_dashboard()
+    assert not failures, "\n".join(failures)
+
+
+def check_query_counts(small=2, large=12):
+    """Return {endpoint: (small count, large count)} where the count grew."""
+    few, many = statement_counts(small), statement_counts(large)
+    return {url: (few[url], many[url]) for url in LIST_ENDPOINTS if many[url] > few[url]}
+
+
+def test_list_endpoints_have_constant_query_counts():
+    growing = check_query_counts()
+    assert not growing, "\n".join(f"{url}: {a} -> {b} statements" for url, (a, b) in growing.items())
+
+
+if __name__ == "__main__":
+    test_landlord_contracts_page_through_everything()
+    for failure in check_landlord_dashboard():
+        print(f"❌ landlord dashboard: {failure}")
+    growing = check_query_counts()
+    for url, (a, b) in growing.items():
+        print(f"❌ {url}: {a} statements for 2 rows, {b} for 12")
+    if not growing:
+        print("✅ Every list endpoint runs a constant number of queries.")
@@ -0,0 +1,66 @@
+"""
+Listing search: short words are dropped or matched whole, a broad query is
+answered from the newest SCAN_LIMIT matches and flagged approximate, rare
+words rank the results by bm25() while common ones only select, and a city
+filter narrows the match through the index.
+
+Uses a throwaway database and a tiny scan limit, so rentsafe.db is never
+touched.
+
+    python test_search.py      # or: python -m pytest test_search.py
+"""
+import os
+import tempfile
+
+from db.db import db
+from db.db_tables import Property
+from db.search import match_phrases, search_properties
+from test_query_counts import LANDLORD_IC, make_app
+
+
+def test_match_phrases():
+    assert match_phrases("a ko condo") == ['"ko"', '"condo"*']
+    assert match_phrases("neighbourhood") == ['"neighbourhood"']  # longer than any prefix index
+    assert match_phrases('x "); DROP') == ['"DROP"*']
+    assert match_phrases("") == []
+
+
+def test_broad_and_rare_words():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            db.session.add_all(
+                [Property(title=f"Condo {i}", location=f"{i}, Jalan Ampang, WP Kuala Lumpur", price=1500,
+                          landlord_ic=LANDLORD_IC) for i in range(12)] +
+                [Property(title="Bangsar Condo", location="1, Bangsar, WP Kuala Lumpur", price=2500,
+                          landlord_ic=LANDLORD_IC, description="Condo near Bangsar LRT"),
+                 Property(title="Ipoh Condo", location="2, Ipoh, Perak", price=900, landlord_ic=LANDLORD_IC)])
+            db.session.commit()
+            ids = {p.title: p.id for p in Property.query}
+            conn = db.session.connection()
+
+            hits, facets, approximate = search_properties(conn, "condo", limit=3, scan_limit=5)
+            assert approximate and sum(facets["property_type"].values()) == 5
+            assert [h[0] for h in hits] == sorted(ids.values(), reverse=True)[:3]  # unranked: newest first
+
+            hits, facets, approximate = search_properties(conn, "condo bangsar", scan_limit=5)
+            assert not approximate and hits[0][0] == ids["Bangsar Condo"] and hits[0][1] < 0
+
+            hits, facets, approximate = search_properties(conn, "condo", filters={"city": "Ipoh"}, scan_limit=5)
+            assert [h[0] for h in hits] == [ids["Ipoh Condo"]] and not approximate
+            assert facets["city"] == {"Ipoh": 1}
+
+        client = app.test_client()
+        for q in ("a", "co", "c o"):
+            body = client.get(f"/api/properties/search?q={q}").get_json()
+            assert body["items"] == [] and body["total"] == 0 and not body["approximate"], q
+        body = client.get("/api/properties/search?q=condo&limit=2").get_json()
+        assert len(body["items"]) == 2 and body["total"] == 14 and not body["approximate"]
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_match_phrases()
+    test_broad_and_rare_words()
+    print("✅ Search drops short words, caps broad queries and ranks by the rare words.")
@@ -0,0 +1,79 @@
+"""
+Login token store: TTL expiry, bounded size, single-use consumption, and a
+SQLite backend that lets the callback land on a different worker.
+
+    python test_sessions.py      # or: python -m pytest test_sessions.py
+"""
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from api.sessions import MemoryTokenStore, SQLiteTokenStore
+from db.db import db
+from db.query_count import count_queries
+from test_query_counts import make_app
+
+
+def test_memory_store_expires_evicts_and_is_single_use():
+    store = MemoryTokenStore(max_size=2, ttl=60)
+    for token in ("a", "b", "c"):
+        store.put(token, {"token": token})
+    assert store.consume("a") is None  # evicted, oldest first
+    assert store.consume("b") == {"token": "b"}
+    assert store.consume("b") is None  # already used
+
+    short = MemoryTokenStore(ttl=0.01)
+    short.put("x", {})
+    time.sleep(0.02)
+    assert short.consume("x") is None
+
+
+def test_sqlite_store_is_shared_and_redeemed_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        login_worker, callback_worker = SQLiteTokenStore(path, max_size=3), SQLiteTokenStore(path, max_size=3)
+        login_worker.put("t", {"ic": "000000-00-0000"})
+
+        redeemed = []
+        threads = [threading.Thread(target=lambda: redeemed.append(callback_worker.consume("t"))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert [r for r in redeemed if r] == [{"ic": "000000-00-0000"}]
+
+        for i in range(5):
+            login_worker.put(f"t{i}", {})
+        assert login_worker.size() == 3 and callback_worker.consume("t0") is None
+
+
+def test_callback_consumes_token_and_caches_user_lookup():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            engine = db.engine
+        client = app.test_client()
+
+        def login():
+            url = client.get("/api/auth/login-mydigitalid").get_json()["redirect_url"]
+            return parse_qs(urlparse(url).query)["session"][0]
+
+        token = login()
+        first = client.get(f"/api/auth/callback?token={token}")
+        assert first.status_code == 200
+        assert client.get(f"/api/auth/callback?token={token}").status_code == 400
+
+        with count_queries(engine) as statements:
+            again = client.get(f"/api/auth/callback?token={login()}")
+        assert again.get_json()["user_id"] == first.get_json()["user_id"]
+        assert not [s for s in statements if "FROM users" in s], statements
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    tests = [v for k, v in dict(globals()).items() if k.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,119 @@
+"""
+Slow-query log: statements over SLOW_QUERY_MS are logged with their route,
+IC-redacted parameters and query plan; EXPLAIN runs once per statement shape;
+full scans are flagged; the log rotates; and slow_query_report.py ranks
+shapes by total time across the log and its backups.
+
+Uses throwaway databases and logs, so rentsafe.db is never touched.
+
+    python test_slow_queries.py      # or: python -m pytest test_slow_queries.py
+"""
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+from io import StringIO
+
+from sqlalchemy import text
+
+from app import create_app, init_db
+from db.db import db
+from db.slow_queries import log_files, redact, shape_of, summarize
+from test_query_counts import LANDLORD_IC, TENANT_IC, seed
+import slow_query_report
+
+
+def make_app(tmp, **config):
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(tmp, 'rentsafe.db')}", "TESTING": True,
+                      "SLOW_QUERY_MS": 0, "SLOW_QUERY_LOG": os.path.join(tmp, "slow.log"), **config})
+    init_db(app)
+    return app
+
+
+def entries(path):
+    lines = []
+    for file in log_files(path):
+        with open(file) as f:
+            lines += [json.loads(line) for line in f]
+    return lines
+
+
+def test_redaction_and_shapes():
+    assert redact(["800515-01-5678", "800515015678", 42, "Unit 7"]) == ["XXXXXX-XX-5678", "XXXXXX-XX-5678", 42, "Unit 7"]
+    assert redact({"ic": "ic 950101-01-1234 here"}) == {"ic": "ic XXXXXX-XX-1234 here"}
+    assert shape_of("SELECT *\n  FROM t WHERE id IN (?, ?, ?)") == shape_of("SELECT * FROM t WHERE id IN (?, ?)")
+    assert shape_of("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (?, ...)"
+    assert shape_of("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == shape_of("INSERT INTO t (a, b) VALUES (?, ?)")
+
+
+def test_slow_statements_are_logged_with_route_and_plan():
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp)
+        with app.app_context():
+            seed(3)
+        client = app.test_client()
+        for _ in range(3):
+            assert client.get(f"/api/landlord/{LANDLORD_IC}/tenant-history").status_code == 200
+        with app.app_context():
+            db.session.execute(text("SELECT id FROM properties WHERE description LIKE :q"), {"q": "%sea view%"})
+            db.session.remove()
+
+        logged = entries(os.path.join(tmp, "slow.log"))
+        history = [e for e in logged if e["route"] == "get_landlord_tenant_history" and "FROM contracts" in e["sql"]]
+        assert len(history) == 3, [e["route"] for e in logged]
+        assert len({e["shape"] for e in history}) == 1
+        assert history[0]["plan"] and not history[0]["full_scan"], history[0]["plan"]
+        assert "XXXXXX-XX-5678" in history[0]["params"]
+        raw = open(os.path.join(tmp, "slow.log")).read()
+        assert LANDLORD_IC not in raw and TENANT_IC not in raw, "IC numbers must be redacted"
+
+        # outside a request the script is the route; the LIKE scan is flagged
+        scan = [e for e in logged if "LIKE" in e["sql"]]
+        assert scan and scan[0]["full_scan"] == ["properties"] and scan[0]["route"]
+
+        # one EXPLAIN per distinct shape, however often it ran
+        assert len(logged) > len({e["shape"] for e in logged})
+        assert app.extensions["slow_queries"].explained == len({e["shape"] for e in logged})
+        assert all(e["plan"] == history[0]["plan"] for e in history)
+        with app.app_context():
+            db.engine.dispose()
+
+
+def test_threshold_rotation_and_report():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "slow.log")
+        quiet = make_app(tmp, SLOW_QUERY_MS=60000, SLOW_QUERY_LOG=os.path.join(tmp, "quiet.log"))
+        with quiet.app_context():
+            seed(2)
+            db.session.remove()
+        assert entries(os.path.join(tmp, "quiet.log")) == []  # nothing is that slow
+        with quiet.app_context():
+            db.engine.dispose()
+
+        app = make_app(tmp, SLOW_QUERY_LOG_MAX_BYTES=4096, SLOW_QUERY_LOG_BACKUPS=3)
+        client = app.test_client()
+        for _ in range(30):
+            client.get(f"/api/users/{TENANT_IC}/rental-history")
+            client.get("/api/properties/all?all=true")
+        files = log_files(path)
+        assert 2 <= len(files) <= 4 and all(os.path.getsize(f) < 4096 + 2048 for f in files), files
+
+        ranked = summarize(path)
+        assert [item["total_ms"] for item in ranked] == sorted((item["total_ms"] for item in ranked), reverse=True)
+        assert sum(item["count"] for item in ranked) == len(entries(path))
+        out = StringIO()
+        with redirect_stdout(out):
+            assert slow_query_report.main(["--log", path, "--top", "3", "--plans"]) == 0
+        report = out.getvalue()
+        assert report.count("ms total") == 3 and ranked[0]["shape"] in report
+        assert TENANT_IC not in report
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    test_redaction_and_shapes()
+    test_slow_statements_are_logged_with_route_and_plan()
+    test_threshold_rotation_and_report()
+    print("✅ Slow statements are logged with route, redacted parameters and one EXPLAIN per shape; "
+          "the log rotates and the report ranks shapes by total time.")
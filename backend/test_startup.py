@@ -0,0 +1,69 @@
+"""
+Startup budget: a worker forked from the preloaded app (how gunicorn.conf.py
+serves) must answer its first request within STARTUP_BUDGET_SECONDS. The
+cold import of a fresh interpreter is reported for reference.
+
+Runs in a clean interpreter against a throwaway database.
+
+    python test_startup.py      # or: python -m pytest test_startup.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+_SCRIPT = """
+import json, os, time
+started = time.perf_counter()
+from wsgi import app
+from app import init_db
+from db.db import db
+imported = time.perf_counter() - started
+
+init_db(app)
+with app.app_context():
+    db.engine.dispose()
+
+read, write = os.pipe()
+forked = time.perf_counter()
+if os.fork() == 0:
+    status = app.test_client().get("/api/properties/all").status_code
+    os.write(write, json.dumps([time.perf_counter() - forked, status]).encode())
+    os._exit(0)
+os.wait()
+first_response, status = json.loads(os.read(read, 100))
+print(json.dumps({"import": imported, "create_app": app.config["STARTUP_SECONDS"],
+                  "first_response": first_response, "status": status,
+                  "budget": app.config["STARTUP_BUDGET_SECONDS"]}))
+"""
+
+
+def measure_startup():
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ,
+                   RENTSAFE_DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'rentsafe.db')}",
+                   RENTSAFE_CACHE_PATH=os.path.join(tmp, "cache.db"),
+                   RENTSAFE_SESSION_PATH=os.path.join(tmp, "sessions.db"),
+                   RENTSAFE_IDEMPOTENCY_PATH=os.path.join(tmp, "idempotency.db"),
+                   RENTSAFE_METRICS_DIR=os.path.join(tmp, "metrics"))
+        out = subprocess.run([sys.executable, "-c", _SCRIPT], env=env, check=True, capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_forked_worker_serves_within_budget():
+    if not hasattr(os, "fork"):
+        return  # preloading needs fork (Linux/macOS)
+    timings = measure_startup()
+    assert timings["status"] == 200
+    assert timings["create_app"] < timings["budget"], timings
+    assert timings["first_response"] < timings["budget"], timings
+
+
+if __name__ == "__main__":
+    t = measure_startup()
+    print(f"Cold import + create_app: {t['import'] * 1000:.0f} ms (create_app itself {t['create_app'] * 1000:.0f} ms)")
+    print(f"Forked worker first response: {t['first_response'] * 1000:.0f} ms")
+    mark = "✅" if t["status"] == 200 and t["first_response"] < t["budget"] else "❌"
+    print(f"{mark} Budget: {t['budget'] * 1000:.0f} ms")
@@ -0,0 +1,110 @@
+"""
+Synthetic data generator: the same seed gives byte-identical tables, the
+data covers every contract status with consistent columns, dashboard
+counters and the search index match the generated rows, landlord portfolios
+are skewed, and a second run appends without colliding with the first.
+
+Uses throwaway databases, so rentsafe.db is never touched.
+
+    python test_synthetic.py      # or: python -m pytest test_synthetic.py
+"""
+import hashlib
+import os
+import tempfile
+import time
+
+from sqlalchemy import text
+
+from db.contract_states import impossible_states
+from db.db import db
+from db.summary import check_summaries
+from db.synthetic import CONTRACT_STATUSES, DEMO_LANDLORDS, generate
+from test_query_counts import make_app
+
+TABLES = ["users", "properties", "property_amenities", "applications", "contracts", "escrow", "saved_listings",
+          "tenant_preferences", "dashboard_summaries"]
+
+
+def fingerprint(conn):
+    digests = {}
+    for table in TABLES:
+        digest = hashlib.sha256()
+        for row in conn.execute(text(f"SELECT * FROM {table} ORDER BY 1, 2, 3")):
+            digest.update(repr(tuple(row)).encode())
+        digests[table] = digest.hexdigest()
+    return digests
+
+
+def generated(n, runs=1, **options):
+    """Generate n properties `runs` times into a fresh database; returns
+    (written per run, fingerprint, checks dict)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(os.path.join(tmp, "rentsafe.db"))
+        with app.app_context():
+            written = [generate(db.engine, n, batch_size=700, **options) for _ in range(runs)]
+            with db.engine.connect() as conn:
+                checks = {
+                    "drift": check_summaries(conn),
+                    "impossible": impossible_states(conn),
+                    "statuses": {r[0] for r in conn.execute(text("SELECT DISTINCT status FROM contracts"))},
+                    "landlords": [r[0] for r in conn.execute(text(
+                        "SELECT COUNT(*) FROM properties GROUP BY landlord_ic ORDER BY 1 DESC"))],
+                    "top_landlord": conn.execute(text(
+                        "SELECT landlord_ic FROM properties GROUP BY 1 ORDER BY COUNT(*) DESC LIMIT 1")).scalar(),
+                    "unindexed": conn.execute(text(
+                        "SELECT COUNT(*) FROM properties WHERE id NOT IN (SELECT rowid FROM properties_fts "
+                        "WHERE properties_fts MATCH 'title:in')")).scalar(),
+                    "indexes": {r[0] for r in conn.execute(text(
+                        "SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger') AND sql IS NOT NULL"))},
+                    "synchronous": conn.exec_driver_sql("PRAGMA synchronous").scalar(),
+                    "duplicate_ics": conn.execute(text("SELECT COUNT(*) - COUNT(DISTINCT ic) FROM users")).scalar(),
+                }
+                prints = fingerprint(conn)
+            db.engine.dispose()
+    return written, prints, checks
+
+
+def test_generated_data_is_consistent():
+    written, _, checks = generated(3000)
+    assert written[0]["properties"] == 3000 and written[0]["escrow"] > 0, written
+    assert not checks["drift"], checks["drift"][:5]
+    assert not checks["impossible"], checks["impossible"][:5]
+    assert checks["statuses"] == {s[0] for s in CONTRACT_STATUSES}
+    assert checks["unindexed"] == 0, "search index misses generated rows"
+    assert {"ix_properties_landlord_ic_created_at_id", "uq_escrow_contract_id", "properties_fts_ai"} <= checks["indexes"]
+    assert checks["synchronous"] == 1  # NORMAL again after the bulk load
+    # skewed portfolios, biggest for the demo landlord
+    counts = checks["landlords"]
+    assert checks["top_landlord"] == DEMO_LANDLORDS[0][0]
+    assert counts[0] > 10 * counts[len(counts) // 2], counts[:5]
+
+
+def test_same_seed_same_data():
+    _, first, _ = generated(1500)
+    _, second, _ = generated(1500)
+    _, other_seed, _ = generated(1500, seed=7)
+    assert first == second
+    assert first["properties"] != other_seed["properties"]
+
+
+def test_append_run():
+    written, _, checks = generated(1000, runs=2)
+    assert written[1]["properties"] == 1000 and written[1]["users"] == written[0]["users"]
+    assert checks["duplicate_ics"] == 0  # demo accounts only once, generated ICs clear of the first run
+    assert not checks["drift"] and not checks["impossible"]
+    assert checks["unindexed"] == 0
+
+
+def generate_throughput(n=50000):
+    started = time.perf_counter()
+    written, _, _ = generated(n)
+    return written[0], time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    test_generated_data_is_consistent()
+    test_same_seed_same_data()
+    test_append_run()
+    written, seconds = generate_throughput()
+    print(f"✅ Synthetic data is deterministic and consistent; {sum(written.values())} rows "
+          f"({written['properties']} properties) in {seconds:.1f}s.")
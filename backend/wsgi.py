@@ -0,0 +1,13 @@
+"""
+Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Uses the production config unless RENTSAFE_ENV says otherwise. Run
+`python migrate.py` (or let gunicorn.conf.py do it) before serving.
+"""
+import os
+
+os.environ.setdefault("RENTSAFE_ENV", "production")
+
+from app import app  # noqa: E402
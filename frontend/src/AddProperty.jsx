@@ -162,7 +162,9 @@ export default function AddProperty() {
       }
     } catch (err) {
       console.error(err);
-      toast({ title: 'Save failed', description: 'Please try again.', variant: 'error' });
+      // 409: someone saved this property first; the server says to reload
+      const description = err.response?.status === 409 ? err.response.data?.message : 'Please try again.';
+      toast({ title: 'Save failed', description, variant: 'error' });
     } finally {
       setIsSubmitting(false);
     }
@@ -3,13 +3,20 @@ import axios from './axios.js'
 import { useState, useEffect } from "react";
 import SquareListingCard from "./Components/SquareListingCard.jsx";
 
+// Only the columns SquareListingCard renders
+const LISTING_CARD_FIELDS = "id,photos,price,title,location,bedrooms,bathrooms,size"
+
 export default function AllListings(){
 
     const [allListings, setAllListings] = useState([])
-    const fetchListings = async()=>{
+    const [nextCursor, setNextCursor] = useState(null)
+    const fetchListings = async(cursor = null)=>{
         try{
-            const result = await axios.get("/properties/all");
-            setAllListings(result.data)
+            const result = await axios.get("/properties/all", {
+                params: { limit: 24, fields: LISTING_CARD_FIELDS, cursor: cursor || undefined }
+            });
+            setAllListings((prev)=> cursor ? [...prev, ...result.data.items] : result.data.items)
+            setNextCursor(result.data.nextCursor)
             console.log(result.data)
         }
         catch(err){
@@ -17,9 +24,26 @@ export default function AllListings(){
         }
     }
 
+    const [query, setQuery] = useState("")
+    const searchListings = async(q)=>{
+        try{
+            const result = await axios.get("/properties/search", {
+                params: { q, limit: 24, fields: LISTING_CARD_FIELDS }
+            });
+            setAllListings(result.data.items)
+            setNextCursor(null)
+        }
+        catch(err){
+            console.error("Failed to search listings" , err)
+        }
+    }
+
+    // Runs on mount too, loading the first page when the box is empty
     useEffect(()=>{
-        fetchListings()
-    },[])
+        const q = query.trim()
+        const timer = setTimeout(()=> q ? searchListings(q) : fetchListings(), 250)
+        return ()=> clearTimeout(timer)
+    },[query])
 
     return(
         <div className="p-5 flex flex-col space-y-5">
@@ -32,6 +56,8 @@ export default function AllListings(){
                 <input
                 type="text"
                 placeholder="Search by title or location"
+                value={query}
+                onChange={(e)=>setQuery(e.target.value)}
                 className="w-full border-2 border-gray-300 p-2 pl-10 rounded-lg"
                 />
                 <Search
@@ -60,6 +86,13 @@ export default function AllListings(){
                     ))
                 }
             </div>
+            {
+                nextCursor && (
+                    <button onClick={()=>fetchListings(nextCursor)} className="self-center border-2 border-gray-300 px-4 py-2 rounded-lg hover:bg-muted-foreground/10">
+                        Load more
+                    </button>
+                )
+            }
         </div>
     )
 }
@@ -25,9 +25,17 @@ export default function Applications() {
       setLoading(true);
       setError(null);
       try {
-        const { data: dashboard } = await api.get(`/users/${user.ic}/landlord-dashboard`);
-        if (!isMounted) return;
-        const myProps = dashboard?.myProperties || [];
+        // The dashboard only carries the newest few listings; page through them all
+        const myProps = [];
+        let cursor;
+        do {
+          const { data } = await api.get('/properties/all', {
+            params: { landlord_ic: user.ic, limit: 100, cursor },
+          });
+          if (!isMounted) return;
+          myProps.push(...data.items);
+          cursor = data.nextCursor || undefined;
+        } while (cursor);
         setProperties(myProps);
 
         const appLists = await Promise.all(
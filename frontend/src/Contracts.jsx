@@ -31,12 +31,17 @@ export default function Contracts() {
 
       let res;
       if (isLandlord) {
-        res = await api.get(`/users/${user.ic}/landlord-dashboard`);
-        // Prefer a flat `contracts` array if backend provides it; fall back to older grouped arrays
-        const mergedContracts = res.data.contracts ? res.data.contracts : [...(res.data.activeContracts || []), ...(res.data.pendingContracts || [])];
-        
+        // Every contract of this landlord, a page at a time (the dashboard only has the newest few)
+        const items = [];
+        let cursor;
+        do {
+          res = await api.get(`/landlord/${user.ic}/contracts`, { params: { limit: 200, cursor } });
+          items.push(...res.data.items);
+          cursor = res.data.nextCursor || undefined;
+        } while (cursor);
+
         // NOTE: landlord needs a way to sign after tenant signs — UI will show Sign button when appropriate.
-        const data = mergedContracts.map(c => ({
+        const data = items.map(({ contract: c, escrow }) => ({
           contract: {
             ...c,
             // support both snake_case and camelCase shapes from backend
@@ -45,7 +50,7 @@ export default function Contracts() {
             tenant_ic: c.tenant_ic || c.tenantIc,
             landlord_ic: c.landlord_ic || c.landlordIc,
           },
-          escrow: null,
+          escrow,
           property: c.property || { id: null, title: 'Unknown', location: 'Unknown', image_url: '/placeholder.svg', photos: [] },
         }));
         setContracts(data);
@@ -8,6 +8,31 @@ import { useToast } from './Components/ToastContext.jsx';
 import api from './axios.js';
 import { UserContext } from './Context/UserContext.jsx';
 
+// Contracts whose deposit the landlord tracks: active plus the pending statuses
+const ESCROW_CONTRACT_STATUSES = [
+  'active', 'pending_signatures', 'pending_photos', 'pending_tenant_approval',
+  'tenant_signed_waiting_landlord', 'photos_rejected_by_tenant', 'deposit_paid',
+].join(',');
+
+// Every such contract with its escrow, a page at a time; a contract with no
+// escrow yet shows as pending, as /escrow/<contract id> reports it
+async function fetchLandlordEscrows(ic) {
+  const items = [];
+  let cursor;
+  do {
+    const { data } = await api.get(`/landlord/${ic}/contracts`, {
+      params: { status: ESCROW_CONTRACT_STATUSES, limit: 200, cursor },
+    });
+    items.push(...data.items);
+    cursor = data.nextCursor || undefined;
+  } while (cursor);
+  return items.map(({ contract, escrow }) => ({
+    ...(escrow || { status: 'pending', amount: 0 }),
+    contract,
+    property: contract.property,
+  }));
+}
+
 export default function Escrow() {
   const [isLoading, setIsLoading] = useState(false);
   const [statusFilter, setStatusFilter] = useState('all');
@@ -26,24 +51,7 @@ export default function Escrow() {
       setLoading(true);
       setError(null);
       try {
-        const { data: dashboard } = await api.get(`/users/${user.ic}/landlord-dashboard`);
-        if (!isMounted) return;
-        const contracts = [...(dashboard?.activeContracts || []), ...(dashboard?.pendingContracts || [])];
-        const escrows = await Promise.all(
-          contracts.map(async (contract) => {
-            try {
-              const { data: escrow } = await api.get(`/escrow/${contract.id}`);
-              return { escrow, contract };
-            } catch {
-              return null;
-            }
-          })
-        );
-        const filtered = escrows.filter(Boolean).map(({ escrow, contract }) => ({
-          ...escrow,
-          contract,
-          property: contract.property,
-        }));
+        const filtered = await fetchLandlordEscrows(user.ic);
         if (isMounted) setEscrowsData(filtered);
       } catch (err) {
         if (!isMounted) return;
@@ -93,19 +101,7 @@ export default function Escrow() {
         variant: action === 'approve' ? 'success' : action === 'reject' ? 'warning' : 'info',
       });
       // refresh list
-      const { data: dashboard } = await api.get(`/users/${user.ic}/landlord-dashboard`);
-      const contracts = [...(dashboard?.activeContracts || []), ...(dashboard?.pendingContracts || [])];
-      const refreshed = await Promise.all(
-        contracts.map(async (contract) => {
-          try {
-            const { data: escrow } = await api.get(`/escrow/${contract.id}`);
-            return { ...escrow, contract, property: contract.property };
-          } catch {
-            return null;
-          }
-        })
-      );
-      setEscrowsData(refreshed.filter(Boolean));
+      setEscrowsData(await fetchLandlordEscrows(user.ic));
     } catch (err) {
       console.error(err);
       toast({ title: 'Action failed', description: 'Please try again.', variant: 'error' });
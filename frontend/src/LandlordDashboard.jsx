@@ -1,4 +1,4 @@
-import { useEffect, useMemo, useState, useContext } from 'react';
+import { useEffect, useState, useContext } from 'react';
 import { useNavigate, Link } from 'react-router-dom';
 import { Building2, Users, FileText, Wallet, Plus, ArrowRight, MapPin, Edit, Eye, Trash2, DollarSign, Image } from 'lucide-react';
 import StatusBadge from './Components/StatusBadge';
@@ -15,6 +15,7 @@ export default function LandlordDashboard() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [dashboardData, setDashboardData] = useState({
+    counts: {},
     myProperties: [],
     pendingApplications: [],
     activeContracts: [],
@@ -31,6 +32,8 @@ export default function LandlordDashboard() {
         const { data } = await api.get(`/users/${landlordIc}/landlord-dashboard`);
         if (!isMounted) return;
         setDashboardData({
+          // exact totals; the lists below hold only the newest few rows
+          counts: data?.counts || {},
           myProperties: data?.myProperties || [],
           pendingApplications: data?.pendingApplications || [],
           activeContracts: data?.activeContracts || [],
@@ -51,12 +54,9 @@ export default function LandlordDashboard() {
     };
   }, [landlordIc]);
 
-  const { myProperties, pendingApplications, activeContracts, pendingContracts} = dashboardData;
+  const { counts, myProperties, pendingApplications, activeContracts, pendingContracts} = dashboardData;
 
-  const monthlyIncome = useMemo(
-    () => activeContracts.reduce((sum, c) => sum + (Number(c.monthlyRent) || 0), 0),
-    [activeContracts]
-  );
+  const monthlyIncome = Number(counts.activeMonthlyRent) || 0;
   // const totalEscrowAmount = useMemo(
   //   () => securedEscrows.reduce((sum, e) => sum + (Number(e.amount) || 0), 0),
   //   [securedEscrows]
@@ -75,7 +75,11 @@ export default function LandlordDashboard() {
     try {
       await api.delete(`/properties/${deleteId}/delete`);
       const updated = myProperties.filter((p) => String(p.id) !== String(deleteId));
-      setDashboardData((prev) => ({ ...prev, myProperties: updated }));
+      setDashboardData((prev) => ({
+        ...prev,
+        myProperties: updated,
+        counts: { ...prev.counts, properties: Math.max((prev.counts.properties || 1) - 1, 0) },
+      }));
       setDeleteId(null);
     } catch (err) {
       console.error('Error deleting property:', err);
@@ -84,9 +88,9 @@ export default function LandlordDashboard() {
   };
 
   const stats = [
-    { label: 'My Properties', value: myProperties.length, icon: Building2, href: '/properties', color: 'text-primary' },
-    { label: 'Pending Applications', value: pendingApplications.length, icon: Users, href: '/applications/list', color: 'text-warning' },
-    { label: 'Active Contracts', value: activeContracts.length, icon: FileText, href: '/contracts', color: 'text-info' },
+    { label: 'My Properties', value: counts.properties || 0, icon: Building2, href: '/properties', color: 'text-primary' },
+    { label: 'Pending Applications', value: counts.pendingApplications || 0, icon: Users, href: '/applications/list', color: 'text-warning' },
+    { label: 'Active Contracts', value: counts.activeContracts || 0, icon: FileText, href: '/contracts', color: 'text-info' },
     // { label: 'Escrow', value: `RM ${totalEscrowAmount.toLocaleString()}`, icon: Wallet, href: '/escrow', color: 'text-success' },
   ];
 
@@ -161,9 +165,9 @@ export default function LandlordDashboard() {
         <div className="flex items-center justify-between">
           <div className="flex items-center gap-3">
             <h2 className="text-xl font-semibold">Pending Applications</h2>
-            {pendingApplications.length > 0 && (
+            {counts.pendingApplications > 0 && (
               <span className="px-2.5 py-0.5 rounded-full bg-warning text-white text-xs font-semibold">
-                {pendingApplications.length}
+                {counts.pendingApplications}
               </span>
             )}
           </div>
@@ -222,9 +226,9 @@ export default function LandlordDashboard() {
         <div className="flex items-center justify-between">
           <div className="flex items-center gap-3">
             <h2 className="text-xl font-semibold">Pending Contracts</h2>
-            {pendingContracts.length > 0 && (
+            {counts.pendingContracts > 0 && (
               <span className="px-2.5 py-0.5 rounded-full bg-warning text-white text-xs font-semibold">
-                {pendingContracts.length}
+                {counts.pendingContracts}
               </span>
             )}
           </div>
@@ -1,6 +1,6 @@
 // ListingDetails.jsx
 
-import { useState, useEffect, useContext } from 'react';
+import { useState, useEffect, useContext, useRef } from 'react';
 import axios from "./axios.js";
 import { useParams, useNavigate ,useLocation } from 'react-router-dom';
 import { useToast } from './Components/ToastContext.jsx';
@@ -20,6 +20,9 @@ export default function ListingDetails() {
   const navigate = useNavigate();
   const { toast } = useToast();
   const [isApplying, setIsApplying] = useState(false);
+  // Idempotency-Key of the application being submitted: reused when the same
+  // attempt is retried, replaced once the server has given a final answer
+  const applyKey = useRef(null);
   const [property, setProperty] = useState();
   const { userProfile } = useContext(UserContext);
 
@@ -64,14 +67,20 @@ export default function ListingDetails() {
       return;
     }
 
+    if (isApplying) return;
     setIsApplying(true);
+    applyKey.current = applyKey.current || crypto.randomUUID();
     try {
       const payLoad = {
         tenant_ic: userProfile.ic,
         property_id: property.id,
       };
 
-      await axios.post('/applications/create', payLoad);
+      // A retry of this attempt sends the same key, so the server replays the first response
+      await axios.post('/applications/create', payLoad, {
+        headers: { 'Idempotency-Key': applyKey.current },
+      });
+      applyKey.current = null;
 
       toast({
         title: 'Application submitted',
@@ -80,6 +89,11 @@ export default function ListingDetails() {
       });
       navigate('/applications');
     } catch (err) {
+      // Keep the key only when the outcome is unknown (no response, server
+      // error, or the first request still running); any other answer is stored
+      // under it, so applying again needs a new key
+      const status = err.response?.status;
+      if (status && status < 500 && status !== 409) applyKey.current = null;
       console.error('Failed to apply to rent', err);
       toast({
         title: 'Failed to apply to rent',
@@ -26,9 +26,18 @@ export default function Properties() {
       setLoading(true);
       setError(null);
       try {
-        const { data } = await api.get('/properties/all');
-        if (!isMounted) return;
-        const mine = (data || []).filter((p) => !userProfile?.ic || p.landlordIc === userProfile.ic);
+        if (!userProfile?.ic) return;
+        // Only this landlord's listings, a page at a time; the tab counts need them all
+        const mine = [];
+        let cursor;
+        do {
+          const { data } = await api.get('/properties/all', {
+            params: { landlord_ic: userProfile.ic, limit: 100, cursor },
+          });
+          if (!isMounted) return;
+          mine.push(...data.items);
+          cursor = data.nextCursor || undefined;
+        } while (cursor);
         setProperties(mine);
       } catch (err) {
         if (!isMounted) return;
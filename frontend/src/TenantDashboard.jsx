@@ -17,8 +17,10 @@ export default function TenantDashboard(){
 
     const fetchProperties = async()=>{
         try{
-            const results = await axios.get("/properties/all")
-            setProperties(results.data)
+            const results = await axios.get("/properties/all", {
+                params: { limit: 3, fields: "id,photos,price,title,location,bedrooms,bathrooms,size" }
+            })
+            setProperties(results.data.items)
             console.log(results.data)
         }
         catch(err){
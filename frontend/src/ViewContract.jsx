@@ -131,7 +131,10 @@ export default function ViewContract() {
     setIsPaying(true);
     try {
       const payload = { contract_id: contract.id, amount: contract.depositAmount };
-      const res = await api.post('/escrow/create', payload);
+      // One deposit per contract; a retried payment gets the first response back
+      const res = await api.post('/escrow/create', payload, {
+        headers: { 'Idempotency-Key': `escrow-${contract.id}` },
+      });
       setEscrow(res.data.escrow);
       // update contract locally to reflect deposit_paid state
       setContract({ ...contract, status: 'deposit_paid' });
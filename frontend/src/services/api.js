@@ -41,16 +41,24 @@ const apiRequest = async (endpoint, options = {}) => {
 // Landlord composite dashboard
 export const landlordAPI = {
   getDashboard: async (landlordIc) => apiRequest(`/users/${landlordIc}/landlord-dashboard`),
-  getTenantHistory: async (landlordIc) => apiRequest(`/landlord/${landlordIc}/tenant-history`),
+  getDashboardSummary: async (landlordIc) => apiRequest(`/users/${landlordIc}/landlord-dashboard/summary`),
+  // Returns { items, nextCursor, limit }; pass params like { limit, cursor, from, to }
+  getTenantHistory: async (landlordIc, params = {}) =>
+    apiRequest(`/landlord/${landlordIc}/tenant-history?${new URLSearchParams(params)}`),
+  // Returns { items: [{ contract, escrow }], nextCursor, limit }; pass params like { status, limit, cursor }
+  getContracts: async (landlordIc, params = {}) =>
+    apiRequest(`/landlord/${landlordIc}/contracts?${new URLSearchParams(params)}`),
 };
 
 export const tenantAPI = {
   getRentalHistory: async (tenantIc) => apiRequest(`/users/${tenantIc}/rental-history`),
+  getDashboardSummary: async (tenantIc) => apiRequest(`/users/${tenantIc}/tenant-dashboard/summary`),
 };
 
 // Properties API
 export const propertiesAPI = {
-  getAll: async () => apiRequest('/properties/all'),
+  getAll: async () => apiRequest('/properties/all?all=true'),
+  getPage: async (params = {}) => apiRequest(`/properties/all?${new URLSearchParams(params)}`),
   getProperty: async (propertyId) => apiRequest(`/properties/${propertyId}`),
   createProperty: async (payload) =>
     apiRequest('/properties/create', {
@@ -80,6 +88,12 @@ export const applicationsAPI = {
     apiRequest(`/applications/${applicationId}/reject`, {
       method: 'POST',
     }),
+  // decisions: [{ application_id, decision: 'approve' | 'reject' }]
+  bulkReview: async (decisions, autoRejectOthers = false) =>
+    apiRequest('/applications/bulk-review', {
+      method: 'POST',
+      body: JSON.stringify({ decisions, auto_reject_others: autoRejectOthers }),
+    }),
 };
 
 // Contracts API
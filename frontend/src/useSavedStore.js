@@ -34,7 +34,9 @@ export const useSavedStore = create((set) => ({
     });
 
     try {
-      const payload = { user_id: userId, listing_id: listingId };
+      // Send the state we want rather than "toggle", so a retried request
+      // can't flip the listing back
+      const payload = { user_id: userId, listing_id: listingId, saved: !isCurrentlySaved };
 
       // Post to the backend to perform the actual save/unsave operation
       const result = await axios.post("/listings/save", payload);